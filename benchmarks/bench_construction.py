@@ -0,0 +1,87 @@
+# Copyright (C) 2014  Nicolas Jouanin
+#
+# This file is part of pybone.
+#
+# Pybone is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pybone is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pybone.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Board construction latency, synchronous constructors against Board.create() on test resources files.
+Cold latency is measured in a new interpreter, including pybone import and pin definitions loading.
+
+    python -m benchmarks.bench_construction
+"""
+
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.fixtures import fixture_platform
+from pybone.bone import Linux38Platform
+from pybone.bone.board import Board
+
+_REPO_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+_COLD_PROBE = """
+import time
+start = time.perf_counter()
+from benchmarks.fixtures import fixture_platform
+from benchmarks.bench_construction import %s
+with fixture_platform():
+    %s()
+print(time.perf_counter() - start)
+"""
+
+
+def construct_sync():
+    board = Board(Linux38Platform())
+    board.close()
+
+
+def construct_async():
+    async def create():
+        board = await Board.create(await Linux38Platform.create())
+        board.close()
+    asyncio.run(create())
+
+
+def warm_latency(construct, runs=50):
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        construct()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def cold_latency(construct, runs=5):
+    durations = []
+    for _ in range(runs):
+        output = subprocess.check_output([sys.executable, '-c', _COLD_PROBE % (construct.__name__, construct.__name__)],
+                                         cwd=_REPO_DIR)
+        durations.append(float(output.decode().splitlines()[-1]))
+    return statistics.median(durations)
+
+
+def main():
+    for construct in (construct_sync, construct_async):
+        cold = cold_latency(construct)
+        with fixture_platform():
+            warm = warm_latency(construct)
+        print("%-16s cold %7.2f ms   warm %7.2f ms" % (construct.__name__, cold * 1e3, warm * 1e3))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+# Copyright (C) 2014  Nicolas Jouanin
+#
+# This file is part of pybone.
+#
+# Pybone is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pybone is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pybone.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+pinctrl 'pins' lines parsing throughput, compared with per line register decoding.
+
+    python -m benchmarks.bench_pinctrl
+"""
+
+import os
+import re
+import timeit
+
+from pybone.bone.linux_3_8.pinctrl import parse_pins_line
+from pybone.bone.pin import RegPullEnum, RegPullTypeEnum, RegRcvEnum, RegSlewEnum
+
+RESOURCES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'pybone', 'tests', 'resources')
+
+
+def per_line_decode_parse_pins_line(line):
+    """
+    Reference implementation, decoding the register with a new dict and Enum tests for each line
+    """
+    m = re.match(r"pin ([0-9]+)\s.([0-9a-f]+).\s([0-9a-f]+)", line)
+    pin_index = int(m.group(1))
+    pin_address = int(m.group(2), 16)
+    reg = int(m.group(3), 16)
+    pin_reg = {'mode': reg & 0x07,
+               'slew': RegSlewEnum.slow if (reg & 0x40) else RegSlewEnum.fast,
+               'receive': RegRcvEnum.enabled if (reg & 0x20) else RegRcvEnum.disabled,
+               'pull': RegPullEnum.enabled if ((reg >> 3) & 0x01) else RegPullEnum.disabled,
+               'pulltype': RegPullTypeEnum.pullup if ((reg >> 4) & 0x01) else RegPullTypeEnum.pulldown}
+    return {'index': pin_index, 'address': pin_address, 'reg': pin_reg}
+
+
+def lines_per_second(parser, lines, repeat=5, number=200):
+    timer = timeit.Timer(lambda: [parser(line) for line in lines])
+    best = min(timer.repeat(repeat=repeat, number=number))
+    return len(lines) * number / best
+
+
+def main():
+    with open(os.path.join(RESOURCES_DIR, 'pins')) as fp:
+        lines = fp.readlines()[1:]
+    before = lines_per_second(per_line_decode_parse_pins_line, lines)
+    after = lines_per_second(parse_pins_line, lines)
+    print("per line decoding : %10.0f lines/s" % before)
+    print("decode table      : %10.0f lines/s (x%.2f)" % (after, after / before))
+
+if __name__ == '__main__':
+    main()
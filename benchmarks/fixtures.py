@@ -0,0 +1,75 @@
+# Copyright (C) 2014  Nicolas Jouanin
+#
+# This file is part of pybone.
+#
+# Pybone is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pybone is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pybone.  If not, see <http://www.gnu.org/licenses/>.
+
+import contextlib
+import os
+import tempfile
+from unittest.mock import patch
+
+from pybone.tests.bone import build_fixture_root, gpio_banks_patchers, platform_files_patchers, write_gpio_banks
+
+RESOURCES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'pybone', 'tests', 'resources')
+
+
+def _patch_os(stack):
+    mock_platform = stack.enter_context(patch('pybone.bone.platform.platform'))
+    mock_platform.system.return_value = 'Linux'
+    mock_platform.release.return_value = '3.8.13-bone47'
+    mock_platform.processor.return_value = 'armv7l'
+
+
+@contextlib.contextmanager
+def fixture_platform(resources_dir=RESOURCES_DIR):
+    """
+    Make Linux38Platform run on a BeagleBone Black like files tree, on any Linux box
+    :param resources_dir: directory containing board-name, revision, serial-number, pins and pinmux-pins files
+    """
+    with contextlib.ExitStack() as stack:
+        _patch_os(stack)
+        for patcher in platform_files_patchers(resources_dir):
+            stack.enter_context(patcher)
+        yield
+
+
+@contextlib.contextmanager
+def fixture_root(resources_dir=RESOURCES_DIR, devices=50):
+    """
+    Build a BeagleBone like root tree, to run Linux38Platform with root set to it
+    :param resources_dir: directory containing board-name, revision, serial-number, pins and pinmux-pins files
+    :param devices: count of other devices in sys/devices, making discovery scan them
+    :return: root directory
+    """
+    with contextlib.ExitStack() as stack:
+        _patch_os(stack)
+        root = stack.enter_context(tempfile.TemporaryDirectory(prefix='pybone-root-'))
+        build_fixture_root(root, resources_dir, devices)
+        yield root
+
+
+@contextlib.contextmanager
+def fixture_gpio_banks(directory, words=(0x12345678, 0x9abcdef0, 0x0f0f0f0f, 0xf0f0f0f0)):
+    """
+    Make Linux38Platform sample GPIO banks from a regular file, banks laid out one after the other
+    :param directory: directory the file is written to
+    :param words: DATAIN word of each bank
+    """
+    file = os.path.join(directory, 'gpio-banks')
+    write_gpio_banks(file, words)
+    with contextlib.ExitStack() as stack:
+        for patcher in gpio_banks_patchers(file):
+            stack.enter_context(patcher)
+        yield
@@ -0,0 +1,511 @@
+# Copyright (C) 2014  Nicolas Jouanin
+#
+# This file is part of pybone.
+#
+# Pybone is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pybone is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pybone.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+pybone benchmark suite.
+
+Runs on the test resources files and on synthetic files scaled up from them, so it
+works on any Linux box. Results are written as JSON so runs on different commits
+can be compared :
+
+    python -m benchmarks --output before.json
+    git checkout other-branch
+    python -m benchmarks --output after.json --compare before.json
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+from benchmarks.fixtures import fixture_gpio_banks, fixture_platform, fixture_root, RESOURCES_DIR
+
+_REPO_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+#Benchmarks registry, in run order
+BENCHMARKS = []
+
+
+def benchmark(name, unit, higher_is_better=False):
+    """
+    Register a benchmark function. The function gets the run context and returns a measure in unit.
+    """
+    def register(func):
+        BENCHMARKS.append((name, unit, higher_is_better, func))
+        return func
+    return register
+
+
+def best_time(func, number, repeat=5):
+    """
+    Best time of a call to func, in seconds
+    """
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+class Context(object):
+    """
+    Benchmarks run context : resources files, and scaled up copies of them
+    """
+    def __init__(self, scale):
+        self.scale = scale
+        self.resources_dir = RESOURCES_DIR
+        self._tmp_dir = tempfile.TemporaryDirectory(prefix='pybone-bench-')
+        self.scaled_dir = self._tmp_dir.name
+        for file_name in ('board-name', 'revision', 'serial-number'):
+            shutil.copy(os.path.join(RESOURCES_DIR, file_name), self.scaled_dir)
+        self._scale_file('pins', header_lines=1)
+        self._scale_file('pinmux-pins', header_lines=2)
+
+    def _scale_file(self, file_name, header_lines):
+        """
+        Write a file with scale times the resource file lines. Copies get addresses
+        beyond the control module pads, the way a larger pin controller would.
+        """
+        with open(os.path.join(RESOURCES_DIR, file_name)) as fp:
+            lines = fp.readlines()
+        (header, body) = (lines[:header_lines], lines[header_lines:])
+        with open(os.path.join(self.scaled_dir, file_name), 'w') as fp:
+            fp.writelines(header)
+            for copy in range(self.scale):
+                for line in body:
+                    if copy:
+                        (start, address, end) = (line.index('(') + 1, line[line.index('(') + 1:line.index(')')], line.index(')'))
+                        line = line[:start] + '%08x' % (int(address, 16) + 0x1000 * copy) + line[end:]
+                    fp.write(line)
+
+    def read(self, directory, file_name):
+        with open(os.path.join(directory, file_name)) as fp:
+            return fp.read()
+
+    def cleanup(self):
+        self._tmp_dir.cleanup()
+
+
+@benchmark('import_pybone_bone_board', 'ms')
+def bench_import(context):
+    durations = []
+    for _ in range(5):
+        output = subprocess.check_output([sys.executable, '-c',
+                                          'import time; start = time.perf_counter(); import pybone.bone.board; '
+                                          'print(time.perf_counter() - start)'], cwd=_REPO_DIR)
+        durations.append(float(output.decode().splitlines()[-1]))
+    return statistics.median(durations) * 1e3
+
+
+@benchmark('detect_platform', 'ms')
+def bench_detect_platform(context):
+    from pybone.bone import detect_platform
+    with fixture_platform():
+        return best_time(lambda: detect_platform().close(), number=20) * 1e3
+
+
+@benchmark('discover_platform_cold', 'ms')
+def bench_discover_platform_cold(context):
+    from pybone.bone import Linux38Platform
+
+    def discover():
+        Linux38Platform.clear_discovery_cache()
+        Linux38Platform(root=root).close()
+
+    with fixture_root() as root:
+        result = best_time(discover, number=20) * 1e3
+    Linux38Platform.clear_discovery_cache()
+    return result
+
+
+@benchmark('discover_platform_warm', 'ms')
+def bench_discover_platform_warm(context):
+    from pybone.bone import Linux38Platform
+    with fixture_root() as root:
+        Linux38Platform(root=root).close()
+        result = best_time(lambda: Linux38Platform(root=root).close(), number=20) * 1e3
+    Linux38Platform.clear_discovery_cache()
+    return result
+
+
+@benchmark('board_construction', 'ms')
+def bench_board_construction(context):
+    from pybone.bone import Linux38Platform
+    from pybone.bone.board import Board
+    with fixture_platform():
+        pf = Linux38Platform()
+        result = best_time(lambda: Board(pf), number=20) * 1e3
+        pf.close()
+    return result
+
+
+@benchmark('board_create_async', 'ms')
+def bench_board_create(context):
+    from pybone.bone import Linux38Platform
+    from pybone.bone.board import Board
+
+    async def create(number):
+        pf = await Linux38Platform.create()
+        start = time.perf_counter()
+        for _ in range(number):
+            await Board.create(pf)
+        duration = time.perf_counter() - start
+        pf.close()
+        return duration / number
+
+    with fixture_platform():
+        return min(asyncio.run(create(20)) for _ in range(5)) * 1e3
+
+
+def _lines_throughput(parser, content, header_lines):
+    lines = content.splitlines(True)[header_lines:]
+    return len(lines) / best_time(lambda: [parser(line) for line in lines], number=20)
+
+
+def _bulk_throughput(parser, content, header_lines):
+    lines_count = len(content.splitlines()) - header_lines
+    return lines_count / best_time(lambda: list(parser(content)), number=20)
+
+
+@benchmark('parse_pins_line', 'lines/s', higher_is_better=True)
+def bench_parse_pins_line(context):
+    from pybone.bone.linux_3_8.pinctrl import parse_pins_line
+    return _lines_throughput(parse_pins_line, context.read(context.resources_dir, 'pins'), 1)
+
+
+@benchmark('parse_pins_line_scaled', 'lines/s', higher_is_better=True)
+def bench_parse_pins_line_scaled(context):
+    from pybone.bone.linux_3_8.pinctrl import parse_pins_line
+    return _lines_throughput(parse_pins_line, context.read(context.scaled_dir, 'pins'), 1)
+
+
+@benchmark('parse_pinmux_pins_file', 'lines/s', higher_is_better=True)
+def bench_parse_pinmux_pins_file(context):
+    from pybone.bone.linux_3_8.pinctrl import parse_pinmux_pins_file
+    return _lines_throughput(parse_pinmux_pins_file, context.read(context.resources_dir, 'pinmux-pins'), 2)
+
+
+@benchmark('parse_pinmux_pins_file_scaled', 'lines/s', higher_is_better=True)
+def bench_parse_pinmux_pins_file_scaled(context):
+    from pybone.bone.linux_3_8.pinctrl import parse_pinmux_pins_file
+    return _lines_throughput(parse_pinmux_pins_file, context.read(context.scaled_dir, 'pinmux-pins'), 2)
+
+
+@benchmark('iter_pins_registers_scaled', 'lines/s', higher_is_better=True)
+def bench_iter_pins_registers(context):
+    from pybone.bone.linux_3_8.pinctrl import iter_pins_registers
+    return _bulk_throughput(iter_pins_registers, context.read(context.scaled_dir, 'pins'), 1)
+
+
+@benchmark('iter_pinmux_owners_scaled', 'lines/s', higher_is_better=True)
+def bench_iter_pinmux_owners(context):
+    from pybone.bone.linux_3_8.pinctrl import iter_pinmux_owners
+    return _bulk_throughput(iter_pinmux_owners, context.read(context.scaled_dir, 'pinmux-pins'), 2)
+
+
+def _fixture_board(resources_dir):
+    from pybone.bone import Linux38Platform
+    from pybone.bone.board import Board
+    with fixture_platform(resources_dir):
+        return Board(Linux38Platform())
+
+
+@benchmark('get_pin', 'lookups/s', higher_is_better=True)
+def bench_get_pin(context):
+    from pybone.bone.board import Header
+    board = _fixture_board(context.resources_dir)
+    queries = [{'key': pin.key} for pin in board.pins] + \
+              [{'address': pin.address} for pin in board.pins if pin.address is not None] + \
+              [{'header': Header.p9, 'gpio_number': pin.gpio_number} for pin in board.pins if pin.gpio_number]
+    result = len(queries) / best_time(lambda: [board.get_pin(**query) for query in queries], number=20)
+    board.close()
+    return result
+
+
+@benchmark('update_pins_runtime_attributes', 'ms')
+def bench_update_pins_runtime_attributes(context):
+    board = _fixture_board(context.resources_dir)
+    result = best_time(board.update_pins_runtime_attributes, number=50) * 1e3
+    board.close()
+    return result
+
+
+@benchmark('update_pins_runtime_attributes_scaled', 'ms')
+def bench_update_pins_runtime_attributes_scaled(context):
+    board = _fixture_board(context.scaled_dir)
+    result = best_time(board.update_pins_runtime_attributes, number=10) * 1e3
+    board.close()
+    return result
+
+
+@benchmark('gpio_levels_sysfs', 'us')
+def bench_gpio_levels_sysfs(context):
+    """
+    Board GPIO levels read the sysfs way, one value file open and read per GPIO
+    """
+    board = _fixture_board(context.resources_dir)
+    directory = os.path.join(context.scaled_dir, 'gpio')
+    files = []
+    for pin in board.pins:
+        if pin.gpio_number is not None:
+            files.append(os.path.join(directory, 'gpio%d' % pin.gpio_number, 'value'))
+            os.makedirs(os.path.dirname(files[-1]))
+            with open(files[-1], 'w') as fp:
+                fp.write('1\n')
+    board.close()
+
+    def read_levels():
+        levels = []
+        for file in files:
+            with open(file, 'rb') as fp:
+                levels.append(int(fp.read()))
+        return levels
+    return best_time(read_levels, number=50) * 1e6
+
+
+@benchmark('gpio_levels_mmap', 'us')
+def bench_gpio_levels_mmap(context):
+    """
+    Board GPIO levels sampled from the memory mapped GPIO banks
+    """
+    with fixture_gpio_banks(context.scaled_dir):
+        board = _fixture_board(context.resources_dir)
+        result = best_time(board.read_gpio_levels, number=2000) * 1e6
+        board.close()
+    return result
+
+
+def _gpio_value_files(context, gpio_numbers):
+    directory = os.path.join(context.scaled_dir, 'gpio-out')
+    files = []
+    for gpio_number in gpio_numbers:
+        files.append(os.path.join(directory, 'gpio%d' % gpio_number, 'value'))
+        os.makedirs(os.path.dirname(files[-1]), exist_ok=True)
+    return files
+
+
+def _sysfs_toggles(files, number=500):
+    """
+    Toggles per second of GPIO written the sysfs way, one value file open and write per GPIO
+    """
+    def toggle():
+        for level in (b'1', b'0'):
+            for file in files:
+                with open(file, 'wb') as fp:
+                    fp.write(level)
+    return 2 / best_time(toggle, number=number)
+
+
+def _mmap_toggles(context, pins_of, number=5000):
+    """
+    Toggles per second of GPIO written through the memory mapped GPIO banks
+    :param pins_of: callable returning written Pin or PinSet from the board
+    """
+    with fixture_gpio_banks(context.scaled_dir):
+        board = _fixture_board(context.resources_dir)
+        pins = pins_of(board)
+        (high, low) = ({pins: 1}, {pins: 0})
+
+        def toggle():
+            board.write_gpio_levels(high)
+            board.write_gpio_levels(low)
+        result = 2 / best_time(toggle, number=number)
+        board.close()
+    return result
+
+
+#8 bits bus, P8_39 to P8_46, GPIO 70 to 77 of bank 2
+_BUS_KEYS = tuple('P8_%d' % pin for pin in range(39, 47))
+
+
+@benchmark('gpio_toggle_sysfs', 'toggles/s', higher_is_better=True)
+def bench_gpio_toggle_sysfs(context):
+    return _sysfs_toggles(_gpio_value_files(context, (38,)))
+
+
+@benchmark('gpio_toggle_mmap', 'toggles/s', higher_is_better=True)
+def bench_gpio_toggle_mmap(context):
+    return _mmap_toggles(context, lambda board: board.get_pin(key='P8_3'))
+
+
+@benchmark('gpio_bus_toggle_sysfs', 'toggles/s', higher_is_better=True)
+def bench_gpio_bus_toggle_sysfs(context):
+    board = _fixture_board(context.resources_dir)
+    gpio_numbers = [board.get_pin(key=key).gpio_number for key in _BUS_KEYS]
+    board.close()
+    return _sysfs_toggles(_gpio_value_files(context, gpio_numbers), number=100)
+
+
+@benchmark('gpio_bus_toggle_mmap', 'toggles/s', higher_is_better=True)
+def bench_gpio_bus_toggle_mmap(context):
+    return _mmap_toggles(context, lambda board: board.select(where=lambda pin: pin.key in _BUS_KEYS))
+
+
+def _capture_rate(context, rate, duration=0.5):
+    """
+    Samples per second stored by a GPIO capture of all banks, drained from another thread
+    """
+    import threading
+    from pybone.bone.capture import GPIOCapture
+    with fixture_gpio_banks(context.scaled_dir):
+        board = _fixture_board(context.resources_dir)
+        capture = GPIOCapture(board, rate=rate, capacity=1 << 16)
+        counts = []
+        consumer = threading.Thread(target=lambda: counts.extend(len(block) for block in capture.iter_blocks()))
+        with capture:
+            consumer.start()
+            start = time.perf_counter()
+            time.sleep(duration)
+        elapsed = time.perf_counter() - start
+        consumer.join()
+        board.close()
+    return sum(counts) / elapsed
+
+
+@benchmark('capture_rate_unthrottled', 'samples/s', higher_is_better=True)
+def bench_capture_rate_unthrottled(context):
+    return _capture_rate(context, None)
+
+
+@benchmark('capture_rate_10khz', 'samples/s', higher_is_better=True)
+def bench_capture_rate_10khz(context):
+    return _capture_rate(context, 10000)
+
+
+def _read_latency(context, executor, number=200):
+    """
+    Median latency of a small sysfs-like file read, in microseconds
+    :param executor: IOExecutor, or None for the loop default executor
+    """
+    from pybone.utils import filesystem
+    path = os.path.join(context.resources_dir, 'revision')
+
+    async def measure():
+        durations = []
+        for _ in range(number):
+            start = time.perf_counter()
+            await filesystem.read_content_async(path, executor=executor)
+            durations.append(time.perf_counter() - start)
+        return statistics.median(durations)
+
+    try:
+        return asyncio.run(measure()) * 1e6
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+@benchmark('read_latency_default_executor', 'us')
+def bench_read_latency_default_executor(context):
+    return _read_latency(context, None)
+
+
+@benchmark('read_latency_io_pool', 'us')
+def bench_read_latency_io_pool(context):
+    from pybone.utils.executor import IOExecutor
+    return _read_latency(context, IOExecutor(os.cpu_count() or 1, inline_threshold=0))
+
+
+@benchmark('read_latency_io_adaptive', 'us')
+def bench_read_latency_io_adaptive(context):
+    from pybone.utils.executor import IOExecutor
+    return _read_latency(context, IOExecutor(os.cpu_count() or 1))
+
+
+def git_revision():
+    try:
+        output = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=_REPO_DIR,
+                                         stderr=subprocess.DEVNULL)
+        return output.decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scale=20, selected=None):
+    """
+    Run benchmarks
+    :param scale: lines multiplier of scaled up files
+    :param selected: names of benchmarks to run, all if None
+    :return: results dict, JSON serializable
+    """
+    context = Context(scale)
+    results = {}
+    try:
+        for (name, unit, higher_is_better, func) in BENCHMARKS:
+            if selected and name not in selected:
+                continue
+            value = func(context)
+            results[name] = {'value': value, 'unit': unit, 'higher_is_better': higher_is_better}
+            print("%-40s %14.3f %s" % (name, value, unit))
+    finally:
+        context.cleanup()
+    return {'revision': git_revision(),
+            'date': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'scale': scale,
+            'results': results}
+
+
+def compare(previous, current, threshold):
+    """
+    Print changes between two runs
+    :param threshold: relative change considered as a regression
+    :return: names of regressed benchmarks
+    """
+    regressions = []
+    print("\ncompared with revision %s" % previous.get('revision'))
+    for (name, result) in current['results'].items():
+        if name not in previous['results']:
+            continue
+        (before, after) = (previous['results'][name]['value'], result['value'])
+        ratio = after / before if before else float('inf')
+        #ratio > 1 means slower whatever the unit
+        slowdown = 1 / ratio if result['higher_is_better'] else ratio
+        flag = ''
+        if slowdown > 1 + threshold:
+            flag = 'REGRESSION'
+            regressions.append(name)
+        print("%-40s %14.3f -> %14.3f %-10s x%.2f %s" % (name, before, after, result['unit'], ratio, flag))
+    return regressions
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="pybone benchmark suite")
+    parser.add_argument('--output', help="write results to this JSON file")
+    parser.add_argument('--compare', help="compare results with this JSON file")
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help="relative slowdown reported as regression (default 0.1)")
+    parser.add_argument('--scale', type=int, default=20, help="lines multiplier of scaled up files (default 20)")
+    parser.add_argument('benchmarks', nargs='*', help="benchmarks to run, all by default")
+    args = parser.parse_args(args)
+
+    results = run(args.scale, args.benchmarks)
+    if args.output:
+        with open(args.output, 'w') as fp:
+            json.dump(results, fp, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as fp:
+            previous = json.load(fp)
+        if compare(previous, results, args.threshold):
+            return 1
+    return 0
@@ -19,13 +19,20 @@ VERSION = (0, 0, 1, 'alpha', 0)
 
 
 def _check_requirements():
-    #Check python >= 3.4
+    #Check python >= 3.7
     import sys
-    if sys.version_info < (3, 4):
-        raise ImportError("Python 3.4 or more is required")
+    if sys.version_info < (3, 7):
+        raise ImportError("Python 3.7 or more is required")
 
 _check_requirements()
 
-#setup version
-from pybone.utils.version import get_pretty_version
-version_info = get_pretty_version(VERSION)
+
+def __getattr__(name):
+    # version_info is resolved on first access: development versions run git,
+    # which must not happen each time the package is imported
+    if name == 'version_info':
+        from pybone.utils.version import get_pretty_version
+        global version_info
+        version_info = get_pretty_version(VERSION)
+        return version_info
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
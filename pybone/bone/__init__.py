@@ -25,4 +25,12 @@ def detect_platform():
         pf = Linux38Platform()
     except PlatformError:
         pf = Platform()
-    return pf
\ No newline at end of file
+    return pf
+
+
+async def detect_platform_async():
+    try:
+        pf = await Linux38Platform.create()
+    except PlatformError:
+        pf = await Platform.create()
+    return pf
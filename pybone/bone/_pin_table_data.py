@@ -0,0 +1,234 @@
+# Generated by pybone.bone.pin_table from pin_desc.py, do not edit.
+
+STRINGS = (
+    'GND', 'GPIO1_6', 'R9', 'GPMC_AD6', 'gpmc_ad6', 'mmc1_dat6',
+    'gpio1_6', 'GPIO1_7', 'T9', 'GPMC_AD7', 'gpmc_ad7', 'mmc1_dat7',
+    'gpio1_7', 'GPIO1_2', 'R8', 'GPMC_AD2', 'gpmc_ad2', 'mmc1_dat2',
+    'gpio1_2', 'GPIO1_3', 'T8', 'GPMC_AD3', 'gpmc_ad3', 'mmc1_dat3',
+    'gpio1_3', 'TIMER4', 'R7', 'GPMC_ADVn_ALE', 'gpmc_advn_ale', 'timer4',
+    'gpio2_2', 'TIMER7', 'T7', 'GPMC_OEn_REn', 'gpmc_oen_ren', 'timer7',
+    'gpio2_3', 'TIMER5', 'T6', 'GPMC_BEn0_CLE', 'gpmc_be0n_cle', 'timer5',
+    'gpio2_5', 'TIMER6', 'U6', 'GPMC_WEn', 'gpmc_wen', 'timer6',
+    'gpio2_4', 'GPIO1_13', 'R12', 'GPMC_AD13', 'gpmc_ad13', 'lcd_data18',
+    'mmc1_dat5', 'mmc2_dat1', 'eQEP2B_in', 'pr1_mii0_txd1', 'pr1_pru0_pru_r30_15', 'gpio1_13',
+    'GPIO1_12', 'T12', 'GPMC_AD12', 'gpmc_ad12', 'lcd_data19', 'mmc1_dat4',
+    'mmc2_dat0', 'eQEP2A_in', 'pr1_mii0_txd2', 'pr1_pru0_pru_r30_14', 'gpio1_12', 'EHRPWM2B',
+    'T10', 'GPMC_AD9', 'gpmc_ad9', 'lcd_data22', 'mmc1_dat1', 'mmc2_dat5',
+    'ehrpwm2B', 'pr1_mii0_col', 'gpio0_23', 'GPIO0_26', 'T11', 'GPMC_AD10',
+    'gpmc_ad10', 'lcd_data21', 'mmc2_dat6', 'ehrpwm2_tripzone_input', 'pr1_mii0_txen', 'gpio0_26',
+    'GPIO1_15', 'U13', 'GPMC_AD15', 'gpmc_ad15', 'lcd_data16', 'mmc2_dat3',
+    'eQEP2_strobe', 'pr1_ecap0_ecap_capin_apwm_o', 'pr1_pru0_pru_r31_15', 'gpio1_15', 'GPIO1_14', 'V13',
+    'GPMC_AD14', 'gpmc_ad14', 'lcd_data17', 'mmc2_dat2', 'eQEP2_index', 'pr1_mii0_txd0',
+    'pr1_pru0_pru_r31_14', 'gpio1_14', 'GPIO0_27', 'U12', 'GPMC_AD11', 'gpmc_ad11',
+    'lcd_data20', 'mmc2_dat7', 'ehrpwm0_synco', 'pr1_mii0_txd3', 'gpio0_27', 'GPIO2_1',
+    'V12', 'GPMC_CLK', 'gpmc_clk', 'lcd_memory_clk', 'gpmc_wait1', 'mmc2_clk',
+    'pr1_mii1_crs', 'pr1_mdio_mdclk', 'mcasp0_fsr', 'gpio2_1', 'EHRPWM2A', 'U10',
+    'GPMC_AD8', 'gpmc_ad8', 'lcd_data23', 'mmc1_dat0', 'mmc2_dat4', 'ehrpwm2A',
+    'pr1_mii_mt0_clk', 'gpio0_22', 'GPIO1_31', 'V9', 'GPMC_CSn2', 'gpmc_csn2',
+    'gpmc_be1n', 'mmc1_cmd', 'pr1_edio_data_in7', 'pr1_edio_data_out7', 'pr1_pru1_pru_r30_13', 'pr1_pru1_pru_r31_13',
+    'gpio1_31', 'GPIO1_30', 'U9', 'GPMC_CSn1', 'gpmc_csn1', 'mmc1_clk',
+    'pr1_edio_data_in6', 'pr1_edio_data_out6', 'pr1_pru1_pru_r30_12', 'pr1_pru1_pru_r31_12', 'gpio1_30', 'GPIO1_5',
+    'V8', 'GPMC_AD5', 'gpmc_ad5', 'gpio1_5', 'GPIO1_4', 'U8',
+    'GPMC_AD4', 'gpmc_ad4', 'gpio1_4', 'GPIO1_1', 'V7', 'GPMC_AD1',
+    'gpmc_ad1', 'gpio1_1', 'GPIO1_0', 'U7', 'GPMC_AD0', 'gpmc_ad0',
+    'gpio1_0', 'GPIO1_29', 'V6', 'GPMC_CSn0', 'gpmc_csn0', 'gpio1_29',
+    'GPIO2_22', 'U5', 'LCD_VSYNC', 'lcd_vsync', 'gpmc_a8', 'gpmc_a1',
+    'pr1_edio_data_in2', 'pr1_edio_data_out2', 'pr1_pru1_pru_r30_8', 'pr1_pru1_pru_r31_8', 'gpio2_22', 'GPIO2_24',
+    'V5', 'LCD_PCLK', 'lcd_pclk', 'gpmc_a10', 'pr1_mii0_crs', 'pr1_edio_data_in4',
+    'pr1_edio_data_out4', 'pr1_pru1_pru_r30_10', 'pr1_pru1_pru_r31_10', 'gpio2_24', 'GPIO2_23', 'R5',
+    'LCD_HSYNC', 'lcd_hsync', 'gpmc_a9', 'gpmc_a2', 'pr1_edio_data_in3', 'pr1_edio_data_out3',
+    'pr1_pru1_pru_r30_9', 'pr1_pru1_pru_r31_9', 'gpio2_23', 'GPIO2_25', 'R6', 'LCD_AC_BIAS_EN',
+    'lcd_ac_bias_en', 'gpmc_a11', 'pr1_edio_data_in5', 'pr1_edio_data_out5', 'pr1_pru1_pru_r30_11', 'pr1_pru1_pru_r31_11',
+    'gpio2_25', 'UART5_CTSN', 'V4', 'LCD_DATA14', 'lcd_data14', 'gpmc_a18',
+    'eQEP1_index', 'mcasp0_axr1', 'uart5_rxd', 'pr1_mii_mr0_clk', 'uart5_ctsn', 'gpio0_10',
+    'UART5_RTSN', 'T5', 'LCD_DATA15', 'lcd_data15', 'gpmc_a19', 'eQEP1_strobe',
+    'mcasp0_ahclkx', 'mcasp0_axr3', 'pr1_mii0_rxdv', 'uart5_rtsn', 'gpio0_11', 'UART4_RTSN',
+    'V3', 'LCD_DATA13', 'lcd_data13', 'gpmc_a17', 'eQEP1B_in', 'pr1_mii0_rxer',
+    'uart4_rtsn', 'gpio0_9', 'UART3_RTSN', 'U4', 'LCD_DATA11', 'lcd_data11',
+    'gpmc_a15', 'ehrpwm1B', 'mcasp0_ahclkr', 'mcasp0_axr2', 'pr1_mii0_rxd0', 'uart3_rtsn',
+    'gpio2_17', 'UART4_CTSN', 'V2', 'LCD_DATA12', 'lcd_data12', 'gpmc_a16',
+    'eQEP1A_in', 'mcasp0_aclkr', 'pr1_mii0_rxlink', 'uart4_ctsn', 'gpio0_8', 'UART3_CTSN',
+    'U3', 'LCD_DATA10', 'lcd_data10', 'gpmc_a14', 'ehrpwm1A', 'mcasp0_axr0',
+    'pr1_mii0_rxd1', 'uart3_ctsn', 'gpio2_16', 'UART5_TXD', 'U1', 'LCD_DATA8',
+    'lcd_data8', 'gpmc_a12', 'ehrpwm1_tripzone_input', 'mcasp0_aclkx', 'uart5_txd', 'pr1_mii0_rxd3',
+    'uart2_ctsn', 'gpio2_14', 'UART5_RXD', 'U2', 'LCD_DATA9', 'lcd_data9',
+    'gpmc_a13', 'mcasp0_fsx', 'pr1_mii0_rxd2', 'uart2_rtsn', 'gpio2_15', 'GPIO2_12',
+    'T3', 'LCD_DATA6', 'lcd_data6', 'gpmc_a6', 'pr1_pru1_pru_r30_6', 'pr1_pru1_pru_r31_6',
+    'gpio2_12', 'GPIO2_13', 'T4', 'LCD_DATA7', 'lcd_data7', 'gpmc_a7',
+    'pr1_pru1_pru_r30_7', 'pr1_pru1_pru_r31_7', 'gpio2_13', 'GPIO2_10', 'T1', 'LCD_DATA4',
+    'lcd_data4', 'gpmc_a4', 'pr1_pru1_pru_r30_4', 'pr1_pru1_pru_r31_4', 'gpio2_10', 'GPIO2_11',
+    'T2', 'LCD_DATA5', 'lcd_data5', 'gpmc_a5', 'pr1_pru1_pru_r30_5', 'pr1_pru1_pru_r31_5',
+    'gpio2_11', 'GPIO2_8', 'R3', 'LCD_DATA2', 'lcd_data2', 'pr1_pru1_pru_r30_2',
+    'pr1_pru1_pru_r31_2', 'gpio2_8', 'GPIO2_9', 'R4', 'LCD_DATA3', 'lcd_data3',
+    'gpmc_a3', 'pr1_pru1_pru_r30_3', 'pr1_pru1_pru_r31_3', 'gpio2_9', 'GPIO2_6', 'R1',
+    'LCD_DATA0', 'lcd_data0', 'gpmc_a0', 'pr1_pru1_pru_r30_0', 'pr1_pru1_pru_r31_0', 'gpio2_6',
+    'GPIO2_7', 'R2', 'LCD_DATA1', 'lcd_data1', 'pr1_pru1_pru_r30_1', 'pr1_pru1_pru_r31_1',
+    'gpio2_7', 'DC_3.3V', 'VDD_5V', 'SYS_5V', 'PWR_BUT', 'SYS_RESETn',
+    'A10', 'WARMRSTn', 'nRESETIN_OUT', 'UART4_RXD', 'T17', 'GPMC_WAIT0',
+    'gpmc_wait0', 'gmii2_crs', 'gpmc_csn4', 'rmii2_crs_dv', 'mmc1_sdcd', 'pr1_mii1_col',
+    'uart4_rxd', 'gpio0_30', 'GPIO1_28', 'U18', 'GPMC_BEn1', 'gmii2_col',
+    'gpmc_csn6', 'gpmc_dir', 'pr1_mii1_rxlink', 'gpio1_28', 'UART4_TXD', 'U17',
+    'GPMC_WPn', 'gpmc_wpn', 'gmii2_rxerr', 'gpmc_csn5', 'rmii2_rxerr', 'mmc2_sdcd',
+    'pr1_mii1_txen', 'uart4_txd', 'gpio0_31', 'EHRPWM1A', 'U14', 'GPMC_A2',
+    'gmii2_txd3', 'rgmii2_td3', 'pr1_mii1_txd2', 'gpio1_18', 'GPIO1_16', 'R13',
+    'GPMC_A0', 'gmii2_txen', 'rgmii2_tctl', 'rmii2_txen', 'pr1_mii_mt1_clk', 'gpio1_16',
+    'EHRPWM1B', 'T14', 'GPMC_A3', 'gmii2_txd2', 'rgmii2_td2', 'pr1_mii1_txd1',
+    'gpio1_19', 'I2C1_SCL', 'A16', 'SPI0_CS0', 'spi0_cs0', 'mmc2_sdwp',
+    'ehrpwm0_synci', 'pr1_uart0_txd', 'pr1_edio_data_in1', 'pr1_edio_data_out1', 'gpio0_5', 'I2C1_SDA',
+    'B16', 'SPI0_D1', 'spi0_d1', 'mmc1_sdwp', 'ehrpwm0_tripzone_input', 'pr1_uart0_rxd',
+    'pr1_edio_data_in0', 'pr1_edio_data_out0', 'gpio0_4', 'I2C2_SCL', 'D17', 'UART1_RTSn',
+    'uart1_rtsn', 'dcan0_rx', 'spi1_cs1', 'pr1_uart0_rts_n', 'pr1_edc_latch1_in', 'gpio0_13',
+    'I2C2_SDA', 'D18', 'UART1_CTSn', 'uart1_ctsn', 'dcan0_tx', 'spi1_cs0',
+    'pr1_uart0_cts_n', 'pr1_edc_latch0_in', 'gpio0_12', 'UART2_TXD', 'B17', 'SPI0_D0',
+    'spi0_d0', 'uart2_txd', 'ehrpwm0B', 'pr1_edio_latch_in', 'EMU3', 'gpio0_3',
+    'UART2_RXD', 'A17', 'SPI0_SCLK', 'spi0_sclk', 'uart2_rxd', 'ehrpwm0A',
+    'pr1_edio_sof', 'EMU2', 'gpio0_2', 'GPIO1_17', 'V14', 'GPMC_A1',
+    'gmii2_rxdv', 'rgmii2_rctl', 'pr1_mii1_txd3', 'gpio1_17', 'UART1_TXD', 'D15',
+    'uart1_txd', 'dcan1_rx', 'pr1_pru0_pru_r31_16', 'gpio0_15', 'GPIO3_21', 'A14',
+    'MCASP0_AHCLKX', 'eQEP0_strobe', 'mcasp1_axr1', 'EMU4', 'pr1_pru0_pru_r30_7', 'pr1_pru0_pru_r31_7',
+    'gpio3_21', 'UART1_RXD', 'D16', 'uart1_rxd', 'dcan1_tx', 'pr1_pru1_pru_r31_16',
+    'gpio0_14', 'GPIO3_19', 'C13', 'MCASP0_FSR', 'eQEP0B_in', 'mcasp1_fsx',
+    'pr1_pru0_pru_r30_5', 'pr1_pru0_pru_r31_5', 'gpio3_19', 'SPI1_CS0', 'C12', 'MCASP0_AHCLKR',
+    'eCAP2_in_PWM2_out', 'pr1_pru0_pru_r30_3', 'pr1_pru0_pru_r31_3', 'gpio3_17', 'SPI1_D0', 'B13',
+    'MCASP0_FSX', 'spi1_d0', 'pr1_pru0_pru_r30_1', 'pr1_pru0_pru_r31_1', 'gpio3_15', 'SPI1_D1',
+    'D12', 'MCASP0_AXR0', 'spi1_d1', 'pr1_pru0_pru_r30_2', 'pr1_pru0_pru_r31_2', 'gpio3_16',
+    'SPI1_SCLK', 'A13', 'MCASP0_ACLKX', 'spi1_sclk', 'mmc0_sdcd', 'pr1_pru0_pru_r30_0',
+    'pr1_pru0_pru_r31_0', 'gpio3_14', 'VADC', 'AIN4', 'C8', 'AGND',
+    'AIN8', 'A8', 'AIN5', 'B8', 'AIN2', 'B7',
+    'AIN3', 'A7', 'AIN0', 'B6', 'AIN1', 'C7',
+    'CLKOUT2', 'D14', 'XDMA_EVENT_INTR1', 'xdma_event_intr1', 'tclkin', 'clkout2',
+    'gpio0_20', 'GPIO3_20', 'D13', 'MCASP0_AXR1', 'eQEP0_index', 'mcasp1_axr0',
+    'pr1_pru0_pru_r30_6', 'pr1_pru0_pru_r31_6', 'gpio3_20', 'GPIO0_7', 'C18', 'ECAP0_IN_PWM0_OUT',
+    'eCAP0_in_PWM0_out', 'uart3_txd', 'mmc0_sdwp', 'xdma_event_intr2', 'gpio0_7', 'GPIO3_18',
+    'B12', 'MCASP0_ACLKR', 'eQEP0A_in', 'mcasp1_aclkx', 'pr1_pru0_pru_r30_4', 'pr1_pru0_pru_r31_4',
+    'gpio3_18',
+)
+
+DRIVER_PIN = (
+    -1, -1, 6, 7, 2, 3, 36, 37, 39, 38, 13, 12, 9, 10, 15, 14, 11, 35, 8, 33,
+    32, 5, 4, 1, 0, 31, 56, 58, 57, 59, 54, 55, 53, 51, 52, 50, 48, 49, 46, 47,
+    44, 45, 42, 43, 40, 41, -1, -1, -1, -1, -1, -1, -1, -1, -1, 110, 28, 30, 29, 18,
+    16, 19, 87, 86, 95, 94, 85, 84, 17, 97, 107, 96, 105, 103, 101, 102, 100, -1, -1, -1,
+    -1, -1, -1, -1, -1, -1, 109, 106, 89, 104, -1, -1, -1, -1,
+)
+
+GPIO_CHIP = (
+    -1, -1, 1, 1, 1, 1, 2, 2, 2, 2, 1, 1, 0, 0, 1, 1, 0, 2, 0, 1,
+    1, 1, 1, 1, 1, 1, 2, 2, 2, 2, 0, 0, 0, 2, 0, 2, 2, 2, 2, 2,
+    2, 2, 2, 2, 2, 2, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 0, 1, 0, 1,
+    1, 1, 0, 0, 0, 0, 0, 0, 1, 0, 3, 0, 3, 3, 3, 3, 3, -1, -1, -1,
+    -1, -1, -1, -1, -1, -1, 0, 3, 0, 3, -1, -1, -1, -1,
+)
+
+GPIO_NUMBER = (
+    -1, -1, 38, 39, 34, 35, 66, 67, 69, 68, 45, 44, 23, 26, 47, 46, 27, 65, 22, 63,
+    62, 37, 36, 33, 32, 61, 86, 88, 87, 89, 10, 11, 9, 81, 8, 80, 78, 79, 76, 77,
+    74, 75, 72, 73, 70, 71, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 30, 60, 31, 50,
+    48, 51, 5, 4, 13, 12, 3, 2, 49, 15, 117, 14, 115, 113, 111, 112, 110, -1, -1, -1,
+    -1, -1, -1, -1, -1, -1, 20, 116, 7, 114, -1, -1, -1, -1,
+)
+
+HEAD_NAME = (
+    0, 0, 1, 7, 13, 19, 25, 31, 37, 43, 49, 60, 71, 81, 90, 100, 110, 119, 130, 140,
+    151, 161, 166, 171, 176, 181, 186, 197, 208, 219, 229, 240, 251, 260, 271, 281, 291, 302, 311, 319,
+    327, 335, 343, 350, 358, 366, 0, 0, 373, 373, 374, 374, 375, 375, 376, 377, 381, 392, 400, 411,
+    418, 426, 433, 443, 453, 462, 471, 480, 489, 496, 502, 511, 517, 525, 532, 539, 546, 554, 555, 557,
+    558, 560, 562, 564, 566, 568, 570, 577, 585, 593, 0, 0, 0, 0,
+)
+
+HEAD_PIN = (
+    1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20,
+    21, 22, 23, 24, 25, 26, 27, 28, 29, 30, 31, 32, 33, 34, 35, 36, 37, 38, 39, 40,
+    41, 42, 43, 44, 45, 46, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14,
+    15, 16, 17, 18, 19, 20, 21, 22, 23, 24, 25, 26, 27, 28, 29, 30, 31, 32, 33, 34,
+    35, 36, 37, 38, 39, 40, 411, 412, 421, 422, 43, 44, 45, 46,
+)
+
+HEADER = (
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,
+    1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,
+    1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,
+)
+
+NOTES = (
+    0, 0, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1,
+    -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1,
+    -1, -1, -1, -1, -1, -1, 0, 0, 373, 373, 374, 374, 375, 375, 376, -1, -1, -1, -1, -1,
+    -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1,
+    -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1,
+)
+
+PROC_PIN = (
+    -1, -1, 2, 8, 14, 20, 26, 32, 38, 44, 50, 61, 72, 82, 91, 101, 111, 120, 131, 141,
+    152, 162, 167, 172, 177, 182, 187, 198, 209, 220, 230, 241, 252, 261, 272, 282, 292, 303, 312, 320,
+    328, 336, 344, 351, 359, 367, -1, -1, -1, -1, -1, -1, -1, -1, -1, 378, 382, 393, 401, 412,
+    419, 427, 434, 444, 454, 463, 472, 481, 490, 497, 503, 512, 518, 526, 533, 540, 547, -1, 556, -1,
+    559, 561, 563, 565, 567, 569, 571, 578, 586, 594, -1, -1, -1, -1,
+)
+
+PROC_PIN_NAME = (
+    -1, -1, 3, 9, 15, 21, 27, 33, 39, 45, 51, 62, 73, 83, 92, 102, 112, 121, 132, 142,
+    153, 163, 168, 173, 178, 183, 188, 199, 210, 221, 231, 242, 253, 262, 273, 283, 293, 304, 313, 321,
+    329, 337, 345, 352, 360, 368, -1, -1, -1, -1, -1, -1, -1, -1, -1, 379, 383, 394, 402, 413,
+    420, 428, 435, 445, 455, 464, 473, 482, 491, 173, 504, 511, 519, 527, 534, 541, 548, -1, 555, -1,
+    558, 560, 562, 564, 566, 568, 572, 579, 587, 595, -1, -1, -1, -1,
+)
+
+PROC_SIGNAL_NAME = (
+    -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 4, 5, -1, -1,
+    -1, -1, -1, 6, 10, 11, -1, -1, -1, -1, -1, 12, 16, 17, -1, -1, -1, -1, -1, 18,
+    22, 23, -1, -1, -1, -1, -1, 24, 28, -1, 29, -1, -1, -1, -1, 30, 34, -1, 35, -1,
+    -1, -1, -1, 36, 40, -1, 41, -1, -1, -1, -1, 42, 46, -1, 47, -1, -1, -1, -1, 48,
+    52, 53, 54, 55, 56, 57, 58, 59, 63, 64, 65, 66, 67, 68, 69, 70, 74, 75, 76, 77,
+    78, 79, -1, 80, 84, 85, 17, 86, 87, 88, -1, 89, 93, 94, 11, 95, 96, 97, 98, 99,
+    103, 104, 5, 105, 106, 107, 108, 109, 113, 114, 23, 115, 116, 117, -1, 118, 122, 123, 124, 125,
+    126, 127, 128, 129, 133, 134, 135, 136, 137, 138, -1, 139, 143, 144, 145, 146, 147, 148, 149, 150,
+    154, 122, 155, 156, 157, 158, 159, 160, 164, 54, -1, -1, -1, -1, -1, 165, 169, 65, -1, -1,
+    -1, -1, -1, 170, 174, 76, -1, -1, -1, -1, -1, 175, 179, 135, -1, -1, -1, -1, -1, 180,
+    184, -1, -1, -1, -1, -1, -1, 185, 189, 190, 191, 192, 193, 194, 195, 196, 200, 201, 202, 203,
+    204, 205, 206, 207, 211, 212, 213, 214, 215, 216, 217, 218, 222, 223, 126, 224, 225, 226, 227, 228,
+    232, 233, 234, 235, 236, 237, 238, 239, 243, 244, 245, 246, 247, 248, 249, 250, 254, 255, 256, 128,
+    247, 257, 258, 259, 263, 264, 265, 266, 267, 268, 269, 270, 274, 275, 276, 277, 267, 278, 279, 280,
+    284, 285, 286, 287, -1, 288, 289, 290, 294, 295, 296, 297, 298, 299, 300, 301, 305, 306, 116, 307,
+    236, 308, 309, 310, 314, 315, 156, 106, 157, 316, 317, 318, 322, 323, 146, 96, 147, 324, 325, 326,
+    330, 331, 57, 67, -1, 332, 333, 334, 338, 339, 107, 56, -1, 340, 341, 342, 346, 213, 117, 87,
+    -1, 347, 348, 349, 353, 354, 68, 116, -1, 355, 356, 357, 361, 362, 138, 137, -1, 363, 364, 365,
+    369, 191, 88, 78, -1, 370, 371, 372, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1,
+    -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1,
+    -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1,
+    -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1,
+    380, -1, -1, -1, -1, -1, -1, -1, 384, 385, 386, 387, 388, 389, 390, 391, 144, 395, 396, 95,
+    397, 398, 277, 399, 403, 404, 405, 406, 407, 408, 409, 410, 213, 414, 415, 55, 233, 416, 286, 417,
+    362, 421, 422, 423, 275, 424, 296, 425, 354, 429, 430, 105, 244, 431, 265, 432, 436, 437, 433, 438,
+    439, 440, 441, 442, 446, 447, 443, 448, 449, 450, 451, 452, 456, 41, 457, 453, 458, 459, 460, 461,
+    465, 47, 466, 462, 467, 468, 469, 470, 474, 475, 453, 476, 459, 477, 478, 479, 483, 484, 462, 485,
+    468, 486, 487, 488, 191, 492, 493, 66, 255, 494, 116, 495, 498, 437, 499, 433, -1, 439, 500, 501,
+    246, 505, 247, 506, 507, 508, 509, 510, 513, 447, 514, 443, -1, 449, 515, 516, 128, 520, 247, 521,
+    487, 522, 523, 524, 266, 438, 267, 467, 528, 529, 530, 531, 307, 476, -1, 535, 388, 536, 537, 538,
+    287, 448, -1, 542, 407, 543, 544, 545, 297, 485, -1, 549, 550, 551, 552, 553, -1, -1, -1, -1,
+    -1, -1, -1, -1, 555, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1,
+    558, -1, -1, -1, -1, -1, -1, -1, 560, -1, -1, -1, -1, -1, -1, -1, 562, -1, -1, -1,
+    -1, -1, -1, -1, 564, -1, -1, -1, -1, -1, -1, -1, 566, -1, -1, -1, -1, -1, -1, -1,
+    568, -1, -1, -1, -1, -1, -1, -1, 573, -1, 574, 575, 35, 500, 478, 576, 235, 580, -1, 581,
+    478, 582, 583, 584, 588, 589, 458, 97, 549, 590, 591, 592, 277, 596, 267, 597, 590, 598, 599, 600,
+    -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1,
+    -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1,
+)
+
+REG_OFFSET = (
+    -1, -1, 2072, 2076, 2056, 2060, 2192, 2196, 2204, 2200, 2100, 2096, 2084, 2088, 2108, 2104, 2092, 2188, 2080, 2180,
+    2176, 2068, 2064, 2052, 2048, 2172, 2272, 2280, 2276, 2284, 2264, 2268, 2260, 2252, 2256, 2248, 2240, 2244, 2232, 2236,
+    2224, 2228, 2216, 2220, 2208, 2212, -1, -1, -1, -1, -1, -1, -1, -1, -1, 2488, 2160, 2168, 2164, 2120,
+    2112, 2124, 2396, 2392, 2428, 2424, 2388, 2384, 2116, 2436, 2476, 2432, 2468, 2460, 2452, 2456, 2448, -1, -1, -1,
+    -1, -1, -1, -1, -1, -1, 2484, 2472, 2404, 2464, -1, -1, -1, -1,
+)
+
+RESET_MODE = (
+    -1, -1, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7,
+    7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7,
+    7, 7, 7, 7, 7, 7, -1, -1, -1, -1, -1, -1, -1, -1, -1, 0, 7, 7, 7, 7,
+    7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, -1, 0, -1,
+    0, 0, 0, 0, 0, 0, 7, 7, 7, 7, -1, -1, -1, -1,
+)
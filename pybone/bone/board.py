@@ -16,11 +16,21 @@
 # along with Pybone.  If not, see <http://www.gnu.org/licenses/>.
 
 import asyncio
+import bisect
+import itertools
 import logging
+import operator
+import struct
+import threading
+import time
+from collections import namedtuple
 from enum import Enum
 
-from .pin_desc import BBB_P8_DEF, BBB_P9_DEF
-from .pin import Pin
+from pybone.utils.loop import run_sync
+from .pin_table import load_pin_table
+from .gpio import EdgeWatcher, GPIO_BANK_COUNT, GPIO_BANK_WIDTH
+from .pin import Pin, PinDefinition, PinChange
+from .pinset import PinSet
 
 
 LOGGER = logging.getLogger(__name__)
@@ -32,108 +42,786 @@ class Header(Enum):
     board = 'board'
 
 
+_INDEXED_ATTRIBUTES = ('header', 'driver_pin', 'address', 'gpio_number', 'key')
+
+#Board.find_signal() result : pin able to carry signal in mux mode, selected if the pin is
+#currently in this mode, owner is the pin mux owner if claimed
+SignalMatch = namedtuple('SignalMatch', ('pin', 'mode', 'signal', 'selected', 'owner'))
+
+
+_GPIO_BITS = GPIO_BANK_COUNT * GPIO_BANK_WIDTH
+_GPIO_BANKS_WORDS = struct.Struct('<%dI' % GPIO_BANK_COUNT)
+_GPIO_BITS_FORMAT = '0%db' % _GPIO_BITS
+_BINARY_DIGITS = bytes.maketrans(b'01', b'\x00\x01')
+
+
+class _PinDefinitions(object):
+    """
+    Pins static definitions and lookup indexes, shared by all boards.
+    Each index maps an attribute value to the tuple of positions of the pins having
+    this value, in board pins order. Pins with a None attribute are not indexed.
+    """
+    def __init__(self, pin_table):
+        definitions = []
+        for header in (Header.p8, Header.p9):
+            for index in pin_table.indexes(header.value):
+                pin_def = pin_table.definition(index)
+                pin_def['header'] = header
+                definitions.append(PinDefinition(pin_def))
+        self.definitions = tuple(definitions)
+
+        indexes = {name: {} for name in _INDEXED_ATTRIBUTES}
+        for (position, definition) in enumerate(self.definitions):
+            for name in _INDEXED_ATTRIBUTES:
+                value = getattr(definition, name)
+                if value is not None:
+                    indexes[name].setdefault(value, []).append(position)
+        self.indexes = {name: {value: tuple(positions) for value, positions in index.items()}
+                        for name, index in indexes.items()}
+        #membership tests for combined queries, small tuples are scanned faster than hashed
+        self.index_sets = {name: {value: (frozenset(positions) if len(positions) > 4 else positions)
+                                  for value, positions in index.items()}
+                           for name, index in self.indexes.items()}
+        self.address_positions = {address: positions[0] for address, positions in self.indexes['address'].items()}
+        self.key_positions = {key: positions[0] for key, positions in self.indexes['key'].items()}
+        #PinSet masks, see mask()
+        self.full_mask = (1 << len(self.definitions)) - 1
+        self._masks = {}
+        #(gpio_chip, bit in bank) of each pin, None for pins without GPIO
+        self.gpio_bits = tuple(None if definition.gpio_number is None else
+                               (definition.gpio_chip, definition.gpio_number % 32)
+                               for definition in self.definitions)
+        #index of each pin level in decode_gpio_levels() digits, pins without GPIO get the trailing None
+        self._gpio_levels = operator.itemgetter(*(_GPIO_BITS if bits is None else
+                                                  _GPIO_BITS - 1 - (bits[0] * GPIO_BANK_WIDTH + bits[1])
+                                                  for bits in self.gpio_bits))
+
+        #processor signals inverted index, lowercase signal name to ((position, mode), ...)
+        signals = {}
+        for (position, definition) in enumerate(self.definitions):
+            for (mode, signal) in enumerate(definition.proc_signal_name or ()):
+                if signal:
+                    signals.setdefault(signal.lower(), []).append((position, mode))
+        self.signals = {name: tuple(pins) for (name, pins) in signals.items()}
+        #sorted, for prefix searches
+        self.signal_names = tuple(sorted(self.signals))
+
+    def find_signal(self, signal, prefix=False):
+        """
+        Find pins able to carry a processor signal
+        :param signal: signal name, case insensitive
+        :param prefix: find signals starting with signal
+        :return: sequence of (position, mode) tuples
+        """
+        signal = signal.lower()
+        if not prefix:
+            return self.signals.get(signal, ())
+        names = self.signal_names
+        found = []
+        for index in range(bisect.bisect_left(names, signal), len(names)):
+            if not names[index].startswith(signal):
+                break
+            found.extend(self.signals[names[index]])
+        return found
+
+    def decode_gpio_levels(self, words):
+        """
+        Decode GPIO banks input levels into pins levels. All banks are decoded at once, by C level
+        operations : banks words are joined in an int, formatted in binary, and its digits are picked
+        :param words: DATAIN word of each bank, in gpio_chip order
+        :return: tuple of levels, 0 or 1, in pins order, None for pins without GPIO
+        """
+        value = int.from_bytes(_GPIO_BANKS_WORDS.pack(*words), 'little')
+        return self._gpio_levels((*format(value, _GPIO_BITS_FORMAT).encode().translate(_BINARY_DIGITS), None))
+
+    def mask(self, name, value):
+        """
+        Get the bitmask of the positions of pins having an attribute value
+        :param name: indexed attribute name
+        :param value: attribute value
+        :return: int mask, bit n set for the pin at position n
+        """
+        key = (name, value)
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = 0
+            for position in self.indexes[name].get(value, ()):
+                mask |= 1 << position
+            self._masks[key] = mask
+        return mask
+
+
+_pin_definitions = None
+
+
+def _load_pin_definitions():
+    """
+    Get pins static definitions, loading them on first call
+    :return: _PinDefinitions instance
+    """
+    global _pin_definitions
+    if _pin_definitions is None:
+        _pin_definitions = _PinDefinitions(load_pin_table())
+    return _pin_definitions
+
+
+class _RefreshFlight(object):
+    """
+    Pins update in flight, shared by threads and coroutines refreshing a board at the same time
+    """
+    #seconds between checks of the update loop, while a thread waits
+    POLL_INTERVAL = 0.1
+
+    def __init__(self, loop):
+        """
+        :param loop: event loop running the update, None if run by a thread
+        """
+        self.loop = loop
+        self.task = None
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._waiters = []
+        self._changes = []
+        self._error = None
+
+    def finish(self, changes, error):
+        with self._lock:
+            (self._changes, self._error) = (changes, error)
+            self._done.set()
+            (waiters, self._waiters) = (self._waiters, [])
+        for (loop, future) in waiters:
+            try:
+                loop.call_soon_threadsafe(self._resolve, future)
+            except RuntimeError:
+                LOGGER.debug("Board refresh waiter loop is closed")
+
+    def result(self):
+        if self._error is not None:
+            raise self._error
+        return self._changes
+
+    def _resolve(self, future):
+        if future.done():
+            return
+        if isinstance(self._error, asyncio.CancelledError):
+            future.cancel()
+        elif self._error is not None:
+            future.set_exception(self._error)
+        else:
+            future.set_result(self._changes)
+
+    def wait(self):
+        """
+        Wait for the update end, from a thread
+        :return: True when the update ended, False if its loop stopped before
+        """
+        while not self._done.wait(self.POLL_INTERVAL):
+            if self.loop is not None and not self.loop.is_running():
+                return self._done.is_set()
+        return True
+
+    def wait_async(self, loop):
+        """
+        :return: future of the update changes, resolved in loop
+        """
+        future = loop.create_future()
+        with self._lock:
+            if not self._done.is_set():
+                self._waiters.append((loop, future))
+                return future
+        self._resolve(future)
+        return future
+
+
+class _PinChangesWatcher(object):
+    """
+    Asynchronous iterator on board pins changes, see Board.watch()
+    """
+    def __init__(self, board, maxsize):
+        self._board = board
+        self._loop = asyncio.get_running_loop()
+        #bounded by _put(), so the end of iteration sentinel always fits
+        self._queue = asyncio.Queue()
+        self._maxsize = maxsize
+        self._closed = False
+        #subscribed now, not on first iteration, so no change is missed
+        board.subscribe(self._on_changes)
+
+    def _put(self, changes):
+        if self._closed:
+            return
+        for change in changes:
+            if self._maxsize and self._queue.qsize() >= self._maxsize:
+                LOGGER.warning("Pins changes watcher is full, dropping change %r" % change)
+            else:
+                self._queue.put_nowait(change)
+
+    def _on_changes(self, changes):
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self._loop:
+            self._put(changes)
+        else:
+            try:
+                self._loop.call_soon_threadsafe(self._put, changes)
+            except RuntimeError:
+                LOGGER.debug("Pins changes watcher loop is closed")
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._closed:
+            raise StopAsyncIteration
+        change = await self._queue.get()
+        if change is None:
+            #wakes other pending iterations too
+            self._queue.put_nowait(None)
+            raise StopAsyncIteration
+        return change
+
+    async def aclose(self):
+        """
+        Stop recording changes, and end iterations, including pending ones
+        """
+        if not self._closed:
+            self._closed = True
+            self._board.unsubscribe(self._on_changes)
+            self._queue.put_nowait(None)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+
 class Board(object):
 
     def __init__(self, runtime_platform, loop=None):
+        """
+        Create board, reading its informations from platform.
+        From a running event loop, use Board.create() instead.
+        :param runtime_platform: platform the board is running
+        :param loop: event loop used to read platform, a private loop is used if None
+        """
+        self._init_pins(runtime_platform)
+        run_sync(self._load(), loop)
+
+    def _init_pins(self, runtime_platform):
         self.platform = runtime_platform
-        if loop is None:
-            self._loop = asyncio.get_event_loop()
-        else:
-            self._loop = loop
-        (self.name, self.revision, self.serial_number) = self.platform.read_board_info(loop)
-        self.pins = [pin for pin in self._load_pins(Header.p8)]
-        self.pins += [pin for pin in self._load_pins(Header.p9)]
-        self.update_pins_runtime_attributes()
-
-    def _load_pins(self, header):
-        """
-        Load pin_desc and create Pin instance for the given header
-        :param header: pin header to load (P8 or P9)
-        :return: Pin instance generator
-        """
-        if header is Header.p8:
-            definitions = BBB_P8_DEF
-        elif header is Header.p9:
-            definitions = BBB_P9_DEF
-        else:
-            return None
-        for pin_def in definitions:
-            pin_def['header'] = header
-            yield Pin(self, pin_def)
+        #time.monotonic() of last pins runtime update
+        self.refresh_time = None
+        #incremented each time changed pins are published
+        self.generation = 0
+        #in-flight update, shared by concurrent callers from threads and coroutines
+        self._refresh_lock = threading.Lock()
+        self._refresh_flight = None
+        #callbacks notified of pins changes
+        self._subscribers = []
+        self._monitor_task = None
+        #current monitor polling interval, in seconds
+        self.monitor_interval = None
+        #GPIO edge watchers, by (event loop, GPIO number)
+        self._edge_watchers = {}
+        #serializes pins updates, readers don't lock
+        self._publish_lock = threading.Lock()
+        self._definitions = _load_pin_definitions()
+        #replaced as a whole on updates, see _publish_pins()
+        self.pins = tuple(Pin(self, definition) for definition in self._definitions.definitions)
+
+    @classmethod
+    async def create(cls, runtime_platform):
+        """
+        Create board from a running event loop. Board informations and pins runtime
+        configuration are read concurrently.
+        :param runtime_platform: platform the board is running
+        :return: Board instance
+        """
+        board = cls.__new__(cls)
+        board._init_pins(runtime_platform)
+        await board._load()
+        return board
+
+    @classmethod
+    def from_snapshot(cls, runtime_platform, snapshot):
+        """
+        Create board from a snapshot, without reading platform. Pins runtime configuration
+        is the one at the time the snapshot was taken, see refresh_time.
+        :param runtime_platform: platform the board is running, its files are set from snapshot
+        :param snapshot: BoardSnapshot instance
+        :return: Board instance
+        """
+        board = cls.__new__(cls)
+        board._init_pins(runtime_platform)
+        if snapshot.pin_count != len(board.pins):
+            raise ValueError("Snapshot has %d pins, expected %d" % (snapshot.pin_count, len(board.pins)))
+        identity = snapshot.identity
+        (board.name, board.revision, board.serial_number) = identity[:3]
+        for (name, value) in zip(getattr(runtime_platform, 'FILES', ()), identity[3:]):
+            setattr(runtime_platform, name, value)
+        board.pins = tuple(pin.replace(snapshot.register(position), snapshot.owners(position))
+                           for (position, pin) in enumerate(board.pins))
+        board.refresh_time = snapshot.refresh_time or None
+        return board
+
+    async def _load(self):
+        (board_info, registers, owners) = await asyncio.gather(self.platform.read_board_info_async(),
+                                                               self.platform.read_pins_registers(),
+                                                               self.platform.read_pinmux_owners())
+        (self.name, self.revision, self.serial_number) = board_info
+        await self._update_pins_runtime(registers, owners)
 
     def iter_p8_pins(self):
         """
         Iterates on P8 header pins
         :return: iterator on P8 header pins
         """
-        yield self.iter_pins(Header.p8)
+        return self.iter_pins(Header.p8)
 
     def iter_p9_pins(self):
         """
         Iterates on P9 header pins
-        :return: iterator on P8 header pins
+        :return: iterator on P9 header pins
         """
-        yield self.iter_pins(Header.p9)
+        return self.iter_pins(Header.p9)
 
-    def iter_pins(self, header=None, driver_pin=None, address=None):
+    def iter_pins(self, header=None, driver_pin=None, address=None, gpio_number=None, key=None):
         """
         Iter pins matching criterias (AND)
         :param header: pin header
         :param driver_pin: driver pin
         :param address: pin address
+        :param gpio_number: GPIO number
+        :param key: pin key (like P8_3)
         :return: iteretor on pin matching given criterias
         """
-        for pin in self.pins:
-            if header is not None and pin.header != header:
-                continue
-            if driver_pin is not None and pin.driver_pin != driver_pin:
-                continue
-            if address is not None and pin.address != address:
-                continue
-            yield pin
+        criterias = [(name, value) for (name, value) in (('header', header),
+                                                         ('driver_pin', driver_pin),
+                                                         ('address', address),
+                                                         ('gpio_number', gpio_number),
+                                                         ('key', key)) if value is not None]
+        if not criterias:
+            return iter(self.pins)
+        pins = self.pins
+        indexes = self._definitions.indexes
+        if len(criterias) == 1:
+            (name, value) = criterias[0]
+            return (pins[position] for position in indexes[name].get(value, ()))
+        #Intersect indexes, starting from the smallest candidates list
+        candidates = sorted(((indexes[name].get(value, ()), name, value) for (name, value) in criterias),
+                            key=lambda c: len(c[0]))
+        (positions, name, value) = candidates[0]
+        index_sets = self._definitions.index_sets
+        others = [index_sets[name].get(value, ()) for (_, name, value) in candidates[1:]]
+        return (pins[position] for position in positions if all(position in other for other in others))
 
-    def get_pin(self, header=None, driver_pin=None, address=None):
+    def get_pin(self, header=None, driver_pin=None, address=None, gpio_number=None, key=None):
         """
         Get first pin match the given criterias
         :param header: pin header
         :param driver_pin: driver pin
         :param address: pin address
+        :param gpio_number: GPIO number
+        :param key: pin key (like P8_3)
         :return: first pin matching criterias
         """
+        pin = next(self.iter_pins(header, driver_pin, address, gpio_number, key), None)
+        if pin is None:
+            LOGGER.debug("No pin matching args header=%r, driver_pin=%r, address=%r, gpio_number=%r, key=%r" %
+                         (header, driver_pin, address, gpio_number, key))
+        return pin
+
+    def find_signal(self, signal, prefix=False, available=False):
+        """
+        Find pins able to carry a processor signal, like 'uart1_txd', with their current mux state
+        :param signal: signal name, case insensitive
+        :param prefix: find all signals starting with signal, like 'ehrpwm1'
+        :param available: only return pins whose mux isn't claimed by a driver
+        :return: list of SignalMatch
+        """
+        pins = self.pins
+        matches = []
+        for (position, mode) in self._definitions.find_signal(signal, prefix):
+            pin = pins[position]
+            if available and pin.mux_owner is not None:
+                continue
+            matches.append(SignalMatch(pin, mode, pin.proc_signal_name[mode],
+                                       pin.register_mode == mode, pin.mux_owner))
+        return matches
+
+    def select(self, header=None, driver_pin=None, address=None, gpio_number=None, key=None, where=None):
+        """
+        Get the set of pins matching criterias (AND)
+        :param header: pin header
+        :param driver_pin: driver pin
+        :param address: pin address
+        :param gpio_number: GPIO number
+        :param key: pin key (like P8_3)
+        :param where: predicate on pins, checked against current pins runtime configuration
+        :return: PinSet
+        """
+        definitions = self._definitions
+        mask = definitions.full_mask
+        for (name, value) in (('header', header),
+                              ('driver_pin', driver_pin),
+                              ('address', address),
+                              ('gpio_number', gpio_number),
+                              ('key', key)):
+            if value is not None:
+                mask &= definitions.mask(name, value)
+        pin_set = PinSet(self, mask)
+        if where is not None:
+            pin_set = pin_set.filter(where)
+        return pin_set
+
+    def update_pins_runtime_attributes(self, loop=None, max_staleness=None):
+        """
+        Update bord pins runtime configuration from pinctrl files informations.
+        Only pins whose register value or mux ownership differ are updated, and subscribers notified.
+        Threads calling this method while an update is running wait for it and share its result.
+        From a running event loop, use refresh() instead.
+        :param loop: event loop used to read platform, a private loop is used if None
+        :param max_staleness: if pins were updated less than max_staleness seconds ago, don't update them
+        :return: list of PinChange, for pins whose configuration changed
+        """
+        if self._is_fresh(max_staleness):
+            return []
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            #an update in flight in this thread loop could never end while waited for
+            raise RuntimeError("Synchronous API can't be used from a running event loop, use its coroutine version")
+        while True:
+            (flight, owner) = self._begin_refresh(None)
+            if owner:
+                break
+            if flight.wait():
+                return flight.result()
+            #flight loop stopped before the update ended, _begin_refresh() starts another one
+        changes = []
+        error = None
         try:
-            iterator = self.iter_pins(header, driver_pin, address)
-            return next(iterator)
+            changes = run_sync(self._refresh(), loop)
+            return changes
         except Exception as e:
-            LOGGER.debug("No pin matching args header='%s', driver_pin='%s', address='0x%x'" % (header, driver_pin, address))
-            return None
+            error = e
+            raise
+        finally:
+            self._end_refresh(flight, changes, error)
 
-    def update_pins_runtime_attributes(self, loop=None):
+    async def refresh(self, max_staleness=None):
         """
-        Update bord pins runtime configuration from pinctrl files informations
-        :return:
+        Update bord pins runtime configuration from pinctrl files informations.
+        Only pins whose register value or mux ownership differ are updated, and subscribers notified.
+        Coroutines calling this method while an update is running wait for it and share its result.
+        :param max_staleness: if pins were updated less than max_staleness seconds ago, don't update them
+        :return: list of PinChange, for pins whose configuration changed
         """
-        import itertools
+        if self._is_fresh(max_staleness):
+            return []
+        loop = asyncio.get_running_loop()
+        (flight, owner) = self._begin_refresh(loop)
+        if owner:
+            flight.task = asyncio.ensure_future(self._run_refresh(flight))
+        #a cancelled caller must not cancel the update other callers are waiting for
+        return await asyncio.shield(flight.wait_async(loop))
 
-        if loop is None:
-            self._loop = asyncio.get_event_loop()
-        else:
-            self._loop = loop
+    def _begin_refresh(self, loop):
+        """
+        Join the update in flight, or start one
+        :param loop: loop running the update if started, None for a thread
+        :return: (flight, owner) tuple, owner is True if the caller must run the update
+        """
+        with self._refresh_lock:
+            flight = self._refresh_flight
+            #an update run by a stopped loop would never end
+            if flight is not None and (flight.loop is None or flight.loop.is_running()):
+                return flight, False
+            flight = self._refresh_flight = _RefreshFlight(loop)
+            return flight, True
+
+    def _end_refresh(self, flight, changes, error):
+        with self._refresh_lock:
+            if self._refresh_flight is flight:
+                self._refresh_flight = None
+        flight.finish(changes, error)
+
+    async def _run_refresh(self, flight):
+        changes = []
+        error = None
+        try:
+            changes = await self._refresh()
+        except BaseException as e:
+            error = e
+            if not isinstance(e, Exception):
+                raise
+        finally:
+            self._end_refresh(flight, changes, error)
+
+    def subscribe(self, callback):
+        """
+        Register a callback notified of pins changes found by refreshes. Callback is called
+        with the list of PinChange, from the thread running the refresh.
+        :param callback: callable taking a list of PinChange
+        """
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """
+        Unregister a callback registered with subscribe()
+        :param callback: registered callback
+        """
+        self._subscribers.remove(callback)
+
+    def watch(self, maxsize=0):
+        """
+        Iterate on pins changes found by refreshes, run from this loop or other threads:
+        async for change in board.watch()
+        Changes are recorded from this call on, even before iteration starts. Call aclose() on the
+        returned iterator, or use it as an async context manager, to stop recording.
+        Must be called from a running event loop.
+        :param maxsize: maximum count of changes waiting to be consumed, newer changes are dropped
+        when reached. Unbounded if 0
+        :return: asynchronous iterator on PinChange
+        """
+        return _PinChangesWatcher(self, maxsize)
 
-        (pins_array, pinsmux_array) = self._loop.run_until_complete(
-            asyncio.gather(self.platform.read_pins_file(),
-                           self.platform.read_pinmux_pins()))
+    def start_monitor(self, min_interval=0.1, max_interval=5.0, backoff=2.0, max_load=0.05):
+        """
+        Start refreshing pins periodically, in a task running on the current event loop.
+        Polling interval is reset to min_interval when changes are found, and multiplied by backoff
+        after each refresh finding no change, up to max_interval. Changes are notified to subscribers.
+        :param min_interval: minimum delay between refreshes, in seconds
+        :param max_interval: maximum delay between refreshes, in seconds
+        :param backoff: interval multiplier applied when pins don't change
+        :param max_load: maximum fraction of time spent refreshing, delay between refreshes is
+        extended when refreshes are slow
+        :return: monitor task
+        """
+        if min_interval <= 0 or max_interval < min_interval:
+            raise ValueError("Expected 0 < min_interval <= max_interval")
+        if backoff < 1:
+            raise ValueError("Expected backoff >= 1")
+        if not 0 < max_load <= 1:
+            raise ValueError("Expected 0 < max_load <= 1")
+        if self._monitor_task is not None and not self._monitor_task.done():
+            raise RuntimeError("Board monitor is already running")
+        self._monitor_task = asyncio.ensure_future(self._monitor(min_interval, max_interval, backoff, max_load))
+        return self._monitor_task
+
+    async def stop_monitor(self):
+        """
+        Stop monitor task started by start_monitor() and wait for it
+        """
+        task = self._monitor_task
+        self._monitor_task = None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _monitor(self, min_interval, max_interval, backoff, max_load):
+        interval = self.monitor_interval = min_interval
+        while True:
+            if self._is_fresh(min_interval):
+                #pins refreshed meanwhile by other callers don't need to be read again, but that says
+                #nothing about pins activity: keep the current interval
+                await asyncio.sleep(interval)
+                continue
+            start = time.monotonic()
+            try:
+                changes = await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                LOGGER.exception("Error while monitoring board pins")
+                changes = None
+            if changes:
+                interval = min_interval
+            else:
+                interval = min(interval * backoff, max_interval)
+            self.monitor_interval = interval
+            elapsed = time.monotonic() - start
+            await asyncio.sleep(max(interval, elapsed * (1 - max_load) / max_load))
+
+    def _is_fresh(self, max_staleness):
+        return max_staleness is not None and self.refresh_time is not None and \
+            time.monotonic() - self.refresh_time < max_staleness
 
-        if pins_array is None and pinsmux_array is None:
-            LOGGER.warn("Platform didn't provide pins runtime informations")
+    async def _refresh(self):
+        (registers, owners) = await asyncio.gather(self.platform.read_pins_registers(),
+                                                   self.platform.read_pinmux_owners())
+        return await self._update_pins_runtime(registers, owners)
+
+    async def _update_pins_runtime(self, registers, owners):
+        if registers is None and owners is None:
+            #Platform doesn't provide bulk parsing, use per line attributes
+            (pins_array, pinsmux_array) = await asyncio.gather(self.platform.read_pins_file(),
+                                                               self.platform.read_pinmux_pins())
+            if pins_array is None and pinsmux_array is None:
+                LOGGER.warning("Platform didn't provide pins runtime informations")
+            attributes = itertools.chain(pins_array or (), pinsmux_array or ())
+
+            def update(pins):
+                self._update_pins_attributes(pins, attributes)
         else:
-            for attributes in itertools.chain(pins_array, pinsmux_array):
-                if attributes is not None:
-                    #look for pin matching the driver pin
-                    pin = self.get_pin(address=attributes['address'])
-                    if pin is not None:
-                        pin.update_runtime(attributes)
-                    else:
-                        LOGGER.debug("No pin definition matching address '0x%x' from 'pins' file was not found" % pins_line['address'])
+            def update(pins):
+                self._update_pins_registers(pins, registers or ())
+                self._update_pins_owners(pins, owners or ())
+        changes = self._publish_pins(update)
+        self.refresh_time = time.monotonic()
+        if changes:
+            self._notify(changes)
+        return changes
+
+    def _publish_pins(self, update):
+        """
+        Apply update to a copy of board pins and publish it (read-copy-update). Readers holding
+        the previous pins tuple keep a consistent view.
+        :param update: callable replacing changed pins in the list of pins it's given
+        :return: list of PinChange
+        """
+        with self._publish_lock:
+            pins = self.pins
+            updated = list(pins)
+            update(updated)
+            generation = self.generation + 1
+            changes = [PinChange(new, old.register_value, old.owners, generation) for (old, new) in zip(pins, updated)
+                       if new is not old and (new.register_value != old.register_value or new.owners != old.owners)]
+            if changes:
+                self.pins = tuple(updated)
+                self.generation = generation
+        return changes
+
+    def _notify(self, changes):
+        for callback in tuple(self._subscribers):
+            try:
+                callback(changes)
+            except Exception:
+                LOGGER.exception("Error in pins changes callback %r" % callback)
+
+    def _update_pins_registers(self, pins, registers):
+        address_positions = self._definitions.address_positions
+        for (address, value) in registers:
+            position = address_positions.get(address)
+            if position is not None:
+                pin = pins[position]
+                if pin.register_value != value:
+                    pins[position] = pin.replace(value, pin.owners)
+            else:
+                LOGGER.debug("No pin definition matching address '0x%x'" % address)
+
+    def _update_pins_owners(self, pins, owners):
+        address_positions = self._definitions.address_positions
+        for row in owners:
+            position = address_positions.get(row[0])
+            if position is not None:
+                pin = pins[position]
+                pin_owners = tuple(row[1:])
+                if pin.owners != pin_owners:
+                    pins[position] = pin.replace(pin.register_value, pin_owners)
+            else:
+                LOGGER.debug("No pin definition matching address '0x%x'" % row[0])
+
+    def _update_pins_attributes(self, pins, attributes_iterable):
+        address_positions = self._definitions.address_positions
+        for attributes in attributes_iterable:
+            if attributes is not None:
+                #look for pin matching the address
+                position = address_positions.get(attributes['address'])
+                if position is not None:
+                    pins[position] = pins[position].update_runtime(attributes)
+                else:
+                    LOGGER.debug("No pin definition matching address '0x%x'" % attributes['address'])
+
+    def read_gpio_levels(self):
+        """
+        Sample all GPIO input levels at once, from the GPIO banks registers
+        :return: tuple of levels, 0 or 1, aligned with board pins, None for pins without GPIO
+        """
+        return self._definitions.decode_gpio_levels(self.platform.read_gpio_banks())
+
+    def write_gpio_levels(self, levels, single_store=False):
+        """
+        Change GPIO output levels of several pins at once. Levels are grouped by GPIO bank, and
+        each bank is written with one set store, then one clear store: pins of a bank set to 1 change
+        together, then pins set to 0 change together. Until the clear store, pins of a bank going
+        from 1 to 0 and pins going from 0 to 1 are all 1.
+        Pins must be configured as GPIO outputs.
+        :param levels: mapping of Pin or PinSet to level, 0 or 1. PinSet pins without GPIO are ignored
+        :param single_store: write banks with pins set to both levels in one store, so that all
+        their pins change together, at the cost of a read-modify-write, see GPIOBanks.write()
+        """
+        set_masks = [0] * GPIO_BANK_COUNT
+        clear_masks = [0] * GPIO_BANK_COUNT
+        gpio_bits = self._definitions.gpio_bits
+        key_positions = self._definitions.key_positions
+        for (target, level) in levels.items():
+            masks = set_masks if level else clear_masks
+            if isinstance(target, PinSet):
+                for (chip, mask) in target.bank_masks().items():
+                    masks[chip] |= mask
+            else:
+                gpio_bit = gpio_bits[key_positions[target.key]]
+                if gpio_bit is None:
+                    raise ValueError("Pin %s has no GPIO" % target.key)
+                masks[gpio_bit[0]] |= 1 << gpio_bit[1]
+        for (chip, (set_mask, clear_mask)) in enumerate(zip(set_masks, clear_masks)):
+            conflicts = set_mask & clear_mask
+            if conflicts:
+                bit = (conflicts & -conflicts).bit_length() - 1
+                raise ValueError("GPIO %d set to both levels" % (chip * GPIO_BANK_WIDTH + bit))
+        self.platform.write_gpio_banks(set_masks, clear_masks, single_store)
+
+    async def edge_watcher(self, gpio_number):
+        """
+        Get the watcher of a GPIO edges, configuring the GPIO on first use.
+        Watchers are bound to an event loop: they are shared by all callers running the same loop.
+        :param gpio_number: GPIO number
+        :return: pybone.bone.gpio.EdgeWatcher
+        """
+        loop = asyncio.get_running_loop()
+        key = (loop, gpio_number)
+        watcher = self._edge_watchers.get(key)
+        if watcher is None or watcher.closed:
+            value_file = await self.platform.prepare_gpio_edges(gpio_number)
+            #may have been created while the GPIO was configured
+            watcher = self._edge_watchers.get(key)
+            if watcher is None or watcher.closed:
+                self._forget_closed_loops()
+                watcher = self._edge_watchers[key] = EdgeWatcher(value_file, gpio_number, loop=loop)
+        return watcher
+
+    def _forget_closed_loops(self):
+        for (key, watcher) in list(self._edge_watchers.items()):
+            if key[0].is_closed():
+                watcher.close()
+                del self._edge_watchers[key]
+
+    def close(self):
+        """
+        Release platform resources, like opened files, and stop monitor and edge watchers
+        """
+        if self._monitor_task is not None:
+            self._monitor_task.cancel()
+            self._monitor_task = None
+        for watcher in self._edge_watchers.values():
+            watcher.close()
+        self._edge_watchers.clear()
+        self.platform.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def __repr__(self):
         return "Board(name=%r,revision=%r,serial_number=%r)" % \
@@ -0,0 +1,310 @@
+# Copyright (C) 2014  Nicolas Jouanin
+#
+# This file is part of pybone.
+#
+# Pybone is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pybone is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pybone.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+GPIO capture, sampling board GPIO banks at a fixed rate from a dedicated thread.
+
+Samples are stored in a ring buffer preallocated when the capture is created : a timestamps
+array and a bank words array, holding for each sample the DATAIN word of each captured bank.
+Sampling doesn't create any container, and consumers drain samples by blocks, from threads
+or from asyncio.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from array import array
+
+from pybone.bone.gpio import GPIO_BANK_WIDTH
+from pybone.bone.pinset import PinSet
+
+LOGGER = logging.getLogger(__name__)
+
+
+class CaptureBlock(object):
+    """
+    Samples drained from a capture
+    """
+    __slots__ = ('banks', 'timestamps', 'words')
+
+    def __init__(self, banks, timestamps, words):
+        """
+        :param banks: captured banks gpio_chip
+        :param timestamps: array of time.monotonic_ns() of each sample
+        :param words: array of banks words, len(banks) words per sample, in banks order
+        """
+        self.banks = banks
+        self.timestamps = timestamps
+        self.words = words
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def bank_words(self, bank):
+        """
+        :param bank: captured bank gpio_chip
+        :return: array of the bank word of each sample
+        """
+        return self.words[self.banks.index(bank)::len(self.banks)]
+
+    def levels(self, pin):
+        """
+        :param pin: captured Pin, or GPIO number
+        :return: list of pin level, 0 or 1, of each sample
+        """
+        gpio_number = pin if isinstance(pin, int) else pin.gpio_number
+        (bank, bit) = divmod(gpio_number, GPIO_BANK_WIDTH)
+        return [(word >> bit) & 1 for word in self.bank_words(bank)]
+
+    def __repr__(self):
+        return "CaptureBlock(banks=%r,samples=%d)" % (self.banks, len(self))
+
+
+class GPIOCapture(object):
+    """
+    Sample the GPIO banks of a set of board pins at a fixed rate, from a dedicated thread.
+    The ring buffer has a single producer and is meant for a single consumer. When it is full,
+    new samples are dropped and counted in overruns, so drained samples are never overwritten.
+    Unthrottled captures pause until samples are drained instead.
+    """
+    def __init__(self, board, pins=None, rate=10000, capacity=65536, batch=None):
+        """
+        :param board: sampled Board
+        :param pins: PinSet or iterable of Pin, all GPIO pins if None. Whole banks are sampled
+        :param rate: samples per second, None samples as fast as possible
+        :param capacity: ring buffer size, in samples
+        :param batch: samples count waking consumers, about 10ms of samples if None
+        """
+        if pins is None:
+            pins = board.select()
+        elif not isinstance(pins, PinSet):
+            pins = PinSet.from_pins(board, pins)
+        self.board = board
+        self.pins = pins
+        self.banks = tuple(sorted(pins.bank_masks()))
+        if not self.banks:
+            raise ValueError("No GPIO pin to capture")
+        self.rate = rate
+        self.capacity = capacity
+        if batch is None:
+            batch = rate // 100 if rate else 1024
+        self.batch = max(1, min(batch, capacity))
+        #ring buffer, sample n is stored at n % capacity
+        self._timestamps = array('q', bytes(8 * capacity))
+        self._words = array('I', [0]) * (capacity * len(self.banks))
+        #samples written and read since start, only changed by the producer and the consumer
+        self._head = 0
+        self._tail = 0
+        #sample periods skipped because the buffer was full. Unthrottled captures have no period, it
+        #counts the times they paused until samples were drained
+        self.overruns = 0
+        #sampling thread failure, raised to consumers
+        self.error = None
+        self._thread = None
+        #set by the sampling thread when it ends, before waking consumers a last time
+        self._finished = True
+        self._stopping = threading.Event()
+        #set while consumers shouldn't wait: samples batch available, or capture not running
+        self._ready = threading.Event()
+        self._ready.set()
+        #set by consumers draining samples, wakes unthrottled sampling paused on a full buffer
+        self._drained = threading.Event()
+        self._waiters_lock = threading.Lock()
+        self._waiters = []
+
+    @property
+    def running(self):
+        return not self._finished
+
+    @property
+    def available(self):
+        """
+        :return: count of samples waiting to be drained
+        """
+        return self._head - self._tail
+
+    def start(self):
+        """
+        Start sampling. Banks are read once from the calling thread, so platform errors are raised here
+        """
+        if self.running:
+            return
+        self.board.platform.read_gpio_banks_into(array('I', [0]) * len(self.banks), 0, self.banks)
+        self.error = None
+        self._finished = False
+        self._stopping.clear()
+        if self.available < self.batch:
+            self._ready.clear()
+        self._thread = threading.Thread(target=self._run, name='pybone-capture', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop sampling, samples already captured can still be drained
+        """
+        if self._thread is not None:
+            self._stopping.set()
+            self._drained.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        read = self.board.platform.read_gpio_banks_into
+        (timestamps, words, banks) = (self._timestamps, self._words, self.banks)
+        (capacity, width, batch) = (self.capacity, len(banks), self.batch)
+        (monotonic_ns, sleep, stopping) = (time.monotonic_ns, time.sleep, self._stopping.is_set)
+        period = round(1e9 / self.rate) if self.rate else 0
+        next_time = monotonic_ns()
+        try:
+            while not stopping():
+                now = monotonic_ns()
+                if period:
+                    if now < next_time:
+                        sleep((next_time - now) / 1e9)
+                        now = monotonic_ns()
+                    #late samples aren't caught up with bursts, timestamps tell the actual sampling times
+                    next_time = max(next_time + period, now)
+                head = self._head
+                if head - self._tail >= capacity:
+                    self.overruns += 1
+                    if not period:
+                        #nothing to sample until the consumer drains, don't spin
+                        self._drained.clear()
+                        if head - self._tail >= capacity and not stopping():
+                            self._drained.wait()
+                    continue
+                index = head % capacity
+                timestamps[index] = now
+                read(words, index * width, banks)
+                self._head = head + 1
+                if head + 1 - self._tail >= batch and not self._ready.is_set():
+                    self._wake()
+        except Exception as e:
+            LOGGER.exception("GPIO capture failed")
+            self.error = e
+        finally:
+            self._finished = True
+            self._wake()
+
+    def _wake(self):
+        self._ready.set()
+        with self._waiters_lock:
+            (waiters, self._waiters) = (self._waiters, [])
+        for (loop, future) in waiters:
+            try:
+                loop.call_soon_threadsafe(_set_done, future)
+            except RuntimeError:
+                LOGGER.debug("GPIO capture consumer loop is closed")
+
+    def drain(self, max_count=None):
+        """
+        Take captured samples out of the ring buffer, without waiting
+        :param max_count: maximum samples count, all available samples if None
+        :return: CaptureBlock, possibly empty
+        """
+        #cleared first, so a wake up while draining isn't lost
+        self._ready.clear()
+        tail = self._tail
+        count = self._head - tail
+        if max_count is not None:
+            count = min(count, max_count)
+        (capacity, width) = (self.capacity, len(self.banks))
+        start = tail % capacity
+        end = start + count
+        if end <= capacity:
+            timestamps = self._timestamps[start:end]
+            words = self._words[start * width:end * width]
+        else:
+            end -= capacity
+            timestamps = self._timestamps[start:] + self._timestamps[:end]
+            words = self._words[start * width:] + self._words[:end * width]
+        self._tail = tail + count
+        if count:
+            self._drained.set()
+        if self.available >= self.batch or self._finished:
+            self._ready.set()
+        return CaptureBlock(self.banks, timestamps, words)
+
+    def _check_error(self):
+        if self.error is not None:
+            raise self.error
+
+    def read(self, timeout=None):
+        """
+        Wait for a batch of samples, or the end of the capture, and drain samples.
+        Doesn't wait when the capture isn't running.
+        :param timeout: maximum wait in seconds, None waits forever
+        :return: CaptureBlock, empty on timeout or when the capture is stopped and drained
+        """
+        self._ready.wait(timeout)
+        self._check_error()
+        return self.drain()
+
+    async def read_async(self):
+        """
+        Wait for a batch of samples, or the end of the capture, and drain samples, from a running event loop.
+        Doesn't wait when the capture isn't running.
+        :return: CaptureBlock, empty when the capture is stopped and drained
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._waiters_lock:
+            if self._ready.is_set():
+                future.set_result(None)
+            else:
+                self._waiters.append((loop, future))
+        await future
+        self._check_error()
+        return self.drain()
+
+    def iter_blocks(self):
+        """
+        Iterate over captured samples blocks from a thread, until the capture is stopped and drained
+        :return: iterator of non empty CaptureBlock
+        """
+        while True:
+            block = self.read()
+            if block:
+                yield block
+            elif not self.running and not self.available:
+                return
+
+    async def aiter_blocks(self):
+        """
+        Iterate over captured samples blocks from a running event loop, until the capture is stopped
+        and drained : async for block in capture.aiter_blocks()
+        :return: async iterator of non empty CaptureBlock
+        """
+        while True:
+            block = await self.read_async()
+            if block:
+                yield block
+            elif not self.running and not self.available:
+                return
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+def _set_done(future):
+    if not future.done():
+        future.set_result(None)
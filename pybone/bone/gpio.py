@@ -0,0 +1,268 @@
+# Copyright (C) 2014  Nicolas Jouanin
+#
+# This file is part of pybone.
+#
+# Pybone is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pybone is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pybone.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+GPIO edge events, from sysfs GPIO 'value' files.
+
+Once a GPIO 'edge' file is set, the kernel signals edges on its 'value' file with POLLPRI.
+asyncio loops only watch file descriptors for reading (POLLIN), so value files are registered
+in an epoll instance shared by all watchers of a loop, and the loop watches this epoll
+instance, which becomes readable when one of its files has an event. Waiting coroutines
+don't use any CPU until an edge occurs.
+"""
+
+import asyncio
+import errno
+import logging
+import os
+import select
+import time
+import weakref
+from collections import namedtuple
+
+from pybone.bone.platform import PlatformError
+
+LOGGER = logging.getLogger(__name__)
+
+#AM335x GPIO banks, bank n drives the pins of gpio_chip n
+GPIO_BANK_COUNT = 4
+GPIO_BANK_WIDTH = 32
+
+RISING = 'rising'
+FALLING = 'falling'
+BOTH = 'both'
+EDGES = (RISING, FALLING, BOTH)
+
+#events signalled by sysfs GPIO value files
+SYSFS_EVENTS = select.EPOLLPRI | select.EPOLLERR
+
+EdgeEvent = namedtuple('EdgeEvent', ('gpio_number', 'edge', 'value', 'timestamp'))
+EdgeEvent.__doc__ = "GPIO edge, timestamp is time.monotonic_ns() when the event was received"
+
+_EDGE_VALUES = {RISING: (1,), FALLING: (0,), BOTH: (0, 1)}
+
+
+def _check_edge(edge):
+    if edge not in EDGES:
+        raise ValueError("Unknown edge %r, expected one of %s" % (edge, ', '.join(EDGES)))
+    return _EDGE_VALUES[edge]
+
+
+class _EdgePoller(object):
+    """
+    epoll instance watched by an event loop, dispatching events to watchers callbacks
+    """
+    def __init__(self, loop):
+        self._loop = loop
+        self._epoll = select.epoll()
+        self._callbacks = {}
+        loop.add_reader(self._epoll.fileno(), self._dispatch)
+
+    def register(self, fd, events, callback):
+        self._epoll.register(fd, events)
+        self._callbacks[fd] = callback
+
+    def unregister(self, fd):
+        del self._callbacks[fd]
+        self._epoll.unregister(fd)
+        if not self._callbacks:
+            self.close()
+
+    def _dispatch(self):
+        timestamp = time.monotonic_ns()
+        for (fd, events) in self._epoll.poll(0):
+            callback = self._callbacks.get(fd)
+            if callback is not None:
+                callback(events, timestamp)
+
+    def close(self):
+        if _pollers.get(self._loop) is self:
+            del _pollers[self._loop]
+        if not self._loop.is_closed():
+            self._loop.remove_reader(self._epoll.fileno())
+        self._epoll.close()
+
+
+#one poller per loop
+_pollers = weakref.WeakKeyDictionary()
+
+
+def _get_poller(loop):
+    poller = _pollers.get(loop)
+    if poller is None:
+        poller = _pollers[loop] = _EdgePoller(loop)
+    return poller
+
+
+class EdgeWatcher(object):
+    """
+    Watch edges of a GPIO value file. Any number of coroutines may wait on the same watcher.
+    The GPIO 'edge' file must be set to 'both', edges are filtered by value afterwards.
+    """
+    def __init__(self, value_file, gpio_number=None, events=None, loop=None):
+        """
+        Open value file, from a running event loop
+        :param value_file: GPIO value file path
+        :param gpio_number: GPIO number, reported in events
+        :param events: epoll events signalling edges, SYSFS_EVENTS if None. Other files than sysfs ones,
+        like FIFOs, may be used with EPOLLIN
+        :param loop: event loop waking waiters, the running loop if None
+        """
+        self.value_file = value_file
+        self.gpio_number = gpio_number
+        self.loop = loop or asyncio.get_running_loop()
+        self._waiters = []
+        self._queues = []
+        self._fd = os.open(value_file, os.O_RDONLY | os.O_NONBLOCK)
+        try:
+            #sysfs signals an event until the value is read once
+            values = self._read_values()
+            self.value = values[-1] if values else None
+            self._poller = _get_poller(self.loop)
+            self._poller.register(self._fd, SYSFS_EVENTS if events is None else events, self._on_event)
+        except Exception:
+            os.close(self._fd)
+            self._fd = None
+            raise
+
+    @property
+    def closed(self):
+        return self._fd is None
+
+    def _read_values(self):
+        try:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+        except OSError as e:
+            #FIFOs can't seek, they are read as a stream of values
+            if e.errno != errno.ESPIPE:
+                raise
+        try:
+            data = os.read(self._fd, 4096)
+        except BlockingIOError:
+            return []
+        return [int(value) for value in data.split()]
+
+    def _on_event(self, events, timestamp):
+        try:
+            values = self._read_values()
+        except (OSError, ValueError) as e:
+            self._fail(PlatformError("Couldn't read GPIO value file %s: %s" % (self.value_file, e)))
+            return
+        if not values and events & select.EPOLLHUP:
+            #writer end of a FIFO closed, nothing more will come
+            self._fail(PlatformError("GPIO value file %s hung up" % self.value_file))
+            return
+        for value in values:
+            if value == self.value:
+                #not an edge, like a repeated sysfs notification
+                continue
+            self.value = value
+            event = EdgeEvent(self.gpio_number, RISING if value else FALLING, value, timestamp)
+            waiters = self._waiters
+            self._waiters = []
+            for (values_filter, future) in waiters:
+                if future.done():
+                    continue
+                if value in values_filter:
+                    future.set_result(event)
+                else:
+                    self._waiters.append((values_filter, future))
+            for (values_filter, queue, maxsize) in self._queues:
+                if value in values_filter:
+                    if maxsize and queue.qsize() >= maxsize:
+                        LOGGER.warning("GPIO edges iterator is full, dropping edge %r" % (event,))
+                    else:
+                        queue.put_nowait(event)
+
+    def _fail(self, error):
+        for (_, future) in self._waiters:
+            if not future.done():
+                future.set_exception(error)
+        for (_, queue, _) in self._queues:
+            queue.put_nowait(error)
+        self._waiters = []
+        self.close()
+
+    def _check_open(self):
+        if self._fd is None:
+            raise PlatformError("GPIO value file %s watcher is closed" % self.value_file)
+
+    async def wait(self, edge=BOTH, timeout=None):
+        """
+        Wait for next edge
+        :param edge: RISING, FALLING or BOTH
+        :param timeout: maximum wait in seconds, None waits forever
+        :return: EdgeEvent
+        """
+        values_filter = _check_edge(edge)
+        self._check_open()
+        future = self.loop.create_future()
+        self._waiters.append((values_filter, future))
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            if not future.done() or future.cancelled():
+                self._discard_waiter(future)
+
+    def _discard_waiter(self, future):
+        self._waiters = [waiter for waiter in self._waiters if waiter[1] is not future]
+
+    async def edges(self, edge=BOTH, maxsize=0):
+        """
+        Iterate over edges, as long as the watcher is opened :
+
+            async for event in watcher.edges(RISING):
+                ...
+
+        Edges occurring while the iterating code runs are queued, so none is missed.
+        :param edge: RISING, FALLING or BOTH
+        :param maxsize: maximum count of edges waiting to be consumed, newer edges are dropped
+        when reached. Unbounded if 0
+        :return: async iterator of EdgeEvent
+        """
+        values_filter = _check_edge(edge)
+        self._check_open()
+        #unbounded, so the end of iteration is always queued
+        queue = asyncio.Queue()
+        entry = (values_filter, queue, maxsize)
+        self._queues.append(entry)
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    return
+                if isinstance(event, Exception):
+                    raise event
+                yield event
+        finally:
+            if entry in self._queues:
+                self._queues.remove(entry)
+
+    def close(self):
+        """
+        Stop watching, pending wait() calls are cancelled and edges() iterations end
+        """
+        if self._fd is None:
+            return
+        self._poller.unregister(self._fd)
+        os.close(self._fd)
+        self._fd = None
+        for (_, future) in self._waiters:
+            future.cancel()
+        self._waiters = []
+        for (_, queue, _) in self._queues:
+            queue.put_nowait(None)
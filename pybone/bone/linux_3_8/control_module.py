@@ -0,0 +1,75 @@
+# Copyright (C) 2014  Nicolas Jouanin
+#
+# This file is part of pybone.
+#
+# Pybone is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pybone is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pybone.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import mmap
+import os
+from pybone.bone import PlatformError
+from pybone.bone.pin import PIN_REG_ADDRESS
+
+LOGGER = logging.getLogger(__name__)
+
+#AM335x control module, see AM335x TRM chapter 9
+CONTROL_MODULE_ADDRESS = PIN_REG_ADDRESS
+CONTROL_MODULE_SIZE = 0x2000
+#Pad configuration registers, as registered by pinctrl-single driver
+PAD_REGISTERS_OFFSET = 0x800
+PAD_REGISTERS_COUNT = 142
+
+
+class ControlModule(object):
+    """
+    Memory mapped access to the control module pad configuration registers
+    """
+    def __init__(self, file='/dev/mem', address=CONTROL_MODULE_ADDRESS):
+        """
+        Map the control module registers
+        :param file: memory device file, or any file with the same layout
+        :param address: control module offset in file
+        """
+        try:
+            fd = os.open(file, os.O_RDONLY | os.O_SYNC)
+        except OSError as e:
+            raise PlatformError("Couldn't open control module file %s: %s" % (file, e))
+        try:
+            self._mmap = mmap.mmap(fd, CONTROL_MODULE_SIZE, mmap.MAP_SHARED, mmap.PROT_READ, offset=address)
+        except (OSError, ValueError) as e:
+            raise PlatformError("Couldn't map control module from %s: %s" % (file, e))
+        finally:
+            os.close(fd)
+        self.file = file
+        self._registers = memoryview(self._mmap)[
+            PAD_REGISTERS_OFFSET:PAD_REGISTERS_OFFSET + 4 * PAD_REGISTERS_COUNT].cast('I')
+        self.addresses = tuple(PIN_REG_ADDRESS + PAD_REGISTERS_OFFSET + 4 * i for i in range(PAD_REGISTERS_COUNT))
+
+    def read_registers(self):
+        """
+        Read all pad configuration registers at once
+        :return: iterator on (address, register value) tuples
+        """
+        if self._registers is None:
+            raise PlatformError("Control module from %s is closed" % self.file)
+        return zip(self.addresses, self._registers.tolist())
+
+    def close(self):
+        if self._registers is not None:
+            self._registers.release()
+            self._registers = None
+            self._mmap.close()
+
+    def __repr__(self):
+        return "ControlModule(file=%r)" % self.file
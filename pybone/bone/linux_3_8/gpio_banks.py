@@ -0,0 +1,135 @@
+# Copyright (C) 2014  Nicolas Jouanin
+#
+# This file is part of pybone.
+#
+# Pybone is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pybone is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pybone.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import mmap
+import os
+from pybone.bone import PlatformError
+from pybone.bone.gpio import GPIO_BANK_COUNT
+
+LOGGER = logging.getLogger(__name__)
+
+#AM335x GPIO modules, see AM335x TRM chapter 25. Bank n drives gpio_chip n pins
+GPIO_BANK_ADDRESSES = (0x44e07000, 0x4804c000, 0x481ac000, 0x481ae000)
+GPIO_BANK_SIZE = 0x1000
+#sampled input levels register
+GPIO_DATAIN_OFFSET = 0x138
+#output levels register
+GPIO_DATAOUT_OFFSET = 0x13c
+#writing 1 bits clears or sets the matching output levels, other bits are left unchanged
+GPIO_CLEARDATAOUT_OFFSET = 0x190
+GPIO_SETDATAOUT_OFFSET = 0x194
+
+
+class GPIOBanks(object):
+    """
+    Memory mapped access to the GPIO modules registers, reading all GPIO levels in one word per bank,
+    and writing them in one store per bank
+    """
+    def __init__(self, file='/dev/mem', addresses=GPIO_BANK_ADDRESSES, writable=False):
+        """
+        Map the GPIO banks registers
+        :param file: memory device file, or any file with the same layout
+        :param addresses: offsets in file of each bank registers, in gpio_chip order
+        :param writable: map registers for writing too, see write()
+        """
+        if len(addresses) != GPIO_BANK_COUNT:
+            raise PlatformError("Expected %d GPIO bank addresses, got %d" % (GPIO_BANK_COUNT, len(addresses)))
+        try:
+            fd = os.open(file, (os.O_RDWR if writable else os.O_RDONLY) | os.O_SYNC)
+        except OSError as e:
+            raise PlatformError("Couldn't open GPIO banks file %s: %s" % (file, e))
+        self._mmaps = []
+        prot = mmap.PROT_READ | mmap.PROT_WRITE if writable else mmap.PROT_READ
+        try:
+            for address in addresses:
+                self._mmaps.append(mmap.mmap(fd, GPIO_BANK_SIZE, mmap.MAP_SHARED, prot, offset=address))
+        except (OSError, ValueError) as e:
+            self._close_mmaps()
+            raise PlatformError("Couldn't map GPIO banks from %s: %s" % (file, e))
+        finally:
+            os.close(fd)
+        self.file = file
+        self.addresses = tuple(addresses)
+        self.writable = writable
+        self._registers = [memoryview(bank).cast('I') for bank in self._mmaps]
+        self._datain = GPIO_DATAIN_OFFSET // 4
+        self._dataout = GPIO_DATAOUT_OFFSET // 4
+        self._cleardataout = GPIO_CLEARDATAOUT_OFFSET // 4
+        self._setdataout = GPIO_SETDATAOUT_OFFSET // 4
+
+    def _close_mmaps(self):
+        for bank in self._mmaps:
+            bank.close()
+        self._mmaps = []
+
+    def read(self):
+        """
+        Read all banks input levels
+        :return: tuple of DATAIN register values, in gpio_chip order. Bit n of word b is
+        the level of GPIO b * 32 + n
+        """
+        index = self._datain
+        return tuple(registers[index] for registers in self._registers)
+
+    def read_into(self, words, offset, banks):
+        """
+        Read some banks input levels into a preallocated buffer
+        :param words: buffer of unsigned words, like an array('I')
+        :param offset: index in words of the first bank word
+        :param banks: read banks gpio_chip, their words are stored in this order
+        """
+        index = self._datain
+        registers = self._registers
+        for bank in banks:
+            words[offset] = registers[bank][index]
+            offset += 1
+
+    def write(self, set_masks, clear_masks, single_store=False):
+        """
+        Change output levels, with one SETDATAOUT store then one CLEARDATAOUT store per bank. Levels
+        set in a bank change together, then levels cleared change together: between both stores, a
+        bank setting some pins and clearing others has all of them set.
+        With single_store, banks with both set and cleared pins are written with one DATAOUT store
+        instead, so all their pins change together. DATAOUT is read then written back, changes made
+        meanwhile by other writers of the bank, like the kernel GPIO driver, are lost.
+        Banks with empty masks aren't written.
+        :param set_masks: bits to set of each bank, in gpio_chip order
+        :param clear_masks: bits to clear of each bank, in gpio_chip order
+        :param single_store: write banks with both set and cleared pins in one store
+        """
+        if not self.writable:
+            raise PlatformError("GPIO banks from %s aren't mapped for writing" % self.file)
+        (set_index, clear_index, data_index) = (self._setdataout, self._cleardataout, self._dataout)
+        for (registers, set_mask, clear_mask) in zip(self._registers, set_masks, clear_masks):
+            if single_store and set_mask and clear_mask:
+                registers[data_index] = (registers[data_index] | set_mask) & ~clear_mask & 0xffffffff
+                continue
+            if set_mask:
+                registers[set_index] = set_mask
+            if clear_mask:
+                registers[clear_index] = clear_mask
+
+    def close(self):
+        if self._registers is not None:
+            for registers in self._registers:
+                registers.release()
+            self._registers = None
+            self._close_mmaps()
+
+    def __repr__(self):
+        return "GPIOBanks(file=%r)" % self.file
@@ -17,32 +17,24 @@
 
 import logging
 import re
-from pybone.bone.pin import RegPullEnum, RegPullTypeEnum, RegRcvEnum, RegSlewEnum
+from pybone.bone.pin import decode_register
 
 LOGGER = logging.getLogger(__name__)
 
 
+_PINS_LINE_RE = re.compile(r"pin ([0-9]+)\s.([0-9a-f]+).\s([0-9a-f]+)")
+
+
 def parse_pins_line(line):
-    m = re.match(r"pin ([0-9]+)\s.([0-9a-f]+).\s([0-9a-f]+)", line)
+    m = _PINS_LINE_RE.match(line)
     try:
         pin_index = int(m.group(1))
         pin_address = int(m.group(2), 16)
         reg = int(m.group(3), 16)
-        #Extract register configuration
-        # bit 0-2: pin mode
-        # bit 3 : pullup/down enable/disable (0=enable, 1=disable)
-        # bit 4 : pullup/down selection (0=pulldown, 1=pullup)
-        # bit 5 : input enable (0=input disable, 1=input enable)
-        # bit 6 : slew rate (0=fast, 1=slow)
-        pin_reg = {'mode': reg & 0x07,
-                   'slew': RegSlewEnum.slow if (reg & 0x40) else RegSlewEnum.fast,
-                   'receive': RegRcvEnum.enabled if (reg & 0x20) else RegRcvEnum.disabled,
-                   'pull': RegPullEnum.enabled if ((reg >> 3) & 0x01) else RegPullEnum.disabled,
-                   'pulltype': RegPullTypeEnum.pullup if ((reg >> 4) & 0x01) else RegPullTypeEnum.pulldown}
-
-        return {'index': pin_index, 'address': pin_address, 'reg': pin_reg}
+        #reg_value is the raw register word, as returned by iter_pins_registers()
+        return {'index': pin_index, 'address': pin_address, 'reg': decode_register(reg), 'reg_value': reg}
     except Exception as e:
-        LOGGER.warning("Failed parsing pins line '%s'." % line, e)
+        LOGGER.warning("Failed parsing pins line '%s': %s" % (line, e))
         return None
 
 
@@ -97,3 +89,32 @@ def parse_pinmux_pins_file(line):
        'group': pin_group
     }
 
+
+#Bulk parsers, matching the whole file content at once
+
+_PINS_FILE_RE = re.compile(r"^pin [0-9]+ \(([0-9a-f]+)\) ([0-9a-f]+)", re.MULTILINE)
+
+_PINMUX_PINS_FILE_RE = re.compile(r"^pin [0-9]+ \(([0-9a-f]+)\): "
+                                  r"(?:\(MUX UNCLAIMED\)|([\(\)\w\.]+)) "
+                                  r"(?:\(GPIO UNCLAIMED\)|([\(\)\w\.]+))"
+                                  r"(?: function ([\(\)\w\.]+) group ([\(\)\w\.]+))?", re.MULTILINE)
+
+
+def iter_pins_registers(content):
+    """
+    Parse pins file content
+    :param content: whole pins file content
+    :return: iterator on (address, register value) tuples
+    """
+    for m in _PINS_FILE_RE.finditer(content):
+        yield (int(m.group(1), 16), int(m.group(2), 16))
+
+
+def iter_pinmux_owners(content):
+    """
+    Parse pinmux-pins file content. Unclaimed owners are returned as None.
+    :param content: whole pinmux-pins file content
+    :return: iterator on (address, mux_owner, gpio_owner, function, group) tuples
+    """
+    for m in _PINMUX_PINS_FILE_RE.finditer(content):
+        yield (int(m.group(1), 16),) + m.group(2, 3, 4, 5)
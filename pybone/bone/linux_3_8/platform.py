@@ -17,12 +17,41 @@
 
 import asyncio
 import logging
+import os
+import threading
 from pybone.bone import Platform, PlatformError
 from pybone.utils import filesystem
-from .pinctrl import parse_pinmux_pins_file, parse_pins_line
+from pybone.utils.loop import run_sync
+from .control_module import ControlModule, CONTROL_MODULE_ADDRESS
+from .gpio_banks import GPIOBanks, GPIO_BANK_ADDRESSES
+from .pinctrl import parse_pinmux_pins_file, parse_pins_line, iter_pins_registers, iter_pinmux_owners
 
 LOGGER = logging.getLogger(__name__)
 
+#discovered platform files, by (root, patterns), shared by platforms of the process
+_discovery_cache = {}
+
+
+def prepare_gpio_edges(gpio_directory, gpio_number):
+    """
+    Export a GPIO in sysfs if needed, and set its edge file to signal both edges
+    :param gpio_directory: sysfs GPIO class directory
+    :param gpio_number: GPIO number
+    :return: GPIO value file path
+    """
+    directory = os.path.join(gpio_directory, 'gpio%d' % gpio_number)
+    try:
+        if not os.path.isdir(directory):
+            with open(os.path.join(gpio_directory, 'export'), 'w') as export_file:
+                export_file.write(str(gpio_number))
+        with open(os.path.join(directory, 'edge'), 'w') as edge_file:
+            edge_file.write('both')
+    except OSError as e:
+        msg = "Couldn't configure GPIO %d edges: %s" % (gpio_number, e)
+        LOGGER.warning(msg)
+        raise PlatformError(msg)
+    return os.path.join(directory, 'value')
+
 
 def get_board_name(board_id):
     boards = {
@@ -36,9 +65,8 @@ def get_board_name(board_id):
     return board_name
 
 
-@asyncio.coroutine
-def read_board_name(board_file):
-    file_content = yield from filesystem.read_async(board_file)
+async def read_board_name(board_file, executor=None):
+    file_content = await filesystem.read_async(board_file, executor=executor)
     try:
         board_id = file_content[0].strip()
     except:
@@ -53,9 +81,8 @@ def read_board_name(board_file):
     return board_name
 
 
-@asyncio.coroutine
-def read_board_revision(revision_file):
-    file_content = yield from filesystem.read_async(revision_file)
+async def read_board_revision(revision_file, executor=None):
+    file_content = await filesystem.read_async(revision_file, executor=executor)
     try:
         board_revision = file_content[0].strip()
         return board_revision
@@ -65,10 +92,9 @@ def read_board_revision(revision_file):
         raise PlatformError(msg)
 
 
-@asyncio.coroutine
-def read_board_serial_number(serial_number_file):
+async def read_board_serial_number(serial_number_file, executor=None):
     LOGGER.debug("BEGIN read_board_serial_number")
-    file_content = yield from filesystem.read_async(serial_number_file)
+    file_content = await filesystem.read_async(serial_number_file, executor=executor)
     try:
         serial_number = file_content[0].strip()
         return  serial_number
@@ -88,9 +114,26 @@ class Linux38Platform(Platform):
     _SERIAL_NUMBER_FILE = '/sys/devices/bone_capemgr.*/baseboard/serial-number'
     _PINS_FILE = '/sys/kernel/debug/pinctrl/44e10800.pinmux/pins'
     _PINMUX_FILE = '/sys/kernel/debug/pinctrl/44e10800.pinmux/pinmux-pins'
+    _GPIO_DIRECTORY = '/sys/class/gpio'
+    _CONTROL_MODULE_FILE = '/dev/mem'
+    _CONTROL_MODULE_ADDRESS = CONTROL_MODULE_ADDRESS
+    _GPIO_BANKS_FILE = '/dev/mem'
+    _GPIO_BANK_ADDRESSES = GPIO_BANK_ADDRESSES
+
+    #Platform files attributes, set by discover()
+    FILES = ('board_name_file', 'revision_file', 'serial_number_file', 'pins_file', 'pinmux_pins_file')
 
+    DEBUGFS_BACKEND = 'debugfs'
+    MMAP_BACKEND = 'mmap'
 
-    def __init__(self, loop=None):
+    def __init__(self, loop=None, registers_backend=DEBUGFS_BACKEND, discover=True, root='/'):
+        """
+        :param loop: event loop used to discover platform files, a private loop is used if None
+        :param registers_backend: how pins registers are read, DEBUGFS_BACKEND parses pinctrl 'pins' file,
+        MMAP_BACKEND reads control module registers from memory
+        :param discover: discover platform files, if False discover() must be awaited before use
+        :param root: directory sysfs and debugfs files are looked for in, like a fixture tree
+        """
         super().__init__()
         if 'Linux' not in self.os_name:
             raise PlatformError("Expected Linux OS, found '%r'" % self.os_name)
@@ -99,52 +142,171 @@ class Linux38Platform(Platform):
         elif 'arm' not in self.processor:
             raise PlatformError("Expected ARM processor, found '%r'" % self.processor)
 
-        if loop is None:
-            self._loop = asyncio.get_event_loop()
+        if registers_backend not in (Linux38Platform.DEBUGFS_BACKEND, Linux38Platform.MMAP_BACKEND):
+            raise PlatformError("Unknown registers backend %r" % registers_backend)
+
+        self._loop = loop
+        self.root = root
+        self.board_name_file = None
+        self.revision_file = None
+        self.serial_number_file = None
+        self.pins_file = None
+        self.pinmux_pins_file = None
+        #pinctrl files are read on each pins refresh, keep them opened
+        self.file_cache = filesystem.FileDescriptorCache()
+        if registers_backend == Linux38Platform.MMAP_BACKEND:
+            self.control_module = ControlModule(Linux38Platform._CONTROL_MODULE_FILE,
+                                                Linux38Platform._CONTROL_MODULE_ADDRESS)
         else:
-            self._loop = loop
+            self.control_module = None
+        #mapped on first sampling, replaced as a whole, see write_gpio_banks()
+        self.gpio_banks = None
+        self._retired_gpio_banks = []
+        #serializes GPIO banks mapping, readers don't lock
+        self._gpio_banks_lock = threading.Lock()
+
+        if discover:
+            run_sync(self.discover(), loop)
+
+    @classmethod
+    async def create(cls, registers_backend=DEBUGFS_BACKEND, root='/'):
+        """
+        Create platform from a running event loop
+        :param registers_backend: see __init__
+        :param root: see __init__
+        :return: Linux38Platform instance
+        """
+        platform = cls(registers_backend=registers_backend, discover=False, root=root)
+        await platform.discover()
+        return platform
+
+    async def discover(self):
+        """
+        Look for platform files, in a single pass. Files found are cached for the process,
+        see clear_discovery_cache()
+        """
+        patterns = (Linux38Platform._BOARD_NAME_FILE,
+                    Linux38Platform._REVISION_FILE,
+                    Linux38Platform._SERIAL_NUMBER_FILE,
+                    Linux38Platform._PINS_FILE,
+                    Linux38Platform._PINMUX_FILE)
+        key = (self.root, patterns)
+        files = _discovery_cache.get(key)
+        if files is None:
+            files = await filesystem.find_first_files(patterns, self.root, executor=self.executor)
+            #missing files may appear later, when capes or drivers are loaded
+            if None not in files:
+                _discovery_cache[key] = files
         (self.board_name_file,
             self.revision_file,
             self.serial_number_file,
             self.pins_file,
-            self.pinmux_pins_file) = self._loop.run_until_complete(asyncio.gather(
-                filesystem.find_first_file(Linux38Platform._BOARD_NAME_FILE),
-                filesystem.find_first_file(Linux38Platform._REVISION_FILE),
-                filesystem.find_first_file(Linux38Platform._SERIAL_NUMBER_FILE),
-                filesystem.find_first_file(Linux38Platform._PINS_FILE),
-                filesystem.find_first_file(Linux38Platform._PINMUX_FILE)))
+            self.pinmux_pins_file) = files
+
+    @staticmethod
+    def clear_discovery_cache():
+        """
+        Forget platform files found by previous discoveries
+        """
+        _discovery_cache.clear()
+
+    def _check_open(self):
+        #closed mappings must not be mapped again, nothing would close them
+        if self.closed:
+            raise PlatformError("%s is closed" % self.__class__.__name__)
+
+    def _get_gpio_banks(self):
+        gpio_banks = self.gpio_banks
+        if gpio_banks is None:
+            with self._gpio_banks_lock:
+                self._check_open()
+                gpio_banks = self.gpio_banks
+                if gpio_banks is None:
+                    gpio_banks = self.gpio_banks = GPIOBanks(Linux38Platform._GPIO_BANKS_FILE,
+                                                             Linux38Platform._GPIO_BANK_ADDRESSES)
+        return gpio_banks
+
+    def read_gpio_banks(self):
+        return self._get_gpio_banks().read()
+
+    def read_gpio_banks_into(self, words, offset, banks):
+        self._get_gpio_banks().read_into(words, offset, banks)
+
+    def write_gpio_banks(self, set_masks, clear_masks, single_store=False):
+        gpio_banks = self.gpio_banks
+        if gpio_banks is None or not gpio_banks.writable:
+            with self._gpio_banks_lock:
+                self._check_open()
+                gpio_banks = self.gpio_banks
+                if gpio_banks is None or not gpio_banks.writable:
+                    #sampling only mapping is replaced by a writable one, readers in other threads,
+                    #like captures, see either mapping. The old one is kept opened until close()
+                    writable_banks = GPIOBanks(Linux38Platform._GPIO_BANKS_FILE,
+                                               Linux38Platform._GPIO_BANK_ADDRESSES, writable=True)
+                    if gpio_banks is not None:
+                        self._retired_gpio_banks.append(gpio_banks)
+                    gpio_banks = self.gpio_banks = writable_banks
+        gpio_banks.write(set_masks, clear_masks, single_store)
+
+    async def prepare_gpio_edges(self, gpio_number):
+        gpio_directory = os.path.join(self.root, Linux38Platform._GPIO_DIRECTORY.lstrip('/'))
+        return await self.executor.run(gpio_directory, prepare_gpio_edges, gpio_directory, gpio_number)
 
     def read_board_info(self, loop=None):
-        if loop is None:
-            self._loop = asyncio.get_event_loop()
-        else:
-            self._loop = loop
-        t1 = asyncio.async(read_board_name(self.board_name_file))
-        t2 = asyncio.async(read_board_revision(self.revision_file))
-        t3 = asyncio.async(read_board_serial_number(self.serial_number_file))
+        return run_sync(self.read_board_info_async(), loop)
 
+    async def read_board_info_async(self):
         #returns (board_name, board_revision, board_serial_number) results
         try:
-            (board_name, board_revision, board_serial_number) = \
-                self._loop.run_until_complete(asyncio.gather(t1, t2, t3))
+            (board_name, board_revision, board_serial_number) = await asyncio.gather(
+                read_board_name(self.board_name_file, self.executor),
+                read_board_revision(self.revision_file, self.executor),
+                read_board_serial_number(self.serial_number_file, self.executor))
         except PlatformError as pe:
             raise pe
         except:
             raise PlatformError("Error while reading board informations")
         return board_name, board_revision, board_serial_number
 
-    @asyncio.coroutine
-    def read_pins_file(self):
-        file_content = yield from filesystem.read_async(self.pins_file, self._loop)
+    async def read_pins_file(self):
+        file_content = await filesystem.read_async(self.pins_file, cache=self.file_cache, executor=self.executor)
         if file_content is not None:
             return map(parse_pins_line, file_content[1:])
         else:
-            raise PlatformError("Couldn't read pins file " % self.pins_file)
+            raise PlatformError("Couldn't read pins file %s" % self.pins_file)
 
-    @asyncio.coroutine
-    def read_pinmux_pins(self):
-        file_content = yield from filesystem.read_async(self.pinmux_pins_file, self._loop)
+    async def read_pinmux_pins(self):
+        file_content = await filesystem.read_async(self.pinmux_pins_file, cache=self.file_cache, executor=self.executor)
         if file_content is not None:
             return map(parse_pinmux_pins_file, file_content[2:])
         else:
-            raise PlatformError("Couldn't read pinmux file " % self.pinmux_pins_file)
+            raise PlatformError("Couldn't read pinmux file %s" % self.pinmux_pins_file)
+
+    async def read_pins_registers(self):
+        if self.control_module is not None:
+            return self.control_module.read_registers()
+        content = await filesystem.read_content_async(self.pins_file, cache=self.file_cache, executor=self.executor)
+        if content is not None:
+            return iter_pins_registers(content)
+        else:
+            raise PlatformError("Couldn't read pins file %s" % self.pins_file)
+
+    async def read_pinmux_owners(self):
+        content = await filesystem.read_content_async(self.pinmux_pins_file, cache=self.file_cache, executor=self.executor)
+        if content is not None:
+            return iter_pinmux_owners(content)
+        else:
+            raise PlatformError("Couldn't read pinmux file %s" % self.pinmux_pins_file)
+
+    def close(self):
+        super().close()
+        self.file_cache.close()
+        if self.control_module is not None:
+            self.control_module.close()
+        with self._gpio_banks_lock:
+            if self.gpio_banks is not None:
+                self.gpio_banks.close()
+                self.gpio_banks = None
+            for gpio_banks in self._retired_gpio_banks:
+                gpio_banks.close()
+            self._retired_gpio_banks = []
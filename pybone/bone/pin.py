@@ -3,6 +3,9 @@ __author__ = 'nico'
 import logging
 from enum import Enum
 
+from .gpio import BOTH
+from .platform import PlatformError
+
 LOGGER = logging.getLogger(__name__)
 
 PIN_REG_ADDRESS = 0x44e10000
@@ -28,60 +31,269 @@ class RegPullTypeEnum(Enum):
     pulldown = 'pulldown'
 
 
+class PinRegister(object):
+    """
+    Decoded pin configuration register.
+    Instances are immutable and shared, see decode_register().
+    """
+    __slots__ = ('value', 'mode', 'slew', 'receive', 'pull', 'pulltype')
+
+    def __init__(self, value):
+        init = super().__setattr__
+        # bit 0-2: pin mode
+        # bit 3 : pullup/down enable/disable (0=enable, 1=disable)
+        # bit 4 : pullup/down selection (0=pulldown, 1=pullup)
+        # bit 5 : input enable (0=input disable, 1=input enable)
+        # bit 6 : slew rate (0=fast, 1=slow)
+        init('value', value)
+        init('mode', value & 0x07)
+        init('slew', RegSlewEnum.slow if (value & 0x40) else RegSlewEnum.fast)
+        init('receive', RegRcvEnum.enabled if (value & 0x20) else RegRcvEnum.disabled)
+        init('pull', RegPullEnum.enabled if ((value >> 3) & 0x01) else RegPullEnum.disabled)
+        init('pulltype', RegPullTypeEnum.pullup if ((value >> 4) & 0x01) else RegPullTypeEnum.pulldown)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("PinRegister is immutable")
+
+    def __getitem__(self, key):
+        #Allow dict like access, as returned by previous pins parsing
+        if key in PinRegister.__slots__:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __repr__(self):
+        return "PinRegister(%s)" % ','.join("%s=%r" % (name, getattr(self, name)) for name in self.__slots__)
+
+#Only the 7 low bits of the register are meaningful, decode all their values once
+REGISTER_MASK = 0x7f
+REGISTER_DECODE_TABLE = tuple(PinRegister(value) for value in range(REGISTER_MASK + 1))
+
+
+def decode_register(value):
+    """
+    Decode pin configuration register value
+    :param value: register value
+    :return: shared PinRegister instance
+    """
+    return REGISTER_DECODE_TABLE[value & REGISTER_MASK]
+
+
+class PinDefinition(object):
+    """
+    Pin static attributes, loaded from pin definitions table.
+    A single instance is shared by the pins of every board built in the process.
+    """
+    __slots__ = ('header', 'header_pin', 'header_name', 'proc_pin', 'proc_pin_name', 'proc_signal_name',
+                 'reg_offset', 'driver_pin', 'reset_mode', 'gpio_chip', 'gpio_number', 'notes', 'address', 'key')
+
+    def __init__(self, definition):
+        init = super().__setattr__
+        init('header', definition['header'])
+        init('header_pin', definition['head_pin'])
+        init('header_name', definition['head_name'])
+        init('proc_pin', definition['proc_pin'])
+        init('proc_pin_name', definition['proc_pin_name'])
+        init('proc_signal_name', tuple(definition['proc_signal_name']))
+        init('reg_offset', definition['reg_offset'])
+        init('driver_pin', definition['driver_pin'])
+        init('reset_mode', definition['reset_mode'])
+        init('gpio_chip', definition['gpio_chip'])
+        init('gpio_number', definition['gpio_number'])
+        init('notes', definition.get('notes'))
+        if self.reg_offset is not None:
+            init('address', PIN_REG_ADDRESS + self.reg_offset)
+        else:
+            #reg_offset is None for non CPU pins
+            init('address', None)
+        init('key', "%s_%d" % (self.header.value, self.header_pin))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("PinDefinition is immutable")
+
+    def __repr__(self):
+        return "PinDefinition(%s)" % ','.join("%s=%r" % (name, getattr(self, name)) for name in self.__slots__)
+
+
+def _definition_attribute(name):
+    return property(lambda self: getattr(self.definition, name),
+                    doc="Pin static attribute '%s', read from pin definition" % name)
+
+
+_NO_OWNERS = (None, None, None, None)
+
+
 class Pin(object):
-    def __init__(self, board, definition):
-        self.board = board
+    """
+    Board pin. Pins are immutable, board refreshes replace the pins whose runtime configuration
+    changed, so a pin read from board pins is always consistent.
+    """
+    __slots__ = ('board', 'definition',
+                 'register_value',
+                 'mux_owner', 'gpio_owner', 'function', 'group')
+
+    def __init__(self, board, definition, register_value=None, owners=_NO_OWNERS):
+        """
+        :param board: board the pin belongs to
+        :param definition: PinDefinition, or pin_desc definition dict
+        :param register_value: pin configuration register raw value
+        :param owners: (mux_owner, gpio_owner, function, group) tuple
+        """
+        init = super().__setattr__
+        init('board', board)
         #Pin static attributes
-        self.header = definition['header']
-        self.header_pin = definition['head_pin']
-        self.header_name = definition['head_name']
-        self.proc_pin = definition['proc_pin']
-        self.proc_pin_name = definition['proc_pin_name']
-        self.proc_signal_name = definition['proc_signal_name']
-        self.reg_offset = definition['reg_offset']
-        self.driver_pin = definition['driver_pin']
-        self.reset_mode = definition['reset_mode']
-        self.gpio_chip = definition['gpio_chip']
-        self.gpio_number = definition['gpio_number']
+        if isinstance(definition, PinDefinition):
+            init('definition', definition)
+        else:
+            init('definition', PinDefinition(definition))
         #Pin runtime attributes
-        self.register_mode = None
-        self.register_slew = None
-        self.register_receive = None
-        self.register_pull = None
-        self.register_pulltype = None
-        self.mux_owner = None
-        self.gpio_owner = None
-        self.function = None
-        self.group = None
-        if self.reg_offset is not None:
-            #reg_offset is None for non CPU pins
-            self.address = PIN_REG_ADDRESS + self.reg_offset
+        init('register_value', register_value)
+        (mux_owner, gpio_owner, function, group) = owners
+        init('mux_owner', mux_owner)
+        init('gpio_owner', gpio_owner)
+        init('function', function)
+        init('group', group)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Pin is immutable")
+
+    def replace(self, register_value, owners):
+        """
+        Get a copy of this pin with other runtime attributes
+        :param register_value: pin configuration register raw value
+        :param owners: (mux_owner, gpio_owner, function, group) tuple
+        :return: new Pin
+        """
+        return Pin(self.board, self.definition, register_value, owners)
 
     def update_runtime(self, attributes):
+        """
+        Apply runtime attributes, as parsed from pinctrl files
+        :param attributes: attributes dict
+        :return: new Pin with updated attributes, or this pin if attributes address doesn't match
+        """
         if self.address == attributes['address']:
-            if 'reg' in attributes:
-                self.register_mode = attributes['reg']['mode']
-                self.register_slew = attributes['reg']['slew']
-                self.register_receive = attributes['reg']['receive']
-                self.register_pull = attributes['reg']['pull']
-                self.register_pulltype = attributes['reg']['pulltype']
-            if 'mux_owner' in attributes:
-                self.mux_owner = pinmux_info['mux_owner']
-            if 'gpio_owner' in attributes:
-                self.mux_owner = pinmux_info['gpio_owner']
-            if 'function' in attributes:
-                self.function = pinmux_info['function']
-            if 'group' in attributes:
-                self.group = pinmux_info['group']
+            if 'reg_value' in attributes:
+                register_value = attributes['reg_value']
+            elif 'reg' in attributes:
+                #decoded register only holds the meaningful bits
+                register_value = attributes['reg'].value
+            else:
+                register_value = self.register_value
+            owners = tuple(attributes.get(name, current) for (name, current) in
+                           zip(('mux_owner', 'gpio_owner', 'function', 'group'), self.owners))
+            return self.replace(register_value, owners)
         else:
-            LOGGER.debug("Pin address configuration '0x%x' doesn't match pins address '0x%x" % (self.address, attributes['address']))
+            LOGGER.debug("Pin address configuration %r doesn't match pins address '0x%x" % (self.address, attributes['address']))
+            return self
+
+    @property
+    def owners(self):
+        """
+        Pin mux ownership
+        :return: (mux_owner, gpio_owner, function, group) tuple
+        """
+        return (self.mux_owner, self.gpio_owner, self.function, self.group)
+
+    @property
+    def register(self):
+        """
+        Pin configuration register, decoded on access
+        :return: PinRegister or None if not read yet
+        """
+        if self.register_value is None:
+            return None
+        return REGISTER_DECODE_TABLE[self.register_value & REGISTER_MASK]
+
+    @property
+    def register_mode(self):
+        return None if self.register_value is None else self.register.mode
+
+    @property
+    def register_slew(self):
+        return None if self.register_value is None else self.register.slew
+
+    @property
+    def register_receive(self):
+        return None if self.register_value is None else self.register.receive
+
+    @property
+    def register_pull(self):
+        return None if self.register_value is None else self.register.pull
 
     @property
-    def key(self):
-        return "%s_%d" % (self.header.value, self.header_pin)
+    def register_pulltype(self):
+        return None if self.register_value is None else self.register.pulltype
+
+    async def _edge_watcher(self):
+        if self.board is None:
+            raise PlatformError("Pin %s isn't attached to a board" % self.key)
+        if self.gpio_number is None:
+            raise PlatformError("Pin %s has no GPIO" % self.key)
+        return await self.board.edge_watcher(self.gpio_number)
+
+    async def wait_edge(self, edge=BOTH, timeout=None):
+        """
+        Wait for next edge of pin GPIO, the pin must be in GPIO mode
+        :param edge: 'rising', 'falling' or 'both'
+        :param timeout: maximum wait in seconds, None waits forever
+        :return: pybone.bone.gpio.EdgeEvent
+        """
+        watcher = await self._edge_watcher()
+        return await watcher.wait(edge, timeout)
+
+    async def edges(self, edge=BOTH, maxsize=0):
+        """
+        Iterate over pin GPIO edges : async for event in pin.edges('rising')
+        :param edge: 'rising', 'falling' or 'both'
+        :param maxsize: see pybone.bone.gpio.EdgeWatcher.edges()
+        :return: async iterator of pybone.bone.gpio.EdgeEvent
+        """
+        watcher = await self._edge_watcher()
+        async for event in watcher.edges(edge, maxsize):
+            yield event
 
     def __repr__(self):
         sb = []
-        for key in self.__dict__:
-            sb.append("%r=%r" % (key, self.__dict__[key]))
+        for key in PinDefinition.__slots__ + Pin.__slots__[2:]:
+            sb.append("%r=%r" % (key, getattr(self, key)))
         return "Pin(" + ','.join(sb) + ")"
+
+for _name in PinDefinition.__slots__:
+    setattr(Pin, _name, _definition_attribute(_name))
+
+
+class PinChange(object):
+    """
+    Pin runtime configuration change, found while refreshing board pins
+    """
+    __slots__ = ('pin', 'old_register_value', 'register_value', 'old_owners', 'owners', 'generation')
+
+    def __init__(self, pin, old_register_value, old_owners, generation=None):
+        """
+        :param pin: changed pin, already updated
+        :param old_register_value: pin register value before change
+        :param old_owners: pin (mux_owner, gpio_owner, function, group) before change
+        :param generation: board generation publishing the change
+        """
+        init = super().__setattr__
+        init('pin', pin)
+        init('old_register_value', old_register_value)
+        init('register_value', pin.register_value)
+        init('old_owners', old_owners)
+        init('owners', pin.owners)
+        init('generation', generation)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("PinChange is immutable")
+
+    @property
+    def register_changed(self):
+        return self.old_register_value != self.register_value
+
+    @property
+    def owners_changed(self):
+        return self.old_owners != self.owners
+
+    def __repr__(self):
+        return "PinChange(key=%r,register_value=%r->%r,owners=%r->%r)" % \
+               (self.pin.key, self.old_register_value, self.register_value, self.old_owners, self.owners)
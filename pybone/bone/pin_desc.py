@@ -233,7 +233,7 @@ BBB_P8_DEF = [
         'proc_pin_name': 'GPMC_AD15',
         'proc_signal_name': ['gpmc_ad15', 'lcd_data16', 'mmc1_dat7', 'mmc2_dat3', 'eQEP2_strobe', 'pr1_ecap0_ecap_capin_apwm_o', 'pr1_pru0_pru_r31_15', 'gpio1_15'],
         'reset_mode': 7,
-        'gpio_chip': 32,
+        'gpio_chip': 1,
         'gpio_number': 47,
         'notes': None
     },
@@ -342,11 +342,11 @@ BBB_P8_DEF = [
         'proc_pin': 'U8',
         'reg_offset': 0x810,
         'driver_pin': 4,
-        'proc_pin_name': 'GPMC_AD5',
-        'proc_signal_name': ['gpmc_ad5', 'mmc1_dat5', None, None, None, None, None, 'gpio1_5'],
+        'proc_pin_name': 'GPMC_AD4',
+        'proc_signal_name': ['gpmc_ad4', 'mmc1_dat4', None, None, None, None, None, 'gpio1_4'],
         'reset_mode': 7,
         'gpio_chip': 1,
-        'gpio_number': 37,
+        'gpio_number': 36,
         'notes': None
     },
     {
@@ -1265,7 +1265,7 @@ BBB_P9_DEF = [
         'proc_signal_name': ['mcasp0_axr1', 'eQEP0_index', None, 'mcasp1_axr0', 'EMU3', 'pr1_pru0_pru_r30_6', 'pr1_pru0_pru_r31_6', 'gpio3_20'],
         'reset_mode': 7,
         'gpio_chip': 3,
-        'gpio_number': 114,
+        'gpio_number': 116,
         'notes': None
     },
     {
@@ -0,0 +1,151 @@
+# Copyright (C) 2014  Nicolas Jouanin
+#
+# This file is part of pybone.
+#
+# Pybone is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pybone is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pybone.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Compact, column oriented form of the pin_desc header definitions.
+
+pin_desc.py stays the human readable reference. The tables actually used at
+runtime live in _pin_table_data.py, generated from pin_desc with :
+
+    python -m pybone.bone.pin_table
+
+Each column holds one value per pin, P8 pins first then P9 pins. Integer
+columns are arrays using -1 for None, string columns are arrays of indexes
+into a pool of interned strings (-1 for None).
+"""
+
+import logging
+import os
+import sys
+from array import array
+
+LOGGER = logging.getLogger(__name__)
+
+HEADERS = ('P8', 'P9')
+SIGNAL_MODES = 8
+
+_INT_COLUMNS = ('head_pin', 'reg_offset', 'driver_pin', 'reset_mode', 'gpio_chip', 'gpio_number')
+_STRING_COLUMNS = ('head_name', 'proc_pin', 'proc_pin_name', 'notes')
+
+_DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '_pin_table_data.py')
+
+_pin_table = None
+
+
+class PinTable(object):
+    """
+    Immutable pin definitions table
+    """
+    __slots__ = ('strings', 'header', 'proc_signal_name') + _INT_COLUMNS + _STRING_COLUMNS
+
+    def __init__(self, data):
+        self.strings = tuple(sys.intern(s) for s in data.STRINGS)
+        self.header = array('b', data.HEADER)
+        for name in _INT_COLUMNS + _STRING_COLUMNS:
+            setattr(self, name, array('h', getattr(data, name.upper())))
+        self.proc_signal_name = array('h', data.PROC_SIGNAL_NAME)
+
+    def __len__(self):
+        return len(self.header)
+
+    def _string(self, index):
+        return None if index < 0 else self.strings[index]
+
+    def indexes(self, header):
+        """
+        Table indexes of the pins belonging to a header
+        :param header: header name (P8 or P9)
+        :return: range of table indexes
+        """
+        header_index = HEADERS.index(header)
+        first = self.header.index(header_index)
+        return range(first, first + self.header.count(header_index))
+
+    def definition(self, index):
+        """
+        Build a pin definition, using pin_desc format
+        :param index: pin index in table
+        :return: new definition dict
+        """
+        definition = {'header': HEADERS[self.header[index]]}
+        for name in _INT_COLUMNS:
+            value = getattr(self, name)[index]
+            definition[name] = None if value < 0 else value
+        for name in _STRING_COLUMNS:
+            definition[name] = self._string(getattr(self, name)[index])
+        signals = self.proc_signal_name[index * SIGNAL_MODES:(index + 1) * SIGNAL_MODES]
+        definition['proc_signal_name'] = tuple(self._string(s) for s in signals)
+        return definition
+
+
+def load_pin_table():
+    """
+    Get the pin definitions table, loading it on first call
+    :return: PinTable instance shared by all boards
+    """
+    global _pin_table
+    if _pin_table is None:
+        from pybone.bone import _pin_table_data
+        _pin_table = PinTable(_pin_table_data)
+    return _pin_table
+
+
+def _format_values(values, per_line=20):
+    lines = []
+    for i in range(0, len(values), per_line):
+        lines.append('    ' + ', '.join(repr(v) for v in values[i:i + per_line]) + ',')
+    return '(\n' + '\n'.join(lines) + '\n)'
+
+
+def generate(output=_DATA_FILE):
+    """
+    Generate compact tables module from pin_desc definitions
+    :param output: generated module path
+    """
+    from pybone.bone import pin_desc
+
+    strings = []
+    string_indexes = {}
+
+    def string_index(value):
+        if value is None:
+            return -1
+        if value not in string_indexes:
+            string_indexes[value] = len(strings)
+            strings.append(value)
+        return string_indexes[value]
+
+    columns = {name: [] for name in ('header', 'proc_signal_name') + _INT_COLUMNS + _STRING_COLUMNS}
+    for (header_index, definitions) in enumerate((pin_desc.BBB_P8_DEF, pin_desc.BBB_P9_DEF)):
+        for pin_def in definitions:
+            columns['header'].append(header_index)
+            for name in _INT_COLUMNS:
+                columns[name].append(-1 if pin_def[name] is None else pin_def[name])
+            for name in _STRING_COLUMNS:
+                columns[name].append(string_index(pin_def[name]))
+            columns['proc_signal_name'].extend(string_index(s) for s in pin_def['proc_signal_name'])
+
+    with open(output, 'w') as fp:
+        fp.write("# Generated by pybone.bone.pin_table from pin_desc.py, do not edit.\n\n")
+        fp.write("STRINGS = %s\n" % _format_values(strings, per_line=6))
+        for name in sorted(columns):
+            fp.write("\n%s = %s\n" % (name.upper(), _format_values(columns[name])))
+    LOGGER.info("Pin table written to %s" % output)
+
+
+if __name__ == '__main__':
+    generate(*sys.argv[1:])
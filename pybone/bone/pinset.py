@@ -0,0 +1,144 @@
+# Copyright (C) 2014  Nicolas Jouanin
+#
+# This file is part of pybone.
+#
+# Pybone is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pybone is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pybone.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+
+LOGGER = logging.getLogger(__name__)
+
+
+class PinSet(object):
+    """
+    Immutable set of board pins, stored as a bitmask over board pins positions : bit n is set
+    if the pin at position n in board pins belongs to the set. Set operations are integer
+    operations, and iterating yields pins from current board pins, in board order.
+    """
+    __slots__ = ('board', 'mask', '_bank_masks')
+
+    def __init__(self, board, mask=0):
+        """
+        :param board: Board the pins belong to
+        :param mask: pins positions bitmask
+        """
+        init = super().__setattr__
+        init('board', board)
+        init('mask', mask & board._definitions.full_mask)
+        init('_bank_masks', None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("PinSet is immutable")
+
+    @classmethod
+    def from_pins(cls, board, pins):
+        """
+        :param board: Board the pins belong to
+        :param pins: iterable of Pin
+        :return: PinSet
+        """
+        key_positions = board._definitions.key_positions
+        mask = 0
+        for pin in pins:
+            mask |= 1 << key_positions[pin.key]
+        return cls(board, mask)
+
+    def _mask_of(self, other):
+        if isinstance(other, PinSet):
+            return other.mask
+        return NotImplemented
+
+    def __or__(self, other):
+        mask = self._mask_of(other)
+        return mask if mask is NotImplemented else PinSet(self.board, self.mask | mask)
+
+    def __and__(self, other):
+        mask = self._mask_of(other)
+        return mask if mask is NotImplemented else PinSet(self.board, self.mask & mask)
+
+    def __sub__(self, other):
+        mask = self._mask_of(other)
+        return mask if mask is NotImplemented else PinSet(self.board, self.mask & ~mask)
+
+    def __xor__(self, other):
+        mask = self._mask_of(other)
+        return mask if mask is NotImplemented else PinSet(self.board, self.mask ^ mask)
+
+    def __invert__(self):
+        return PinSet(self.board, ~self.mask)
+
+    def __eq__(self, other):
+        if isinstance(other, PinSet):
+            return self.mask == other.mask
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.mask)
+
+    def __len__(self):
+        return bin(self.mask).count('1')
+
+    def __bool__(self):
+        return self.mask != 0
+
+    def positions(self):
+        """
+        Iterate on the positions of the pins of the set, in board order
+        """
+        mask = self.mask
+        while mask:
+            low_bit = mask & -mask
+            yield low_bit.bit_length() - 1
+            mask ^= low_bit
+
+    def __iter__(self):
+        pins = self.board.pins
+        return (pins[position] for position in self.positions())
+
+    def __contains__(self, pin):
+        position = self.board._definitions.key_positions.get(getattr(pin, 'key', None))
+        return position is not None and bool(self.mask >> position & 1)
+
+    def filter(self, predicate):
+        """
+        Get the pins of the set matching a predicate
+        :param predicate: callable taking a Pin
+        :return: PinSet
+        """
+        pins = self.board.pins
+        mask = 0
+        for position in self.positions():
+            if predicate(pins[position]):
+                mask |= 1 << position
+        return PinSet(self.board, mask)
+
+    def bank_masks(self):
+        """
+        Get the GPIO bank masks of the set pins, pins without GPIO are ignored
+        :return: dict mapping gpio_chip to the 32 bits mask of the set pins GPIO in this bank
+        """
+        bank_masks = self._bank_masks
+        if bank_masks is None:
+            bank_masks = {}
+            gpio_bits = self.board._definitions.gpio_bits
+            for position in self.positions():
+                gpio_bit = gpio_bits[position]
+                if gpio_bit is not None:
+                    (chip, bit) = gpio_bit
+                    bank_masks[chip] = bank_masks.get(chip, 0) | (1 << bit)
+            super().__setattr__('_bank_masks', bank_masks)
+        return dict(bank_masks)
+
+    def __repr__(self):
+        return "PinSet(%s)" % ','.join(pin.key for pin in self)
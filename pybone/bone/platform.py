@@ -17,7 +17,8 @@
 
 import platform
 import multiprocessing
-import asyncio
+
+from pybone.utils.executor import IOExecutor
 
 
 class PlatformError(Exception):
@@ -40,16 +41,83 @@ class Platform:
         self.processor = platform.processor() or platform.machine()
         try:
             self.processor_count = multiprocessing.cpu_count()
-        except NotImplemented:
+        except NotImplementedError:
             self.processor_count = 1
+        self.closed = False
+        self._executor = None
+
+    @property
+    def executor(self):
+        """
+        Thread pool running platform file I/O, sized from processor count
+        :return: IOExecutor
+        """
+        if self.closed:
+            raise PlatformError("%s is closed" % self.__class__.__name__)
+        if self._executor is None:
+            self._executor = IOExecutor(self.processor_count)
+        return self._executor
+
+    @classmethod
+    async def create(cls):
+        """
+        Create platform from a running event loop
+        """
+        return cls()
+
+    def read_board_info(self, loop=None):
+        pass
+
+    async def read_board_info_async(self):
+        return self.read_board_info()
+
+    def close(self):
+        self.closed = True
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def read_gpio_banks(self):
+        """
+        Read all GPIO banks input levels at once
+        :return: tuple of words, in gpio_chip order, bit n of word b is the level of GPIO b * 32 + n
+        """
+        raise PlatformError("GPIO banks sampling isn't supported by %s" % self.__class__.__name__)
+
+    def read_gpio_banks_into(self, words, offset, banks):
+        """
+        Read some GPIO banks input levels into a preallocated buffer
+        :param words: buffer of unsigned words, like an array('I')
+        :param offset: index in words of the first bank word
+        :param banks: read banks gpio_chip, their words are stored in this order
+        """
+        raise PlatformError("GPIO banks sampling isn't supported by %s" % self.__class__.__name__)
+
+    def write_gpio_banks(self, set_masks, clear_masks, single_store=False):
+        """
+        Change GPIO output levels, levels set in a bank at once, then levels cleared at once
+        :param set_masks: bits to set of each bank, in gpio_chip order
+        :param clear_masks: bits to clear of each bank, in gpio_chip order
+        :param single_store: change all levels of a bank at once, see GPIOBanks.write()
+        """
+        raise PlatformError("GPIO banks writing isn't supported by %s" % self.__class__.__name__)
+
+    async def prepare_gpio_edges(self, gpio_number):
+        """
+        Make a GPIO signal its edges, both rising and falling
+        :param gpio_number: GPIO number
+        :return: GPIO value file path, see pybone.bone.gpio.EdgeWatcher
+        """
+        raise PlatformError("GPIO edges aren't supported by %s" % self.__class__.__name__)
+
+    async def read_pins_file(self):
+        pass
 
-    def read_board_info(self):
+    async def read_pinmux_pins(self):
         pass
 
-    @asyncio.coroutine
-    def read_pins_file(self):
+    async def read_pins_registers(self):
         pass
 
-    @asyncio.coroutine
-    def read_pinmux_pins(self):
+    async def read_pinmux_owners(self):
         pass
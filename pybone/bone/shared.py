@@ -0,0 +1,290 @@
+# Copyright (C) 2014  Nicolas Jouanin
+#
+# This file is part of pybone.
+#
+# Pybone is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pybone is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pybone.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Board state shared between processes through a shared memory segment.
+
+One process owns the board and publishes it with SharedBoardPublisher, other processes
+create a Board over SharedMemoryPlatform, which reads the segment instead of platform files.
+The segment has a fixed size and is laid out as :
+
+    header      see _SEGMENT_HEADER
+    payload     board snapshot, see pybone.bone.snapshot
+
+The header sequence number is a seqlock : it is odd while the payload is written, readers
+retry until they read the same even sequence before and after decoding the payload.
+The header generation is incremented on each publication.
+"""
+
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import namedtuple
+
+from pybone.bone import Platform, PlatformError
+from pybone.bone.board import _load_pin_definitions
+from pybone.bone.snapshot import BoardSnapshot, SnapshotError, NO_REGISTER, pack_board, snapshot_key
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    #Python < 3.8
+    shared_memory = None
+
+LOGGER = logging.getLogger(__name__)
+
+SEGMENT_MAGIC = b'PYBONESH'
+SEGMENT_VERSION = 1
+DEFAULT_NAME = 'pybone'
+DEFAULT_CAPACITY = 16384
+
+#where POSIX shared memory segments are found on Linux
+_SHM_DIRECTORY = '/dev/shm'
+
+#magic, version, sequence, generation, payload capacity, payload size
+_SEGMENT_HEADER = struct.Struct('=8sIIIII4x')
+_FIELD = struct.Struct('=I')
+_SEQUENCE_OFFSET = 12
+_GENERATION_OFFSET = 16
+_SIZE_OFFSET = 24
+
+#strings and owner_ids are the raw owners data registers and owners were decoded from
+_SharedState = namedtuple('_SharedState', ('generation', 'identity', 'registers', 'owners', 'strings', 'owner_ids'))
+
+_segment_key = None
+
+
+def _get_segment_key():
+    #segments are only shared between processes using the same pin definitions
+    global _segment_key
+    if _segment_key is None:
+        _segment_key = snapshot_key('', '')
+    return _segment_key
+
+
+def _yield_processor():
+    try:
+        os.sched_yield()
+    except AttributeError:
+        time.sleep(0)
+
+
+def _check_shared_memory():
+    if shared_memory is None:
+        raise PlatformError("Shared memory requires Python 3.8 or later")
+
+
+class SharedBoardPublisher(object):
+    """
+    Publish a board in a shared memory segment, each time its pins change
+    """
+    def __init__(self, board, name=DEFAULT_NAME, capacity=DEFAULT_CAPACITY):
+        """
+        :param board: published Board
+        :param name: shared memory segment name
+        :param capacity: maximum snapshot size, in bytes
+        """
+        _check_shared_memory()
+        self.board = board
+        self.name = name
+        self.generation = 0
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._segment = self._create_segment(name, _SEGMENT_HEADER.size + capacity)
+        _SEGMENT_HEADER.pack_into(self._segment.buf, 0, SEGMENT_MAGIC, SEGMENT_VERSION, 1, 0, capacity, 0)
+        self._capacity = capacity
+        try:
+            self.publish()
+        except Exception:
+            self.close()
+            raise
+        board.subscribe(self._on_changes)
+
+    @staticmethod
+    def _create_segment(name, size):
+        try:
+            return shared_memory.SharedMemory(name, create=True, size=size)
+        except FileExistsError:
+            #left by a publisher which didn't close, segments outlive their processes
+            LOGGER.warning("Replacing stale shared memory segment %r" % name)
+        try:
+            os.unlink(os.path.join(_SHM_DIRECTORY, name))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            raise PlatformError("Can't remove stale shared memory segment %r: %s" % (name, e))
+        return shared_memory.SharedMemory(name, create=True, size=size)
+
+    def _on_changes(self, changes):
+        self.publish()
+
+    def publish(self):
+        """
+        Write board current state to the segment
+        """
+        payload = pack_board(self.board, _get_segment_key())
+        if len(payload) > self._capacity:
+            raise SnapshotError("Board snapshot size %d exceeds segment capacity %d" %
+                                (len(payload), self._capacity))
+        with self._lock:
+            if self._segment is None:
+                raise PlatformError("Shared memory segment %r is closed" % self.name)
+            buffer = self._segment.buf
+            sequence = (self._sequence + 1) & 0xffffffff
+            _FIELD.pack_into(buffer, _SEQUENCE_OFFSET, sequence)
+            start = _SEGMENT_HEADER.size
+            buffer[start:start + len(payload)] = payload
+            self.generation += 1
+            _FIELD.pack_into(buffer, _GENERATION_OFFSET, self.generation)
+            _FIELD.pack_into(buffer, _SIZE_OFFSET, len(payload))
+            self._sequence = (sequence + 1) & 0xffffffff
+            _FIELD.pack_into(buffer, _SEQUENCE_OFFSET, self._sequence)
+
+    def close(self, unlink=True):
+        """
+        Stop publishing and release the segment
+        :param unlink: destroy the segment, attached processes keep their mapping
+        """
+        if self._segment is None:
+            return
+        try:
+            self.board.unsubscribe(self._on_changes)
+        except ValueError:
+            pass
+        (segment, self._segment) = (self._segment, None)
+        segment.close()
+        if unlink:
+            segment.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class SharedMemoryPlatform(Platform):
+    """
+    Platform reading board state from a segment published by SharedBoardPublisher.
+    The segment is only decoded when its generation changed since previous read.
+    """
+    #delay in seconds before giving up reading consistently, while the publisher writes
+    READ_TIMEOUT = 0.5
+
+    def __init__(self, name=DEFAULT_NAME):
+        """
+        :param name: shared memory segment name
+        """
+        super().__init__()
+        self.name = name
+        #segment is mapped read-only, without multiprocessing.shared_memory which would
+        #register it for destruction when this process exits
+        try:
+            fd = os.open(os.path.join(_SHM_DIRECTORY, name), os.O_RDONLY)
+        except FileNotFoundError:
+            raise PlatformError("No shared memory segment %r" % name)
+        try:
+            self._mmap = mmap.mmap(fd, 0, mmap.MAP_SHARED, mmap.PROT_READ)
+        finally:
+            os.close(fd)
+        if len(self._mmap) < _SEGMENT_HEADER.size or \
+                struct.unpack_from('=8sI', self._mmap) != (SEGMENT_MAGIC, SEGMENT_VERSION):
+            self._mmap.close()
+            raise PlatformError("Segment %r isn't a version %d pybone segment" % (name, SEGMENT_VERSION))
+        self._buffer = memoryview(self._mmap)
+        self._sequence = None
+        self._state = None
+        self._addresses = tuple(definition.address for definition in _load_pin_definitions().definitions)
+
+    @property
+    def generation(self):
+        """
+        :return: generation of the last read state
+        """
+        return None if self._state is None else self._state.generation
+
+    def _read_state(self):
+        buffer = self._buffer
+        deadline = None
+        while True:
+            (sequence,) = _FIELD.unpack_from(buffer, _SEQUENCE_OFFSET)
+            if sequence == self._sequence:
+                return self._state
+            if not sequence & 1:
+                (state, error) = (None, None)
+                try:
+                    state = self._decode(buffer)
+                except (SnapshotError, IndexError, ValueError) as e:
+                    error = e
+                if _FIELD.unpack_from(buffer, _SEQUENCE_OFFSET)[0] == sequence:
+                    if state is None:
+                        raise PlatformError("Invalid shared memory segment %r: %s" % (self.name, error))
+                    (self._sequence, self._state) = (sequence, state)
+                    return state
+            #being written, let the publisher run
+            if deadline is None:
+                deadline = time.monotonic() + self.READ_TIMEOUT
+            elif time.monotonic() > deadline:
+                raise PlatformError("Couldn't read shared memory segment %r consistently" % self.name)
+            _yield_processor()
+
+    def _decode(self, buffer):
+        #BoardSnapshot reads the segment in place, but registers and owners are copied: the
+        #publisher may overwrite the segment as soon as the sequence is checked, and Board keeps
+        #comparing them afterwards. This only happens once per publication, see _read_state(),
+        #and owners are only decoded again when their raw data changed
+        (_, _, _, generation, capacity, size) = _SEGMENT_HEADER.unpack_from(buffer)
+        start = _SEGMENT_HEADER.size
+        with buffer[start:start + min(size, capacity)] as payload:
+            snapshot = BoardSnapshot(payload)
+            try:
+                if snapshot.key != _get_segment_key():
+                    raise SnapshotError("Segment published with other pin definitions")
+                if snapshot.pin_count != len(self._addresses):
+                    raise SnapshotError("Segment has %d pins, expected %d" % (snapshot.pin_count,
+                                                                             len(self._addresses)))
+                registers = [(address, None if value == NO_REGISTER else value)
+                             for (address, value) in zip(self._addresses, snapshot.registers.tolist())
+                             if address is not None]
+                owner_ids = snapshot.owner_ids.tobytes()
+                previous = self._state
+                if previous is not None and previous.owner_ids == owner_ids and previous.strings == snapshot.strings:
+                    owners = previous.owners
+                else:
+                    owners = [(address,) + snapshot.owners(position)
+                              for (position, address) in enumerate(self._addresses) if address is not None]
+                return _SharedState(generation, snapshot.identity, registers, owners, snapshot.strings, owner_ids)
+            finally:
+                snapshot.release()
+
+    def read_board_info(self, loop=None):
+        return self._read_state().identity[:3]
+
+    async def read_pins_registers(self):
+        return self._read_state().registers
+
+    async def read_pinmux_owners(self):
+        return self._read_state().owners
+
+    def close(self):
+        super().close()
+        self._state = None
+        self._buffer.release()
+        self._mmap.close()
@@ -0,0 +1,273 @@
+# Copyright (C) 2014  Nicolas Jouanin
+#
+# This file is part of pybone.
+#
+# Pybone is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pybone is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pybone.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Board snapshots, letting a process get a ready Board without discovering and reading
+sysfs and debugfs files again.
+
+A snapshot holds the board identity, the platform files paths and the pins runtime
+state at the time it was taken. It is stored in a binary file meant to be memory
+mapped, laid out as :
+
+    header      see _HEADER
+    identity    uint16[8]: string ids of name, revision, serial number and platform files
+    registers   uint32[pin_count]: pin register value, by board pin position
+    owners      uint16[4 * pin_count]: string ids of mux_owner, gpio_owner, function and group
+    strings     utf-8 strings, NUL separated
+
+String id NO_STRING and register value NO_REGISTER stand for None.
+Snapshots are keyed by boot id and kernel release, and by pin definitions,
+so a snapshot from a previous boot or another pybone version is never used.
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+
+from pybone.bone import Linux38Platform, PlatformError
+from pybone.bone.board import Board, _load_pin_definitions
+
+LOGGER = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b'PYBONESN'
+SNAPSHOT_VERSION = 1
+
+NO_STRING = 0xffff
+NO_REGISTER = 0xffffffff
+
+#magic, version, key, refresh time (time.monotonic()), pin count, strings size
+_HEADER = struct.Struct('=8sI32sdII')
+_IDENTITY_COUNT = 8
+_OWNERS_PER_PIN = 4
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def snapshot_key(boot_id, kernel_release):
+    """
+    Compute snapshot key
+    :param boot_id: kernel boot id
+    :param kernel_release: kernel release
+    :return: key bytes
+    """
+    key = hashlib.sha256()
+    key.update(boot_id.strip().encode())
+    key.update(b'\0')
+    key.update(kernel_release.encode())
+    key.update(b'\0')
+    for definition in _load_pin_definitions().definitions:
+        key.update(struct.pack('=I', definition.address or 0))
+    return key.digest()
+
+
+def pack_board(board, key):
+    """
+    Serialize a board into snapshot format
+    :param board: Board instance
+    :param key: snapshot key
+    :return: snapshot bytes
+    """
+    strings = []
+    string_ids = {}
+
+    def string_id(value):
+        if value is None:
+            return NO_STRING
+        if value not in string_ids:
+            string_ids[value] = len(strings)
+            strings.append(value)
+        return string_ids[value]
+
+    identity = [board.name, board.revision, board.serial_number]
+    identity += [getattr(board.platform, name, None) for name in Linux38Platform.FILES]
+    identity_ids = array('H', (string_id(value) for value in identity))
+    registers = array('I', (NO_REGISTER if pin.register_value is None else pin.register_value for pin in board.pins))
+    owners = array('H')
+    for pin in board.pins:
+        owners.extend((string_id(pin.mux_owner), string_id(pin.gpio_owner),
+                       string_id(pin.function), string_id(pin.group)))
+    if len(strings) >= NO_STRING:
+        raise SnapshotError("Too many strings for snapshot format")
+    strings_blob = '\0'.join(strings).encode()
+    header = _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, key, board.refresh_time or 0.0,
+                          len(board.pins), len(strings_blob))
+    return b''.join((header, identity_ids.tobytes(), registers.tobytes(), owners.tobytes(), strings_blob))
+
+
+class BoardSnapshot(object):
+    """
+    Read access to a snapshot, over any buffer (bytes, mmap, shared memory)
+    """
+    def __init__(self, buffer):
+        if len(buffer) < _HEADER.size:
+            raise SnapshotError("Truncated snapshot header")
+        (magic, version, self.key, self.refresh_time, self.pin_count, strings_size) = _HEADER.unpack_from(buffer)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise SnapshotError("Not a version %d snapshot" % SNAPSHOT_VERSION)
+        offset = _HEADER.size
+        identity_end = offset + 2 * _IDENTITY_COUNT
+        registers_end = identity_end + 4 * self.pin_count
+        owners_end = registers_end + 2 * _OWNERS_PER_PIN * self.pin_count
+        if len(buffer) < owners_end + strings_size:
+            raise SnapshotError("Truncated snapshot")
+        try:
+            blob = bytes(buffer[owners_end:owners_end + strings_size])
+            self.strings = tuple(blob.decode().split('\0')) if strings_size else ()
+        except UnicodeDecodeError as e:
+            raise SnapshotError("Invalid snapshot strings: %s" % e)
+        self._buffer = memoryview(buffer)
+        self._identity = self._buffer[offset:identity_end].cast('H')
+        self.registers = self._buffer[identity_end:registers_end].cast('I')
+        self._owners = self._buffer[registers_end:owners_end].cast('H')
+
+    def string(self, string_id):
+        return None if string_id == NO_STRING else self.strings[string_id]
+
+    @property
+    def identity(self):
+        """
+        :return: (name, revision, serial number, platform files...) tuple
+        """
+        return tuple(self.string(string_id) for string_id in self._identity)
+
+    def register(self, position):
+        value = self.registers[position]
+        return None if value == NO_REGISTER else value
+
+    @property
+    def owner_ids(self):
+        """
+        :return: memoryview of owners string ids, (mux_owner, gpio_owner, function, group) of each pin
+        """
+        return self._owners
+
+    def owners(self, position):
+        """
+        :return: (mux_owner, gpio_owner, function, group) of the pin at position
+        """
+        start = position * _OWNERS_PER_PIN
+        return tuple(self.string(string_id) for string_id in self._owners[start:start + _OWNERS_PER_PIN])
+
+    def release(self):
+        for view in (self._identity, self.registers, self._owners, self._buffer):
+            view.release()
+
+
+class SnapshotCache(object):
+    """
+    Board snapshot stored in a directory, /run by default so it doesn't survive reboots
+    """
+    _BOOT_ID_FILE = '/proc/sys/kernel/random/boot_id'
+    FILE_NAME = 'board.snapshot'
+
+    def __init__(self, directory='/run/pybone'):
+        self.directory = directory
+        self.file = os.path.join(directory, self.FILE_NAME)
+
+    def key(self, kernel_release=None):
+        with open(self._BOOT_ID_FILE) as fp:
+            boot_id = fp.read()
+        if kernel_release is None:
+            kernel_release = os.uname().release
+        return snapshot_key(boot_id, kernel_release)
+
+    def save(self, board):
+        """
+        Store board snapshot, replacing previous one atomically
+        :return: True if snapshot was stored
+        """
+        tmp_file = None
+        try:
+            content = pack_board(board, self.key(board.platform.kernel_release))
+            os.makedirs(self.directory, exist_ok=True)
+            #unique name, as threads and processes may save concurrently
+            (fd, tmp_file) = tempfile.mkstemp(prefix=self.FILE_NAME + '.', dir=self.directory)
+            #readable by other users processes, as files created by open()
+            os.fchmod(fd, 0o644)
+            with open(fd, 'wb') as fp:
+                fp.write(content)
+            os.replace(tmp_file, self.file)
+        except OSError as e:
+            LOGGER.warning("Couldn't store board snapshot in %s: %s" % (self.file, e))
+            if tmp_file is not None:
+                try:
+                    os.unlink(tmp_file)
+                except OSError:
+                    pass
+            return False
+        return True
+
+    def load(self, registers_backend=Linux38Platform.DEBUGFS_BACKEND):
+        """
+        Build a board from stored snapshot, without reading platform files
+        :param registers_backend: Linux38Platform registers backend
+        :return: Board instance, or None if there's no valid snapshot
+        """
+        try:
+            fd = os.open(self.file, os.O_RDONLY)
+        except OSError:
+            return None
+        try:
+            size = os.fstat(fd).st_size
+            if size < _HEADER.size:
+                return None
+            with mmap.mmap(fd, size, mmap.MAP_SHARED, mmap.PROT_READ) as buffer:
+                snapshot = BoardSnapshot(buffer)
+                try:
+                    return self._load_board(snapshot, registers_backend)
+                finally:
+                    snapshot.release()
+        except SnapshotError as e:
+            LOGGER.warning("Invalid board snapshot %s: %s" % (self.file, e))
+            return None
+        except (OSError, PlatformError) as e:
+            #like a missing boot id file or an unsupported platform, a cold start will tell
+            LOGGER.warning("Couldn't load board snapshot %s: %s" % (self.file, e))
+            return None
+        finally:
+            os.close(fd)
+
+    def _load_board(self, snapshot, registers_backend):
+        platform = Linux38Platform(registers_backend=registers_backend, discover=False)
+        try:
+            if snapshot.key != self.key(platform.kernel_release):
+                LOGGER.debug("Board snapshot %s is stale" % self.file)
+                platform.close()
+                return None
+            return Board.from_snapshot(platform, snapshot)
+        except Exception:
+            platform.close()
+            raise
+
+    def get_board(self, registers_backend=Linux38Platform.DEBUGFS_BACKEND):
+        """
+        Get board from snapshot, or from platform if there's no valid snapshot. In the later
+        case, a new snapshot is stored.
+        :param registers_backend: Linux38Platform registers backend
+        :return: Board instance
+        """
+        board = self.load(registers_backend)
+        if board is None:
+            board = Board(Linux38Platform(registers_backend=registers_backend))
+            self.save(board)
+        return board
@@ -0,0 +1,62 @@
+# Copyright (C) 2014  Nicolas Jouanin
+#
+# This file is part of pybone.
+#
+# Pybone is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pybone is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pybone.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Run pybone daemon : python -m pybone.daemon
+"""
+
+import argparse
+import asyncio
+import logging
+
+from pybone.bone import Linux38Platform
+from pybone.bone.board import Board
+from .server import PinServer, DEFAULT_SOCKET
+
+
+async def serve(args):
+    platform = await Linux38Platform.create(registers_backend=args.registers_backend)
+    board = await Board.create(platform)
+    server = PinServer(board, args.socket)
+    board.start_monitor(min_interval=args.min_interval, max_interval=args.max_interval)
+    await server.start()
+    try:
+        await server.serve_forever()
+    finally:
+        server.close()
+        await board.stop_monitor()
+        board.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve BeagleBone pins state over a Unix socket")
+    parser.add_argument('--socket', default=DEFAULT_SOCKET, help="Unix socket path")
+    parser.add_argument('--registers-backend', default=Linux38Platform.DEBUGFS_BACKEND,
+                        choices=(Linux38Platform.DEBUGFS_BACKEND, Linux38Platform.MMAP_BACKEND))
+    parser.add_argument('--min-interval', type=float, default=0.1, help="minimum pins refresh interval (s)")
+    parser.add_argument('--max-interval', type=float, default=5.0, help="maximum pins refresh interval (s)")
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
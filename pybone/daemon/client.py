@@ -0,0 +1,154 @@
+# Copyright (C) 2014  Nicolas Jouanin
+#
+# This file is part of pybone.
+#
+# Pybone is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pybone is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pybone.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import itertools
+import logging
+
+from pybone.bone import Platform
+from pybone.bone.board import Board, _load_pin_definitions
+from pybone.bone.pin import Pin
+from pybone.bone.snapshot import BoardSnapshot
+from . import protocol
+from .server import DEFAULT_SOCKET
+
+LOGGER = logging.getLogger(__name__)
+
+
+class PinClient(object):
+    """
+    pybone daemon client. Requests may be sent concurrently, they are pipelined on the connection.
+    Pins returned by the daemon are detached from any board.
+    """
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._request_ids = itertools.count(1)
+        self._pending = {}
+        self._definitions = _load_pin_definitions().definitions
+        self._reader_task = asyncio.ensure_future(self._read_responses())
+
+    @classmethod
+    async def connect(cls, path=DEFAULT_SOCKET):
+        """
+        Connect to daemon
+        :param path: daemon Unix socket path
+        :return: PinClient instance
+        """
+        (reader, writer) = await asyncio.open_unix_connection(path)
+        return cls(reader, writer)
+
+    async def _read_responses(self):
+        error = None
+        try:
+            while True:
+                (request_id, status, payload) = await protocol.read_frame(self._reader)
+                future = self._pending.pop(request_id, None)
+                if future is None or future.done():
+                    continue
+                if status == protocol.STATUS_OK:
+                    future.set_result(payload)
+                else:
+                    future.set_exception(protocol.ProtocolError(payload.decode(errors='replace')))
+        except asyncio.IncompleteReadError:
+            error = ConnectionError("Connection closed by daemon")
+        except Exception as e:
+            error = e
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error or ConnectionError("Client closed"))
+            self._pending.clear()
+
+    async def _request(self, operation, payload=b''):
+        if self._reader_task.done():
+            raise ConnectionError("Not connected")
+        request_id = next(self._request_ids) & 0xffffffff
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self._writer.write(protocol.encode_frame(request_id, operation, payload))
+        await self._writer.drain()
+        return await future
+
+    def _pin(self, record):
+        (position, register_value, owners) = record
+        if position == protocol.NO_POSITION:
+            return None
+        return Pin(None, self._definitions[position], register_value, owners)
+
+    async def query(self, queries):
+        """
+        Look pins up in one request
+        :param queries: iterable of (QUERY_*, value) tuples
+        :return: list of Pin, None for queries matching no pin
+        """
+        payload = await self._request(protocol.OP_QUERY, protocol.encode_queries(queries))
+        return [self._pin(record) for record in protocol.decode_pins(payload)]
+
+    async def get_pin(self, key=None, address=None, gpio_number=None):
+        """
+        Get pin matching key, address or GPIO number
+        :return: Pin or None
+        """
+        if key is not None:
+            query = (protocol.QUERY_KEY, key)
+        elif address is not None:
+            query = (protocol.QUERY_ADDRESS, address)
+        elif gpio_number is not None:
+            query = (protocol.QUERY_GPIO, gpio_number)
+        else:
+            raise ValueError("Expected key, address or gpio_number")
+        return (await self.query([query]))[0]
+
+    async def snapshot(self):
+        """
+        Get daemon board state
+        :return: (BoardVersion, Board) tuple
+        """
+        payload = await self._request(protocol.OP_SNAPSHOT)
+        (version, size) = protocol.decode_version(payload)
+        snapshot = BoardSnapshot(payload[size:])
+        try:
+            return version, Board.from_snapshot(Platform(), snapshot)
+        finally:
+            snapshot.release()
+
+    async def diff(self, version):
+        """
+        Get pins changed since a version
+        :param version: BoardVersion returned by a previous snapshot() or diff(), possibly by another
+        daemon instance
+        :return: (BoardVersion, full, pins) tuple, full is True if pins are all board pins because
+        the given version is unknown to the daemon
+        """
+        payload = await self._request(protocol.OP_DIFF, protocol.encode_version(version))
+        (version, full, records) = protocol.decode_diff(payload)
+        return version, full, [self._pin(record) for record in records]
+
+    async def close(self):
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+        await self._reader_task
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
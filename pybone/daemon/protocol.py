@@ -0,0 +1,232 @@
+# Copyright (C) 2014  Nicolas Jouanin
+#
+# This file is part of pybone.
+#
+# Pybone is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pybone is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pybone.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+pybone daemon wire protocol.
+
+Requests and responses are frames made of a FRAME_HEADER followed by payload_size bytes.
+Requests header code is an OP_* operation, responses header code is a STATUS_* status and
+request_id is the one of the answered request. Responses are sent in requests order, so
+clients may send requests without waiting for previous responses.
+
+Payloads, all integers in network byte order :
+
+    OP_QUERY request        uint16 count, then count queries : uint8 QUERY_*, then a string
+                            for QUERY_KEY or an uint32 for QUERY_ADDRESS and QUERY_GPIO
+    OP_QUERY response       pins list, NO_POSITION position for queries matching no pin
+    OP_SNAPSHOT request     empty
+    OP_SNAPSHOT response    version, then board snapshot (see pybone.bone.snapshot)
+    OP_DIFF request         version
+    OP_DIFF response        version, uint8 full, then pins list of pins changed since
+                            requested version, or of all pins if full
+    STATUS_ERROR response   utf-8 error message
+
+A version is an uint64 server epoch followed by an uint64 board generation. The epoch is drawn
+randomly when the server is created: generations from another server, or from a previous run
+of the same server, are never compared with the current board generation.
+
+A string is an uint16 size followed by utf-8 bytes, NO_STRING size stands for None.
+A pins list is an uint16 count followed by count pins : uint16 board position, uint32
+register value (NO_REGISTER for None) and 4 strings : mux_owner, gpio_owner, function, group.
+"""
+
+import struct
+from collections import namedtuple
+
+from pybone.bone.snapshot import NO_REGISTER
+
+#payload size, request id, operation or status
+FRAME_HEADER = struct.Struct('!IIB')
+MAX_PAYLOAD_SIZE = 1 << 20
+
+OP_QUERY = 1
+OP_SNAPSHOT = 2
+OP_DIFF = 3
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+QUERY_KEY = 0
+QUERY_ADDRESS = 1
+QUERY_GPIO = 2
+
+NO_POSITION = 0xffff
+NO_STRING = 0xffff
+
+_COUNT = struct.Struct('!H')
+_UINT8 = struct.Struct('!B')
+_UINT32 = struct.Struct('!I')
+_VERSION = struct.Struct('!QQ')
+_DIFF_HEADER = struct.Struct('!QQB')
+_PIN_HEADER = struct.Struct('!HI')
+_OWNERS_COUNT = 4
+
+
+BoardVersion = namedtuple('BoardVersion', ('epoch', 'generation'))
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def encode_frame(request_id, code, payload=b''):
+    if len(payload) > MAX_PAYLOAD_SIZE:
+        raise ProtocolError("Payload size %d exceeds %d" % (len(payload), MAX_PAYLOAD_SIZE))
+    return FRAME_HEADER.pack(len(payload), request_id, code) + payload
+
+
+async def read_frame(reader):
+    """
+    Read a frame from stream
+    :param reader: asyncio.StreamReader
+    :return: (request_id, code, payload) tuple
+    """
+    (size, request_id, code) = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+    if size > MAX_PAYLOAD_SIZE:
+        raise ProtocolError("Payload size %d exceeds %d" % (size, MAX_PAYLOAD_SIZE))
+    payload = await reader.readexactly(size) if size else b''
+    return request_id, code, payload
+
+
+def _encode_string(parts, value):
+    if value is None:
+        parts.append(_COUNT.pack(NO_STRING))
+    else:
+        data = value.encode()
+        parts.append(_COUNT.pack(len(data)))
+        parts.append(data)
+
+
+def _decode_string(payload, offset):
+    (size,) = _COUNT.unpack_from(payload, offset)
+    offset += _COUNT.size
+    if size == NO_STRING:
+        return None, offset
+    end = offset + size
+    if end > len(payload):
+        raise ProtocolError("Truncated string")
+    return bytes(payload[offset:end]).decode(), end
+
+
+def encode_queries(queries):
+    """
+    :param queries: iterable of (QUERY_*, value) tuples
+    :return: OP_QUERY payload
+    """
+    queries = list(queries)
+    parts = [_COUNT.pack(len(queries))]
+    for (kind, value) in queries:
+        parts.append(_UINT8.pack(kind))
+        if kind == QUERY_KEY:
+            _encode_string(parts, value)
+        elif kind in (QUERY_ADDRESS, QUERY_GPIO):
+            parts.append(_UINT32.pack(value))
+        else:
+            raise ProtocolError("Unknown query kind %r" % kind)
+    return b''.join(parts)
+
+
+def decode_queries(payload):
+    """
+    :param payload: OP_QUERY payload
+    :return: list of (QUERY_*, value) tuples
+    """
+    try:
+        (count,) = _COUNT.unpack_from(payload)
+        offset = _COUNT.size
+        queries = []
+        for _ in range(count):
+            (kind,) = _UINT8.unpack_from(payload, offset)
+            offset += _UINT8.size
+            if kind == QUERY_KEY:
+                (value, offset) = _decode_string(payload, offset)
+            elif kind in (QUERY_ADDRESS, QUERY_GPIO):
+                (value,) = _UINT32.unpack_from(payload, offset)
+                offset += _UINT32.size
+            else:
+                raise ProtocolError("Unknown query kind %r" % kind)
+            queries.append((kind, value))
+        return queries
+    except (struct.error, UnicodeDecodeError) as e:
+        raise ProtocolError("Invalid queries: %s" % e)
+
+
+def encode_pins(pins):
+    """
+    :param pins: iterable of (position, register_value, owners) tuples, position is NO_POSITION
+    for missing pins
+    :return: pins list bytes
+    """
+    pins = list(pins)
+    parts = [_COUNT.pack(len(pins))]
+    for (position, register_value, owners) in pins:
+        parts.append(_PIN_HEADER.pack(position, NO_REGISTER if register_value is None else register_value))
+        for owner in owners:
+            _encode_string(parts, owner)
+    return b''.join(parts)
+
+
+def decode_pins(payload, offset=0):
+    """
+    :param payload: bytes holding a pins list
+    :param offset: pins list offset in payload
+    :return: list of (position, register_value, owners) tuples
+    """
+    try:
+        (count,) = _COUNT.unpack_from(payload, offset)
+        offset += _COUNT.size
+        pins = []
+        for _ in range(count):
+            (position, register_value) = _PIN_HEADER.unpack_from(payload, offset)
+            offset += _PIN_HEADER.size
+            owners = []
+            for _ in range(_OWNERS_COUNT):
+                (owner, offset) = _decode_string(payload, offset)
+                owners.append(owner)
+            pins.append((position, None if register_value == NO_REGISTER else register_value, tuple(owners)))
+        return pins
+    except (struct.error, UnicodeDecodeError) as e:
+        raise ProtocolError("Invalid pins list: %s" % e)
+
+
+def encode_version(version):
+    return _VERSION.pack(*version)
+
+
+def decode_version(payload):
+    """
+    :return: (BoardVersion, size) tuple, size is the version encoded size
+    """
+    try:
+        return BoardVersion(*_VERSION.unpack_from(payload)), _VERSION.size
+    except struct.error as e:
+        raise ProtocolError("Invalid version: %s" % e)
+
+
+def encode_diff(version, full, pins):
+    return _DIFF_HEADER.pack(version.epoch, version.generation, 1 if full else 0) + encode_pins(pins)
+
+
+def decode_diff(payload):
+    """
+    :return: (BoardVersion, full, pins) tuple, see decode_pins()
+    """
+    try:
+        (epoch, generation, full) = _DIFF_HEADER.unpack_from(payload)
+    except struct.error as e:
+        raise ProtocolError("Invalid diff: %s" % e)
+    return BoardVersion(epoch, generation), bool(full), decode_pins(payload, _DIFF_HEADER.size)
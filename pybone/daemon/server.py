@@ -0,0 +1,166 @@
+# Copyright (C) 2014  Nicolas Jouanin
+#
+# This file is part of pybone.
+#
+# Pybone is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pybone is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pybone.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import logging
+import os
+
+from pybone.bone.snapshot import pack_board
+from . import protocol
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_SOCKET = '/run/pybone/pybone.sock'
+
+_SNAPSHOT_KEY = bytes(32)
+
+
+class PinServer(object):
+    """
+    Serve a board pins state to local clients, over a Unix domain socket.
+    The server owns the board, which should be refreshed from the server event loop, for
+    example with Board.start_monitor().
+    """
+    def __init__(self, board, path=DEFAULT_SOCKET):
+        """
+        :param board: served Board
+        :param path: Unix socket path
+        """
+        self.board = board
+        self.path = path
+        #identifies this server in versions sent to clients
+        self.epoch = int.from_bytes(os.urandom(8), 'big')
+        self._server = None
+        self._writers = set()
+        self._positions = {pin.key: position for (position, pin) in enumerate(board.pins)}
+        #generation of the last change of each pin
+        self._pin_generations = [0] * len(board.pins)
+        self._handlers = {
+            protocol.OP_QUERY: self._query,
+            protocol.OP_SNAPSHOT: self._snapshot,
+            protocol.OP_DIFF: self._diff,
+        }
+
+    async def start(self):
+        """
+        Start listening, replacing any stale socket file
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        self.board.subscribe(self._on_changes)
+        self._server = await asyncio.start_unix_server(self._serve_client, self.path)
+        LOGGER.info("Serving board on %s" % self.path)
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    def close(self):
+        """
+        Stop listening and close clients connections, call wait_closed() to wait for
+        clients handlers end
+        """
+        if self._server is not None and self._server.is_serving():
+            self._server.close()
+            for writer in self._writers:
+                writer.close()
+            self.board.unsubscribe(self._on_changes)
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+    async def wait_closed(self):
+        if self._server is not None:
+            await self._server.wait_closed()
+            self._server = None
+
+    def _on_changes(self, changes):
+        for change in changes:
+            self._pin_generations[self._positions[change.pin.key]] = change.generation
+
+    async def _serve_client(self, reader, writer):
+        self._writers.add(writer)
+        try:
+            while True:
+                try:
+                    (request_id, operation, payload) = await protocol.read_frame(reader)
+                except asyncio.IncompleteReadError:
+                    break
+                writer.write(self._handle(request_id, operation, payload))
+                #only waits when the client doesn't read responses
+                await writer.drain()
+        except protocol.ProtocolError as e:
+            LOGGER.warning("Closing client connection: %s" % e)
+        except ConnectionError:
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    def _handle(self, request_id, operation, payload):
+        handler = self._handlers.get(operation)
+        if handler is None:
+            return protocol.encode_frame(request_id, protocol.STATUS_ERROR,
+                                         ("Unknown operation %r" % operation).encode())
+        try:
+            response = handler(payload)
+        except protocol.ProtocolError as e:
+            return protocol.encode_frame(request_id, protocol.STATUS_ERROR, str(e).encode())
+        return protocol.encode_frame(request_id, protocol.STATUS_OK, response)
+
+    def _find(self, kind, value):
+        if kind == protocol.QUERY_KEY:
+            return self._positions.get(value)
+        elif kind == protocol.QUERY_ADDRESS:
+            pin = self.board.get_pin(address=value)
+        else:
+            pin = self.board.get_pin(gpio_number=value)
+        return None if pin is None else self._positions[pin.key]
+
+    def _query(self, payload):
+        #all queries answered from the same published pins
+        pins = self.board.pins
+        records = []
+        for (kind, value) in protocol.decode_queries(payload):
+            position = self._find(kind, value)
+            if position is None:
+                records.append((protocol.NO_POSITION, None, (None,) * 4))
+            else:
+                pin = pins[position]
+                records.append((position, pin.register_value, pin.owners))
+        return protocol.encode_pins(records)
+
+    def _version(self):
+        return protocol.BoardVersion(self.epoch, self.board.generation)
+
+    def _snapshot(self, payload):
+        return protocol.encode_version(self._version()) + pack_board(self.board, _SNAPSHOT_KEY)
+
+    def _diff(self, payload):
+        (since, _) = protocol.decode_version(payload)
+        version = self._version()
+        pins = self.board.pins
+        #versions of another server, or from the future, can't be compared: resend everything
+        full = since.epoch != version.epoch or since.generation > version.generation
+        records = [(position, pin.register_value, pin.owners) for (position, pin) in enumerate(pins)
+                   if full or self._pin_generations[position] > since.generation]
+        return protocol.encode_diff(version, full, records)
@@ -1 +1,106 @@
 __author__ = 'nico'
+
+import os
+import shutil
+import struct
+import tempfile
+from unittest.mock import patch, MagicMock
+
+from pybone.bone import Linux38Platform
+from pybone.bone.gpio import GPIO_BANK_COUNT
+from pybone.bone.linux_3_8.gpio_banks import GPIO_BANK_SIZE, GPIO_DATAIN_OFFSET
+
+_RESOURCES_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), "../resources")
+
+
+def platform_files_patchers(resources_dir=_RESOURCES_DIR):
+    """
+    :param resources_dir: directory containing board-name, revision, serial-number, pins and pinmux-pins files
+    :return: patchers making Linux38Platform read its files from resources_dir, also used by benchmarks
+    """
+    return [patch.object(Linux38Platform, attr, os.path.join(resources_dir, file_name))
+            for (attr, file_name) in (('_BOARD_NAME_FILE', 'board-name'),
+                                      ('_REVISION_FILE', 'revision'),
+                                      ('_SERIAL_NUMBER_FILE', 'serial-number'),
+                                      ('_PINS_FILE', 'pins'),
+                                      ('_PINMUX_FILE', 'pinmux-pins'))]
+
+
+def patch_fixture_platform(test_case):
+    """
+    Make Linux38Platform run on test resources files, for the duration of a test
+    """
+    patchers = [patch('pybone.bone.platform.platform')] + platform_files_patchers()
+    mock_platform = patchers[0].start()
+    for patcher in patchers[1:]:
+        patcher.start()
+    for patcher in patchers:
+        test_case.addCleanup(patcher.stop)
+    mock_platform.system = MagicMock(return_value='Linux')
+    mock_platform.release = MagicMock(return_value='3.8')
+    mock_platform.processor = MagicMock(return_value='arm')
+
+
+def build_fixture_root(root, resources_dir=_RESOURCES_DIR, devices=0):
+    """
+    Lay a files tree out like a BeagleBone root, also used by benchmarks
+    :param root: existing tree root directory
+    :param resources_dir: directory containing board-name, revision, serial-number, pins and pinmux-pins files
+    :param devices: count of other devices in sys/devices, making discovery scan them
+    """
+    baseboard = os.path.join(root, 'sys/devices/bone_capemgr.9/baseboard')
+    pinmux = os.path.join(root, 'sys/kernel/debug/pinctrl/44e10800.pinmux')
+    for (directory, file_names) in ((baseboard, ('board-name', 'revision', 'serial-number')),
+                                    (pinmux, ('pins', 'pinmux-pins'))):
+        os.makedirs(directory)
+        for file_name in file_names:
+            shutil.copy(os.path.join(resources_dir, file_name), directory)
+    for index in range(devices):
+        os.makedirs(os.path.join(root, 'sys/devices/device.%d' % index))
+
+
+def make_fixture_root(test_case):
+    """
+    Build a files tree laid out like a BeagleBone root, with test resources files, for the
+    duration of a test
+    :return: tree root directory
+    """
+    tmp_dir = tempfile.TemporaryDirectory()
+    test_case.addCleanup(tmp_dir.cleanup)
+    build_fixture_root(tmp_dir.name)
+    return tmp_dir.name
+
+
+#GPIO banks laid out one after the other in stand-in files
+FILE_BANK_ADDRESSES = tuple(GPIO_BANK_SIZE * bank for bank in range(GPIO_BANK_COUNT))
+
+
+def write_gpio_banks(file, words):
+    """
+    Write a GPIO banks stand-in file. An existing file is overwritten in place, as truncating
+    a mapped file makes its readers fault
+    :param file: file path
+    :param words: DATAIN word of each bank
+    """
+    content = bytearray(GPIO_BANK_SIZE * len(FILE_BANK_ADDRESSES))
+    for (address, word) in zip(FILE_BANK_ADDRESSES, words):
+        struct.pack_into('=I', content, address + GPIO_DATAIN_OFFSET, word)
+    with open(file, 'r+b' if os.path.exists(file) else 'wb') as fp:
+        fp.write(content)
+
+
+def gpio_banks_patchers(file):
+    """
+    :return: patchers making Linux38Platform map GPIO banks from a stand-in file, also used by benchmarks
+    """
+    return [patch.object(Linux38Platform, attr, value)
+            for (attr, value) in (('_GPIO_BANKS_FILE', file), ('_GPIO_BANK_ADDRESSES', FILE_BANK_ADDRESSES))]
+
+
+def patch_gpio_banks(test_case, file):
+    """
+    Make Linux38Platform map GPIO banks from a stand-in file, for the duration of a test
+    """
+    for patcher in gpio_banks_patchers(file):
+        patcher.start()
+        test_case.addCleanup(patcher.stop)
@@ -1,8 +1,12 @@
+import asyncio
+import threading
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
-from pybone.bone import Platform
+from pybone.bone import Platform, Linux38Platform, PlatformError
 from pybone.bone.board import *
+from pybone.bone.pin import RegPullTypeEnum
+from pybone.tests.bone import patch_fixture_platform
 
 
 class ParsePinMuxTestFunction(unittest.TestCase):
@@ -27,7 +31,525 @@ class ParsePinMuxTestFunction(unittest.TestCase):
     #     p = Pin(board, p_def)
     #     self.assertEquals('P8_3', p.key)
 
-if __name__ == '__main__':
-    unittest.main()
 
+class BoardPinsTest(unittest.TestCase):
+
+    def setUp(self):
+        patch_fixture_platform(self)
+        self.board = Board(Linux38Platform())
+        self.addCleanup(self.board.close)
+
+    def test_get_pin_by_key(self):
+        pin = self.board.get_pin(key='P8_3')
+        self.assertEqual(Header.p8, pin.header)
+        self.assertEqual(3, pin.header_pin)
+
+    def test_get_pin_by_address(self):
+        pin = self.board.get_pin(address=0x44e10818)
+        self.assertEqual('P8_3', pin.key)
+        self.assertIsNone(self.board.get_pin(address=0x44e1ffff))
+
+    def test_get_pin_by_gpio_number(self):
+        self.assertEqual('P8_3', self.board.get_pin(gpio_number=38).key)
+
+    def test_iter_pins_combined(self):
+        self.assertEqual(['P8_3'], [p.key for p in self.board.iter_pins(header=Header.p8, driver_pin=6)])
+        self.assertEqual([], list(self.board.iter_pins(header=Header.p9, driver_pin=6)))
+
+    def test_iter_header_pins(self):
+        self.assertEqual(46, len(list(self.board.iter_p8_pins())))
+        self.assertEqual(48, len(list(self.board.iter_p9_pins())))
+        self.assertEqual(len(self.board.pins), len(list(self.board.iter_pins())))
+
+    def test_pins_runtime_attributes(self):
+        pin = self.board.get_pin(key='P8_3')
+        self.assertEqual(1, pin.register_mode)
+        self.assertEqual(RegPullTypeEnum.pullup, pin.register_pulltype)
+        self.assertEqual('mmc.10', pin.mux_owner)
+        self.assertIsNone(pin.gpio_owner)
+        self.assertEqual('pinmux_emmc2_pins', pin.function)
+
+    def test_pins_runtime_attributes_per_line(self):
+        """
+        Platforms only providing per line parsing are still supported
+        """
+        pf = self.board.platform
+        pf.read_pins_registers = MagicMock(side_effect=Platform().read_pins_registers)
+        pf.read_pinmux_owners = MagicMock(side_effect=Platform().read_pinmux_owners)
+        board = Board(pf)
+        pin = board.get_pin(key='P8_3')
+        self.assertEqual(1, pin.register_mode)
+        self.assertEqual('mmc.10', pin.mux_owner)
+        self.assertEqual('pinmux_emmc2_pins', pin.group)
+
+    def test_close_releases_pinctrl_files(self):
+        pf = self.board.platform
+        self.assertEqual(2, len(pf.file_cache))
+        with Board(pf):
+            self.assertEqual(2, len(pf.file_cache))
+        self.assertEqual(0, len(pf.file_cache))
+
+
+class BoardSignalTest(unittest.TestCase):
+
+    def setUp(self):
+        patch_fixture_platform(self)
+        self.board = Board(Linux38Platform())
+        self.addCleanup(self.board.close)
+
+    def test_find_signal(self):
+        matches = self.board.find_signal('uart1_txd')
+        self.assertEqual([('P9_24', 0, 'uart1_txd')], [(m.pin.key, m.mode, m.signal) for m in matches])
+        self.assertEqual(matches, self.board.find_signal('UART1_TXD'))
+        self.assertEqual([], self.board.find_signal('uart9_txd'))
+
+    def test_find_signal_prefix(self):
+        matches = self.board.find_signal('ehrpwm1', prefix=True)
+        signals = {m.signal for m in matches}
+        self.assertIn('ehrpwm1A', signals)
+        self.assertIn('ehrpwm1_tripzone_input', signals)
+        for match in matches:
+            self.assertTrue(match.signal.lower().startswith('ehrpwm1'))
+            self.assertEqual(match.signal, match.pin.proc_signal_name[match.mode])
+
+    def test_find_signal_mux_state(self):
+        matches = self.board.find_signal('mmc1_dat6')
+        self.assertEqual([('P8_3', 1), ('P8_16', 2)], [(m.pin.key, m.mode) for m in matches])
+        self.assertTrue(matches[0].selected)
+        self.assertEqual('mmc.10', matches[0].owner)
+        self.assertNotIn('P8_3', [m.pin.key for m in self.board.find_signal('mmc1_dat6', available=True)])
+        matches = [m for m in self.board.find_signal('gpio1_6') if m.pin.key == 'P8_3']
+        self.assertEqual([7], [m.mode for m in matches])
+        self.assertFalse(matches[0].selected)
+
+
+class BoardCreateTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        patch_fixture_platform(self)
+
+    async def test_create(self):
+        pf = await Linux38Platform.create()
+        board = await Board.create(pf)
+        self.assertEqual('BeagleBone Black', board.name)
+        self.assertEqual('0A6A', board.revision)
+        self.assertEqual('0414BBBK2885', board.serial_number)
+        pin = board.get_pin(key='P8_3')
+        self.assertEqual(1, pin.register_mode)
+        self.assertEqual('mmc.10', pin.mux_owner)
+        board.close()
+
+    async def test_refresh(self):
+        board = await Board.create(await Linux38Platform.create())
+        pins = board.pins
+        await board.refresh()
+        #nothing changed, pins are kept
+        self.assertIs(pins, board.pins)
+        self.assertEqual(0x31, board.get_pin(key='P8_3').register_value)
+        board.close()
+
+    async def test_create_base_platform(self):
+        pf = await Platform.create()
+        pf.read_board_info = MagicMock(return_value=['BeagleBone Black', '0A6A', '0414BBBK2885'])
+        board = await Board.create(pf)
+        self.assertEqual('BeagleBone Black', board.name)
+
+    async def test_sync_api_in_running_loop(self):
+        with self.assertRaises(RuntimeError):
+            Linux38Platform()
+
+
+class CountingPlatform(Platform):
+    """
+    Platform counting pins reads, each read taking delay seconds
+    """
+    def __init__(self, delay=0.0):
+        super().__init__()
+        self.delay = delay
+        self.reads = 0
+        self.error = None
+        self.registers = [(0x44e10818, 0x27)]
+        self.owners = []
+
+    def read_board_info(self, loop=None):
+        return ['BeagleBone Black', '0A6A', '0414BBBK2885']
+
+    async def read_pins_registers(self):
+        self.reads += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return list(self.registers)
+
+    async def read_pinmux_owners(self):
+        return list(self.owners)
+
+
+class BoardRefreshTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_concurrent_refresh(self):
+        pf = CountingPlatform(delay=0.05)
+        board = await Board.create(pf)
+        await asyncio.gather(*(board.refresh() for _ in range(10)))
+        self.assertEqual(2, pf.reads)
+        await board.refresh()
+        self.assertEqual(3, pf.reads)
+
+    async def test_refresh_max_staleness(self):
+        pf = CountingPlatform()
+        board = await Board.create(pf)
+        await board.refresh(max_staleness=60)
+        self.assertEqual(1, pf.reads)
+        await board.refresh(max_staleness=0)
+        self.assertEqual(2, pf.reads)
+
+    async def test_refresh_error_shared(self):
+        pf = CountingPlatform(delay=0.05)
+        board = await Board.create(pf)
+        pf.error = PlatformError("read failed")
+        results = await asyncio.gather(*(board.refresh() for _ in range(3)), return_exceptions=True)
+        self.assertEqual([pf.error] * 3, results)
+        self.assertEqual(2, pf.reads)
+        pf.error = None
+        await board.refresh()
+        self.assertEqual(3, pf.reads)
+
+    async def test_cancelled_caller(self):
+        pf = CountingPlatform(delay=0.05)
+        board = await Board.create(pf)
+        pf.registers = [(0x44e10818, 0x37)]
+        first = asyncio.ensure_future(board.refresh())
+        second = asyncio.ensure_future(board.refresh())
+        await asyncio.sleep(0.01)
+        first.cancel()
+        await second
+        self.assertEqual(0x37, board.get_pin(key='P8_3').register_value)
+
+    async def test_refresh_shared_with_thread(self):
+        """
+        Coroutines and threads refreshing at the same time share one update
+        """
+        pf = CountingPlatform(delay=0.1)
+        board = await Board.create(pf)
+        pf.registers = [(0x44e10818, 0x37)]
+        results = []
+        thread = threading.Thread(target=lambda: results.append(board.update_pins_runtime_attributes()))
+        thread.start()
+        await asyncio.sleep(0.03)
+        changes = await board.refresh()
+        await asyncio.get_running_loop().run_in_executor(None, thread.join)
+        self.assertEqual(2, pf.reads)
+        self.assertEqual(['P8_3'], [change.pin.key for change in changes])
+        self.assertEqual([changes], results)
+
+    async def test_thread_joins_coroutine_refresh(self):
+        pf = CountingPlatform(delay=0.1)
+        board = await Board.create(pf)
+        refresh = asyncio.ensure_future(board.refresh())
+        await asyncio.sleep(0.03)
+        joined = asyncio.get_running_loop().run_in_executor(None, board.update_pins_runtime_attributes)
+        await asyncio.gather(refresh, joined)
+        self.assertEqual(2, pf.reads)
+
+
+    async def test_sync_refresh_in_refreshing_loop(self):
+        pf = CountingPlatform(delay=0.1)
+        board = await Board.create(pf)
+        refresh = asyncio.ensure_future(board.refresh())
+        await asyncio.sleep(0)
+        with self.assertRaises(RuntimeError):
+            board.update_pins_runtime_attributes()
+        with self.assertRaises(RuntimeError):
+            board.update_pins_runtime_attributes(loop=asyncio.get_running_loop())
+        await refresh
+        self.assertEqual(2, pf.reads)
+
+
+class BoardThreadsRefreshTest(unittest.TestCase):
+
+    def test_concurrent_refresh(self):
+        pf = CountingPlatform(delay=0.2)
+        board = Board(pf)
+        barrier = threading.Barrier(8)
+
+        def refresh():
+            barrier.wait()
+            board.update_pins_runtime_attributes()
+
+        threads = [threading.Thread(target=refresh) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(2, pf.reads)
+
+    def test_refresh_max_staleness(self):
+        pf = CountingPlatform()
+        board = Board(pf)
+        board.update_pins_runtime_attributes(max_staleness=60)
+        self.assertEqual(1, pf.reads)
+        board.update_pins_runtime_attributes()
+        self.assertEqual(2, pf.reads)
+
+
+class BoardChangesTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_refresh_unchanged(self):
+        pf = CountingPlatform()
+        board = await Board.create(pf)
+        notified = []
+        board.subscribe(notified.append)
+        self.assertEqual([], await board.refresh())
+        self.assertEqual([], notified)
+
+    async def test_refresh_changes(self):
+        pf = CountingPlatform()
+        board = await Board.create(pf)
+        notified = []
+        board.subscribe(notified.append)
+        pf.registers = [(0x44e10818, 0x37), (0x44e1081c, 0x27)]
+        pf.owners = [(0x44e10818, 'ocp:helper', '(MUX UNCLAIMED)', None, None)]
+        changes = await board.refresh()
+        self.assertEqual(['P8_3', 'P8_4'], [change.pin.key for change in changes])
+        self.assertEqual((0x27, 0x37), (changes[0].old_register_value, changes[0].register_value))
+        self.assertTrue(changes[0].owners_changed)
+        self.assertEqual('ocp:helper', changes[0].owners[0])
+        self.assertEqual((None, 0x27), (changes[1].old_register_value, changes[1].register_value))
+        self.assertFalse(changes[1].owners_changed)
+        self.assertEqual([changes], notified)
+        self.assertEqual(2, board.generation)
+        self.assertEqual(2, changes[0].generation)
+        board.unsubscribe(notified.append)
+        pf.registers = [(0x44e10818, 0x27)]
+        self.assertEqual(1, len(await board.refresh()))
+        self.assertEqual(1, len(notified))
+
+    async def test_subscriber_error(self):
+        pf = CountingPlatform()
+        board = await Board.create(pf)
+        board.subscribe(MagicMock(side_effect=ValueError))
+        pf.registers = [(0x44e10818, 0x37)]
+        with self.assertLogs('pybone.bone.board', 'ERROR'):
+            changes = await board.refresh()
+        self.assertEqual(1, len(changes))
+
+    async def test_watch(self):
+        pf = CountingPlatform()
+        board = await Board.create(pf)
+        watcher = board.watch()
+        pending = asyncio.ensure_future(watcher.__anext__())
+        await asyncio.sleep(0)
+        pf.registers = [(0x44e10818, 0x37)]
+        await board.refresh()
+        change = await asyncio.wait_for(pending, 1)
+        self.assertEqual(0x37, change.register_value)
+        await watcher.aclose()
+        self.assertEqual([], board._subscribers)
+
+    async def test_watch_records_before_iteration(self):
+        pf = CountingPlatform()
+        board = await Board.create(pf)
+        async with board.watch() as watcher:
+            pf.registers = [(0x44e10818, 0x37)]
+            await board.refresh()
+            async for change in watcher:
+                self.assertEqual(0x37, change.register_value)
+                break
+        self.assertEqual([], board._subscribers)
+        with self.assertRaises(StopAsyncIteration):
+            await watcher.__anext__()
+
+    async def test_watch_maxsize(self):
+        pf = CountingPlatform()
+        board = await Board.create(pf)
+        async with board.watch(maxsize=1) as watcher:
+            pf.registers = [(0x44e10818, 0x37)]
+            await board.refresh()
+            pf.registers = [(0x44e10818, 0x27)]
+            with self.assertLogs('pybone.bone.board', 'WARNING'):
+                await board.refresh()
+            self.assertEqual(0x37, (await watcher.__anext__()).register_value)
+            self.assertTrue(watcher._queue.empty())
+
+    async def test_watch_close_pending(self):
+        pf = CountingPlatform()
+        board = await Board.create(pf)
+        watcher = board.watch()
+        changes = []
+
+        async def consume():
+            async for change in watcher:
+                changes.append(change)
+
+        consumer = asyncio.ensure_future(consume())
+        await asyncio.sleep(0.01)
+        self.assertFalse(consumer.done())
+        await watcher.aclose()
+        await asyncio.wait_for(consumer, 1)
+        self.assertEqual([], changes)
+
+    async def test_watch_thread_refresh(self):
+        pf = CountingPlatform()
+        board = await Board.create(pf)
+        watcher = board.watch()
+        pending = asyncio.ensure_future(watcher.__anext__())
+        await asyncio.sleep(0)
+        pf.registers = [(0x44e10818, 0x37)]
+        changes = await asyncio.get_running_loop().run_in_executor(None, board.update_pins_runtime_attributes)
+        change = await asyncio.wait_for(pending, 1)
+        self.assertIs(changes[0], change)
+        await watcher.aclose()
+
+
+class BoardPublishTest(unittest.TestCase):
+
+    def test_refresh_replaces_changed_pins(self):
+        pf = CountingPlatform()
+        board = Board(pf)
+        pins = board.pins
+        pf.registers = [(0x44e10818, 0x37)]
+        board.update_pins_runtime_attributes()
+        self.assertIsNot(pins, board.pins)
+        self.assertEqual(0x27, pins[2].register_value)
+        self.assertEqual(0x37, board.pins[2].register_value)
+        for position in range(3, len(pins)):
+            self.assertIs(pins[position], board.pins[position])
+
+    def test_consistent_readers(self):
+        pf = CountingPlatform()
+        board = Board(pf)
+        states = [([(0x44e10818, 0x37)], [(0x44e10818, 'a', None, None, None)]),
+                  ([(0x44e10818, 0x27)], [(0x44e10818, 'b', None, None, None)])]
+        expected = {(0x37, 'a'), (0x27, 'b')}
+        done = threading.Event()
+        errors = []
+
+        def read():
+            while not done.is_set():
+                pin = board.pins[2]
+                if (pin.register_value, pin.mux_owner) not in expected:
+                    errors.append(pin)
+
+        (pf.registers, pf.owners) = states[1]
+        board.update_pins_runtime_attributes()
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        for i in range(50):
+            (pf.registers, pf.owners) = states[i % 2]
+            board.update_pins_runtime_attributes()
+        done.set()
+        for reader in readers:
+            reader.join()
+        self.assertEqual([], errors)
+
+
+class FakeClock(object):
+    """
+    Fake monotonic clock for board module, advanced by asyncio.sleep() calls instead of waiting.
+    sleeps records non zero delays
+    """
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+        self._sleep = asyncio.sleep
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, delay, result=None):
+        if delay > 0:
+            self.sleeps.append(delay)
+            self.now += delay
+        await self._sleep(0)
+        return result
+
+    def patch(self, test):
+        for patcher in (patch('pybone.bone.board.time', self), patch('asyncio.sleep', self.sleep)):
+            patcher.start()
+            test.addCleanup(patcher.stop)
+
+    async def run_until(self, predicate):
+        """
+        Let other tasks run until predicate() is true
+        """
+        for _ in range(10000):
+            if predicate():
+                return
+            await self._sleep(0)
+        raise AssertionError("Condition not reached")
+
+
+class BoardMonitorTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.clock.patch(self)
+
+    async def test_monitor_backoff(self):
+        pf = CountingPlatform()
+        board = await Board.create(pf)
+        board.start_monitor(min_interval=0.125, max_interval=0.5)
+        await self.clock.run_until(lambda: pf.reads >= 5)
+        self.assertEqual(0.5, board.monitor_interval)
+        #pins were just read by Board.create(), first monitor iteration doesn't read them
+        self.assertEqual([0.125, 0.25, 0.5, 0.5], self.clock.sleeps[:4])
+        with self.assertRaises(RuntimeError):
+            board.start_monitor()
+        await board.stop_monitor()
+        reads = pf.reads
+        for _ in range(10):
+            await asyncio.sleep(0)
+        self.assertEqual(reads, pf.reads)
+
+    async def test_monitor_changes(self):
+        pf = CountingPlatform()
+        board = await Board.create(pf)
+        notified = []
+        board.subscribe(notified.append)
+        board.start_monitor(min_interval=0.125, max_interval=0.5)
+        await self.clock.run_until(lambda: board.monitor_interval == 0.5)
+        pf.registers = [(0x44e10818, 0x37)]
+        await self.clock.run_until(lambda: notified)
+        self.assertEqual(1, len(notified))
+        self.assertEqual(0x37, notified[0][0].register_value)
+        #interval is reset by changes
+        await self.clock.run_until(lambda: board.monitor_interval == 0.125)
+        await board.stop_monitor()
+
+    async def test_monitor_skip_fresh(self):
+        pf = CountingPlatform()
+        board = await Board.create(pf)
+        board.start_monitor(min_interval=0.125, max_interval=0.5)
+        await self.clock.run_until(lambda: pf.reads >= 1)
+        await board.stop_monitor()
+        #pins refreshed by another caller: monitor doesn't read them again, nor backs off
+        await board.refresh()
+        reads = pf.reads
+        sleeps = len(self.clock.sleeps)
+        board.start_monitor(min_interval=0.125, max_interval=0.5)
+        await self.clock.run_until(lambda: len(self.clock.sleeps) > sleeps)
+        self.assertEqual(reads, pf.reads)
+        self.assertEqual(0.125, self.clock.sleeps[sleeps])
+        self.assertEqual(0.125, board.monitor_interval)
+        await board.stop_monitor()
+
+    async def test_monitor_error(self):
+        pf = CountingPlatform()
+        board = await Board.create(pf)
+        pf.error = PlatformError("read failed")
+        with self.assertLogs('pybone.bone.board', 'ERROR'):
+            board.start_monitor(min_interval=0.125, max_interval=0.25)
+            await self.clock.run_until(lambda: pf.reads >= 3)
+        self.assertFalse(board._monitor_task.done())
+        board.close()
+
+    async def test_monitor_slow_refresh(self):
+        pf = CountingPlatform(delay=0.25)
+        board = await Board.create(pf)
+        board.start_monitor(min_interval=0.0625, max_interval=0.0625, max_load=0.5)
+        await self.clock.run_until(lambda: pf.reads >= 4)
+        await board.stop_monitor()
+        #Board.create() read, skipped fresh iteration, then each 250ms refresh is followed by a 250ms sleep
+        self.assertEqual([0.25, 0.0625] + [0.25] * 4, self.clock.sleeps[:6])
 
@@ -0,0 +1,182 @@
+# Copyright (C) 2014  Nicolas Jouanin
+#
+# This file is part of pybone.
+#
+# Pybone is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pybone is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pybone.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from pybone.bone import Linux38Platform, Platform, PlatformError
+from pybone.bone.board import Board
+from pybone.bone.capture import GPIOCapture
+from pybone.tests.bone import patch_fixture_platform, patch_gpio_banks, write_gpio_banks
+
+WORDS = (0x00000001, 0x80000040, 0x00000010, 0xffffffff)
+
+
+class CaptureTestCase(unittest.TestCase):
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.file = os.path.join(tmp_dir.name, 'mem')
+        write_gpio_banks(self.file, WORDS)
+        patch_fixture_platform(self)
+        patch_gpio_banks(self, self.file)
+        self.board = Board(Linux38Platform())
+        self.addCleanup(self.board.close)
+
+    def capture(self, **kwargs):
+        capture = GPIOCapture(self.board, **kwargs)
+        self.addCleanup(capture.stop)
+        return capture
+
+    def wait_available(self, capture, count, timeout=2):
+        deadline = time.monotonic() + timeout
+        while capture.available < count:
+            self.assertLess(time.monotonic(), deadline, "Capture stalled")
+            time.sleep(0.001)
+
+
+class GPIOCaptureTest(CaptureTestCase):
+
+    def test_banks(self):
+        self.assertEqual((0, 1, 2, 3), self.capture().banks)
+        #GPIO 38 and 39 are both in bank 1
+        capture = self.capture(pins=[self.board.get_pin(gpio_number=38), self.board.get_pin(gpio_number=39)])
+        self.assertEqual((1,), capture.banks)
+        without_gpio = [pin for pin in self.board.pins if pin.gpio_number is None]
+        with self.assertRaises(ValueError):
+            self.capture(pins=without_gpio)
+
+    def test_rate(self):
+        with self.capture(rate=1000) as capture:
+            time.sleep(0.2)
+        block = capture.drain()
+        #sleep granularity makes the rate lower, never higher
+        self.assertTrue(20 < len(block) <= 250, len(block))
+        intervals = [b - a for (a, b) in zip(block.timestamps, block.timestamps[1:])]
+        self.assertGreaterEqual(min(intervals), 0)
+        self.assertGreaterEqual(sum(intervals) / len(intervals), 900000)
+
+    def test_samples(self):
+        capture = self.capture(rate=None)
+        with capture:
+            self.wait_available(capture, 10)
+            write_gpio_banks(self.file, (0, 0, 0, 0))
+            first = capture.drain()
+            self.wait_available(capture, 10)
+        second = capture.drain()
+        self.assertEqual(len(first) * 4, len(first.words))
+        self.assertEqual(list(WORDS), first.words[:4].tolist())
+        self.assertEqual([0, 0, 0, 0], second.words[-4:].tolist())
+        self.assertEqual([0x80000040] * 2, first.bank_words(1)[:2].tolist())
+        self.assertEqual([1, 1], first.levels(self.board.get_pin(gpio_number=38))[:2])
+        self.assertEqual([1, 1], first.levels(63)[:2])
+        self.assertEqual([0, 0], first.levels(39)[:2])
+        self.assertEqual(0, second.levels(38)[-1])
+        self.assertLess(first.timestamps[-1], second.timestamps[0])
+
+    def test_overrun_and_wrap(self):
+        capture = self.capture(rate=None, capacity=8)
+        with capture:
+            self.wait_available(capture, 8)
+            #samples are dropped, not overwritten
+            first = capture.drain(5)
+            self.wait_available(capture, 8)
+        self.assertGreater(capture.overruns, 0)
+        self.assertEqual(5, len(first))
+        block = capture.drain()
+        self.assertEqual(8, len(block))
+        self.assertEqual(32, len(block.words))
+        self.assertEqual(list(WORDS) * 8, block.words.tolist())
+        self.assertEqual(sorted(block.timestamps), block.timestamps.tolist())
+        self.assertLess(first.timestamps[-1], block.timestamps[0])
+        self.assertEqual(0, len(capture.drain()))
+
+    def test_unthrottled_overrun(self):
+        capture = self.capture(rate=None, capacity=8)
+        with capture:
+            self.wait_available(capture, 8)
+            #sampling pauses until samples are drained
+            time.sleep(0.05)
+            self.assertEqual(1, capture.overruns)
+            capture.drain(4)
+            self.wait_available(capture, 8)
+            time.sleep(0.05)
+            self.assertEqual(2, capture.overruns)
+        self.assertFalse(capture.running)
+
+    def test_read_not_started(self):
+        capture = self.capture()
+        self.assertEqual(0, len(capture.read()))
+        self.assertEqual([], list(capture.iter_blocks()))
+
+    def test_read_from_thread(self):
+        capture = self.capture(rate=2000, batch=20)
+        blocks = []
+        consumer = threading.Thread(target=lambda: blocks.extend(capture.iter_blocks()))
+        with capture:
+            consumer.start()
+            time.sleep(0.1)
+        consumer.join(2)
+        self.assertFalse(consumer.is_alive())
+        self.assertGreater(len(blocks), 1)
+        self.assertEqual(0, capture.available)
+        timestamps = [timestamp for block in blocks for timestamp in block.timestamps]
+        self.assertEqual(sorted(timestamps), timestamps)
+
+    def test_platform_without_banks(self):
+        self.board.platform = Platform()
+        with self.assertRaises(PlatformError):
+            self.capture().start()
+
+    def test_sampling_error(self):
+        capture = self.capture(rate=1000)
+        with capture:
+            self.wait_available(capture, 1)
+            self.board.platform.gpio_banks.close()
+            with self.assertRaises(Exception) as context:
+                while True:
+                    capture.read(1)
+        self.assertIs(capture.error, context.exception)
+        self.assertFalse(capture.running)
+
+
+class GPIOCaptureAsyncTest(CaptureTestCase, unittest.IsolatedAsyncioTestCase):
+
+    async def test_read_async_not_started(self):
+        capture = self.capture()
+        self.assertEqual(0, len(await asyncio.wait_for(capture.read_async(), 1)))
+
+    async def test_aiter_blocks(self):
+        capture = self.capture(rate=2000, batch=20)
+        blocks = []
+
+        async def consume():
+            async for block in capture.aiter_blocks():
+                blocks.append(block)
+
+        task = asyncio.ensure_future(consume())
+        with capture:
+            await asyncio.sleep(0.1)
+        await asyncio.wait_for(task, 2)
+        self.assertGreater(len(blocks), 1)
+        self.assertTrue(all(len(block) for block in blocks))
+        self.assertEqual(0, capture.available)
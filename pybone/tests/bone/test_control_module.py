@@ -0,0 +1,110 @@
+# Copyright (C) 2014  Nicolas Jouanin
+#
+# This file is part of pybone.
+#
+# Pybone is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pybone is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pybone.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import struct
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+from pybone.bone import Linux38Platform, PlatformError
+from pybone.bone.board import Board
+from pybone.bone.linux_3_8.control_module import ControlModule, CONTROL_MODULE_SIZE, PAD_REGISTERS_OFFSET, \
+    PAD_REGISTERS_COUNT
+
+_RESOURCES_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), "../resources")
+
+
+def write_control_module(file, registers):
+    """
+    Write a control module stand-in file
+    :param file: file path
+    :param registers: dict of register value by pad index
+    """
+    content = bytearray(CONTROL_MODULE_SIZE)
+    for (index, value) in registers.items():
+        struct.pack_into('=I', content, PAD_REGISTERS_OFFSET + 4 * index, value)
+    with open(file, 'wb') as fp:
+        fp.write(content)
+
+
+class ControlModuleTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.file = os.path.join(tmp_dir.name, 'mem')
+        write_control_module(self.file, {0: 0x31, 6: 0x27, PAD_REGISTERS_COUNT - 1: 0x2f})
+
+    def test_read_registers(self):
+        control_module = ControlModule(self.file, address=0)
+        registers = dict(control_module.read_registers())
+        control_module.close()
+        self.assertEqual(PAD_REGISTERS_COUNT, len(registers))
+        self.assertEqual(0x31, registers[0x44e10800])
+        self.assertEqual(0x27, registers[0x44e10818])
+        self.assertEqual(0x2f, registers[0x44e10800 + 4 * (PAD_REGISTERS_COUNT - 1)])
+        self.assertEqual(0, registers[0x44e10804])
+
+    def test_read_registers_sees_updates(self):
+        control_module = ControlModule(self.file, address=0)
+        write_control_module(self.file, {6: 0x07})
+        self.assertEqual(0x07, dict(control_module.read_registers())[0x44e10818])
+        control_module.close()
+
+    def test_read_closed(self):
+        control_module = ControlModule(self.file, address=0)
+        control_module.close()
+        control_module.close()
+        with self.assertRaises(PlatformError):
+            control_module.read_registers()
+
+    def test_open_fails(self):
+        with self.assertRaises(PlatformError):
+            ControlModule(os.path.join(os.path.dirname(self.file), 'missing'), address=0)
+
+    @patch('pybone.bone.platform.platform')
+    @patch.object(Linux38Platform, '_BOARD_NAME_FILE', os.path.join(_RESOURCES_DIR, 'board-name'))
+    @patch.object(Linux38Platform, '_REVISION_FILE', os.path.join(_RESOURCES_DIR, 'revision'))
+    @patch.object(Linux38Platform, '_SERIAL_NUMBER_FILE', os.path.join(_RESOURCES_DIR, 'serial-number'))
+    @patch.object(Linux38Platform, '_PINS_FILE', os.path.join(_RESOURCES_DIR, 'pins'))
+    @patch.object(Linux38Platform, '_PINMUX_FILE', os.path.join(_RESOURCES_DIR, 'pinmux-pins'))
+    @patch.object(Linux38Platform, '_CONTROL_MODULE_ADDRESS', 0)
+    def test_platform_mmap_backend(self, mock_platform):
+        mock_platform.system = MagicMock(return_value='Linux')
+        mock_platform.release = MagicMock(return_value='3.8')
+        mock_platform.processor = MagicMock(return_value='arm')
+        with patch.object(Linux38Platform, '_CONTROL_MODULE_FILE', self.file):
+            pf = Linux38Platform(registers_backend=Linux38Platform.MMAP_BACKEND)
+        board = Board(pf)
+        pin = board.get_pin(key='P8_3')
+        self.assertEqual(0x27, pin.register_value)
+        self.assertEqual(7, pin.register_mode)
+        #Owners are still read from debugfs
+        self.assertEqual('mmc.10', pin.mux_owner)
+        pf.close()
+
+    @patch('pybone.bone.platform.platform')
+    def test_platform_unknown_backend(self, mock_platform):
+        mock_platform.system = MagicMock(return_value='Linux')
+        mock_platform.release = MagicMock(return_value='3.8')
+        mock_platform.processor = MagicMock(return_value='arm')
+        with self.assertRaises(PlatformError):
+            Linux38Platform(registers_backend='sysfs')
+
+if __name__ == '__main__':
+    unittest.main()
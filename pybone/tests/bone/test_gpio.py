@@ -0,0 +1,217 @@
+# Copyright (C) 2014  Nicolas Jouanin
+#
+# This file is part of pybone.
+#
+# Pybone is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pybone is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pybone.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import os
+import select
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from pybone.bone import Linux38Platform, PlatformError
+from pybone.bone.board import Board
+from pybone.bone.gpio import EdgeWatcher, FALLING, RISING, _pollers
+from pybone.bone.pin import Pin
+from pybone.tests.bone import patch_fixture_platform
+
+
+class FifoTestCase(unittest.IsolatedAsyncioTestCase):
+    """
+    Stand a FIFO in for sysfs GPIO value files : FIFOs signal written values with EPOLLIN
+    """
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.fifo = os.path.join(tmp_dir.name, 'value')
+        os.mkfifo(self.fifo)
+        #opened before the writer, so watchers never see a hang up
+        self.keeper = os.open(self.fifo, os.O_RDONLY | os.O_NONBLOCK)
+        self.addCleanup(os.close, self.keeper)
+        self.writer = os.open(self.fifo, os.O_WRONLY)
+        self.addCleanup(self._close_writer)
+
+    def _close_writer(self):
+        if self.writer is not None:
+            os.close(self.writer)
+            self.writer = None
+
+    def write(self, *values):
+        os.write(self.writer, b''.join(b'%d\n' % value for value in values))
+
+    def watcher(self, gpio_number=38):
+        watcher = EdgeWatcher(self.fifo, gpio_number, events=select.EPOLLIN)
+        self.addCleanup(watcher.close)
+        return watcher
+
+
+class EdgeWatcherTest(FifoTestCase):
+
+    async def test_wait_edge(self):
+        watcher = self.watcher()
+        waiter = asyncio.ensure_future(watcher.wait(RISING))
+        await asyncio.sleep(0)
+        self.write(0)
+        await asyncio.sleep(0.01)
+        self.assertFalse(waiter.done())
+        self.write(1)
+        event = await asyncio.wait_for(waiter, 1)
+        self.assertEqual((38, RISING, 1), event[:3])
+        self.assertEqual(1, watcher.value)
+
+    async def test_same_value_isnt_an_edge(self):
+        watcher = self.watcher()
+        self.write(1)
+        await watcher.wait()
+        waiter = asyncio.ensure_future(watcher.wait())
+        self.write(1, 1, 0)
+        event = await asyncio.wait_for(waiter, 1)
+        self.assertEqual(FALLING, event.edge)
+
+    async def test_many_waiters(self):
+        watcher = self.watcher()
+        waiters = [asyncio.ensure_future(watcher.wait(RISING)) for _ in range(1000)]
+        await asyncio.sleep(0)
+        self.write(1)
+        events = await asyncio.wait_for(asyncio.gather(*waiters), 1)
+        self.assertEqual(1, len(set(events)))
+
+    async def test_edges_iterator(self):
+        watcher = self.watcher()
+        events = []
+
+        async def collect():
+            async for event in watcher.edges(FALLING):
+                events.append(event)
+                if len(events) == 2:
+                    break
+
+        task = asyncio.ensure_future(collect())
+        await asyncio.sleep(0)
+        self.write(1, 0, 1, 0)
+        await asyncio.wait_for(task, 1)
+        self.assertEqual([FALLING, FALLING], [event.edge for event in events])
+        self.assertLessEqual(events[0].timestamp, events[1].timestamp)
+        self.assertEqual([], watcher._queues)
+
+    async def test_timeout(self):
+        watcher = self.watcher()
+        with self.assertRaises(asyncio.TimeoutError):
+            await watcher.wait(timeout=0.01)
+        self.assertEqual([], watcher._waiters)
+
+    async def test_unknown_edge(self):
+        with self.assertRaises(ValueError):
+            await self.watcher().wait('up')
+
+    async def test_close(self):
+        watcher = self.watcher()
+        waiter = asyncio.ensure_future(watcher.wait())
+        iterator = watcher.edges()
+        next_event = asyncio.ensure_future(iterator.__anext__())
+        await asyncio.sleep(0)
+        watcher.close()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiter
+        with self.assertRaises(StopAsyncIteration):
+            await next_event
+        self.assertTrue(watcher.closed)
+        self.assertNotIn(asyncio.get_running_loop(), _pollers)
+        with self.assertRaises(PlatformError):
+            await watcher.wait()
+
+    async def test_hang_up(self):
+        os.close(self.keeper)
+        self.keeper = os.open(os.devnull, os.O_RDONLY)
+        watcher = self.watcher()
+        waiter = asyncio.ensure_future(watcher.wait())
+        await asyncio.sleep(0)
+        self._close_writer()
+        with self.assertRaises(PlatformError):
+            await asyncio.wait_for(waiter, 1)
+        self.assertTrue(watcher.closed)
+
+    async def test_watchers_share_poller(self):
+        (first, second) = (self.watcher(38), self.watcher(39))
+        self.assertIs(first._poller, second._poller)
+        first.close()
+        self.assertIn(asyncio.get_running_loop(), _pollers)
+
+
+class PinEdgeTest(FifoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        patch_fixture_platform(self)
+        self.board = Board(Linux38Platform())
+        self.addCleanup(self.board.close)
+        self.board.platform.prepare_gpio_edges = self._prepare_gpio_edges
+        self.prepared = []
+        patcher = patch('pybone.bone.gpio.SYSFS_EVENTS', select.EPOLLIN)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def _prepare_gpio_edges(self, gpio_number):
+        self.prepared.append(gpio_number)
+        return self.fifo
+
+    async def test_wait_edge(self):
+        pin = self.board.get_pin(key='P8_3')
+        waiter = asyncio.ensure_future(pin.wait_edge(RISING))
+        await asyncio.sleep(0.01)
+        self.write(1)
+        event = await asyncio.wait_for(waiter, 1)
+        self.assertEqual(pin.gpio_number, event.gpio_number)
+
+    async def test_watcher_shared(self):
+        pin = self.board.get_pin(key='P8_3')
+        watchers = await asyncio.gather(*[self.board.edge_watcher(pin.gpio_number) for _ in range(3)])
+        self.assertEqual(1, len(set(watchers)))
+        self.assertIs(watchers[0], await self.board.edge_watcher(pin.gpio_number))
+
+    async def test_watcher_per_loop(self):
+        pin = self.board.get_pin(key='P8_3')
+        result = []
+        thread = threading.Thread(target=lambda: result.append(asyncio.run(self.board.edge_watcher(pin.gpio_number))))
+        thread.start()
+        thread.join()
+        other_loop_watcher = result[0]
+        watcher = await self.board.edge_watcher(pin.gpio_number)
+        self.assertIsNot(other_loop_watcher, watcher)
+        self.assertIs(asyncio.get_running_loop(), watcher.loop)
+        #watchers of closed loops are released
+        self.assertTrue(other_loop_watcher.closed)
+
+    async def test_edges(self):
+        pin = self.board.get_pin(key='P8_3')
+        iterator = pin.edges()
+        next_event = asyncio.ensure_future(iterator.__anext__())
+        await asyncio.sleep(0.01)
+        self.write(1)
+        self.assertEqual(RISING, (await asyncio.wait_for(next_event, 1)).edge)
+        await iterator.aclose()
+
+    async def test_close_board(self):
+        pin = self.board.get_pin(key='P8_3')
+        watcher = await self.board.edge_watcher(pin.gpio_number)
+        self.board.close()
+        self.assertTrue(watcher.closed)
+
+    async def test_detached_pin(self):
+        pin = self.board.get_pin(key='P8_3')
+        with self.assertRaises(PlatformError):
+            await Pin(None, pin.definition).wait_edge()
@@ -0,0 +1,206 @@
+# Copyright (C) 2014  Nicolas Jouanin
+#
+# This file is part of pybone.
+#
+# Pybone is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pybone is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pybone.  If not, see <http://www.gnu.org/licenses/>.
+
+from array import array
+import os
+import struct
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from pybone.bone import Linux38Platform, Platform, PlatformError
+from pybone.bone.board import Board, _load_pin_definitions
+from pybone.bone.linux_3_8.gpio_banks import GPIOBanks, GPIO_BANK_SIZE, GPIO_SETDATAOUT_OFFSET, \
+    GPIO_CLEARDATAOUT_OFFSET, GPIO_DATAOUT_OFFSET
+from pybone.tests.bone import patch_fixture_platform, patch_gpio_banks, write_gpio_banks, FILE_BANK_ADDRESSES
+
+
+class GPIOBanksTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.file = os.path.join(tmp_dir.name, 'mem')
+        self.words = (0x00000001, 0x80000040, 0, 0xffffffff)
+        write_gpio_banks(self.file, self.words)
+
+    def test_read(self):
+        banks = GPIOBanks(self.file, FILE_BANK_ADDRESSES)
+        self.addCleanup(banks.close)
+        self.assertEqual(self.words, banks.read())
+
+    def test_read_into(self):
+        banks = GPIOBanks(self.file, FILE_BANK_ADDRESSES)
+        self.addCleanup(banks.close)
+        words = array('I', [0]) * 4
+        banks.read_into(words, 1, (3, 1))
+        self.assertEqual([0, 0xffffffff, 0x80000040, 0], words.tolist())
+
+    def test_read_sees_updates(self):
+        banks = GPIOBanks(self.file, FILE_BANK_ADDRESSES)
+        self.addCleanup(banks.close)
+        write_gpio_banks(self.file, (0, 0, 0x40, 0))
+        self.assertEqual((0, 0, 0x40, 0), banks.read())
+
+    def test_open_fails(self):
+        with self.assertRaises(PlatformError):
+            GPIOBanks(os.path.join(os.path.dirname(self.file), 'missing'), FILE_BANK_ADDRESSES)
+
+    def test_map_fails(self):
+        with self.assertRaises(PlatformError):
+            GPIOBanks(self.file, FILE_BANK_ADDRESSES[:3] + (GPIO_BANK_SIZE * 8,))
+        with self.assertRaises(PlatformError):
+            GPIOBanks(self.file, FILE_BANK_ADDRESSES[:3])
+
+    def test_decode_gpio_levels(self):
+        definitions = _load_pin_definitions()
+        for words in (self.words, (0x12345678, 0x9abcdef0, 0x0f0f0f0f, 0xf0f0f0f0)):
+            expected = tuple(None if bits is None else (words[bits[0]] >> bits[1]) & 1
+                             for bits in definitions.gpio_bits)
+            self.assertEqual(expected, definitions.decode_gpio_levels(words))
+
+    def test_board_read_gpio_levels(self):
+        patch_fixture_platform(self)
+        patch_gpio_banks(self, self.file)
+        board = Board(Linux38Platform())
+        self.addCleanup(board.close)
+        levels = board.read_gpio_levels()
+        self.assertEqual(len(board.pins), len(levels))
+        #P8_3 is GPIO 38, bank 1 bit 6
+        position = board.pins.index(board.get_pin(key='P8_3'))
+        self.assertEqual(1, levels[position])
+        self.assertEqual(0, levels[board.pins.index(board.get_pin(gpio_number=39))])
+        for (pin, level) in zip(board.pins, levels):
+            self.assertEqual(pin.gpio_number is None, level is None)
+        write_gpio_banks(self.file, (0, 0, 0, 0))
+        self.assertEqual(0, board.read_gpio_levels()[position])
+
+    def test_platform_without_banks(self):
+        with self.assertRaises(PlatformError):
+            Platform().read_gpio_banks()
+
+
+def read_output_registers(file):
+    """
+    :return: (SETDATAOUT words, CLEARDATAOUT words) last written to a GPIO banks stand-in file
+    """
+    with open(file, 'rb') as fp:
+        content = fp.read()
+    return tuple(tuple(struct.unpack_from('=I', content, address + offset)[0] for address in FILE_BANK_ADDRESSES)
+                 for offset in (GPIO_SETDATAOUT_OFFSET, GPIO_CLEARDATAOUT_OFFSET))
+
+
+class GPIOBanksWriteTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.file = os.path.join(tmp_dir.name, 'mem')
+        write_gpio_banks(self.file, (0, 0, 0, 0))
+
+    def test_write(self):
+        banks = GPIOBanks(self.file, FILE_BANK_ADDRESSES, writable=True)
+        self.addCleanup(banks.close)
+        banks.write((0x1, 0, 0x30, 0), (0, 0x80000000, 0x0c, 0))
+        self.assertEqual(((0x1, 0, 0x30, 0), (0, 0x80000000, 0x0c, 0)), read_output_registers(self.file))
+
+    def test_write_single_store(self):
+        banks = GPIOBanks(self.file, FILE_BANK_ADDRESSES, writable=True)
+        self.addCleanup(banks.close)
+        dataout = GPIO_DATAOUT_OFFSET // 4
+        for (registers, word) in zip(banks._registers, (0, 0, 0xff00000f, 0)):
+            registers[dataout] = word
+        banks.write((0x1, 0, 0x30, 0), (0, 0x80000000, 0x0c, 0), single_store=True)
+        #bank 2 sets and clears pins, it is written in one DATAOUT store
+        self.assertEqual(((0x1, 0, 0, 0), (0, 0x80000000, 0, 0)), read_output_registers(self.file))
+        self.assertEqual(0xff000033, banks._registers[2][dataout])
+
+    def test_write_read_only(self):
+        banks = GPIOBanks(self.file, FILE_BANK_ADDRESSES)
+        self.addCleanup(banks.close)
+        with self.assertRaises(PlatformError):
+            banks.write((1, 0, 0, 0), (0, 0, 0, 0))
+
+    def test_board_write_gpio_levels(self):
+        patch_fixture_platform(self)
+        patch_gpio_banks(self, self.file)
+        board = Board(Linux38Platform())
+        self.addCleanup(board.close)
+        #sampling mapping is replaced by a writable one
+        board.read_gpio_levels()
+        #GPIO 38 and 39 share bank 1, GPIO 34 is in bank 1 too, GPIO 66 in bank 2
+        bus = board.select(gpio_number=38) | board.select(gpio_number=39)
+        board.write_gpio_levels({bus: 1, board.get_pin(gpio_number=34): 0, board.get_pin(gpio_number=66): 1})
+        self.assertEqual(((0, 0xc0, 0x4, 0), (0, 0x4, 0, 0)), read_output_registers(self.file))
+        self.assertTrue(board.platform.gpio_banks.writable)
+
+    def test_platform_map_once(self):
+        patch_fixture_platform(self)
+        patch_gpio_banks(self, self.file)
+        platform = Linux38Platform()
+        self.addCleanup(platform.close)
+        mappings = []
+
+        def map_banks(*args, **kwargs):
+            mappings.append(GPIOBanks(*args, **kwargs))
+            return mappings[-1]
+
+        barrier = threading.Barrier(8)
+
+        def read():
+            barrier.wait()
+            platform.read_gpio_banks()
+            platform.write_gpio_banks((0, 0, 0, 0), (0, 0, 0, 0))
+
+        with patch('pybone.bone.linux_3_8.platform.GPIOBanks', side_effect=map_banks):
+            readers = [threading.Thread(target=read) for _ in range(8)]
+            for reader in readers:
+                reader.start()
+            for reader in readers:
+                reader.join()
+        #at most one sampling mapping, retired by one writable mapping
+        self.assertIn(len(mappings), (1, 2))
+        self.assertIs(mappings[-1], platform.gpio_banks)
+        self.assertTrue(platform.gpio_banks.writable)
+        self.assertEqual(mappings[:-1], platform._retired_gpio_banks)
+
+    def test_platform_closed(self):
+        patch_fixture_platform(self)
+        patch_gpio_banks(self, self.file)
+        platform = Linux38Platform()
+        platform.read_gpio_banks()
+        platform.close()
+        #banks aren't mapped again
+        with self.assertRaises(PlatformError):
+            platform.read_gpio_banks()
+        with self.assertRaises(PlatformError):
+            platform.read_gpio_banks_into(array('I', [0]), 0, (0,))
+        with self.assertRaises(PlatformError):
+            platform.write_gpio_banks((1, 0, 0, 0), (0, 0, 0, 0))
+        self.assertIsNone(platform.gpio_banks)
+
+    def test_board_write_gpio_levels_errors(self):
+        patch_fixture_platform(self)
+        board = Board(Linux38Platform())
+        self.addCleanup(board.close)
+        pin = board.get_pin(gpio_number=38)
+        with self.assertRaises(ValueError):
+            board.write_gpio_levels({pin: 1, board.select(gpio_number=38): 0})
+        without_gpio = next(pin for pin in board.pins if pin.gpio_number is None)
+        with self.assertRaises(ValueError):
+            board.write_gpio_levels({without_gpio: 1})
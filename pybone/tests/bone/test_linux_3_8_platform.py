@@ -5,7 +5,10 @@ from unittest.mock import MagicMock
 from pybone.bone import Linux38Platform, PlatformError
 from pybone.bone.linux_3_8.platform import get_board_name
 from pybone.bone.linux_3_8.pinctrl import parse_pinmux_pins_file, parse_pins_line
+from pybone.bone.linux_3_8.pinctrl import iter_pins_registers, iter_pinmux_owners
 from pybone.bone.pin import RegSlewEnum, RegPullEnum, RegPullTypeEnum
+from pybone.tests.bone import make_fixture_root
+from pybone.utils.loop import run_sync
 
 
 class Linux38PlatformTest(unittest.TestCase):
@@ -137,3 +140,85 @@ class Linux38PlatformTest(unittest.TestCase):
         self.assertEqual('gpio.test', pin['gpio_owner'])
         self.assertEqual('gpio_pins', pin['function'])
         self.assertEqual('gpio_pins', pin['group'])
+
+    def test_iter_pins_registers(self):
+        content = "registered pins: 2\npin 0 (44e10800) 00000031 pinctrl-single\npin 1 (44e10804) 00000027 pinctrl-single \n"
+        self.assertEqual([(0x44e10800, 0x31), (0x44e10804, 0x27)], list(iter_pins_registers(content)))
+
+    def test_iter_pinmux_owners(self):
+        content = "Pinmux settings per pin\n" \
+                  "Format: pin (name): mux_owner gpio_owner hog?\n" \
+                  "pin 0 (44e10800): mmc.10 (GPIO UNCLAIMED) function pinmux_emmc2_pins group pinmux_emmc2_pins\n" \
+                  "pin 8 (44e10820): (MUX UNCLAIMED) (GPIO UNCLAIMED)\n" \
+                  "pin 9 (44e10824): (MUX UNCLAIMED) gpio.test function gpio_pins group gpio_pins\n"
+        self.assertEqual([(0x44e10800, 'mmc.10', None, 'pinmux_emmc2_pins', 'pinmux_emmc2_pins'),
+                          (0x44e10820, None, None, None, None),
+                          (0x44e10824, None, 'gpio.test', 'gpio_pins', 'gpio_pins')],
+                         list(iter_pinmux_owners(content)))
+
+    def test_bulk_parsers_match_line_parsers(self):
+        with open(Linux38PlatformTest._TEST_PINS_FILE) as fp:
+            content = fp.read()
+        expected = [(p['address'], p['reg_value']) for p in map(parse_pins_line, content.splitlines()[1:])]
+        self.assertEqual(expected, list(iter_pins_registers(content)))
+
+        with open(Linux38PlatformTest._TEST_PINMUX_FILE) as fp:
+            content = fp.read()
+        expected = [(p['address'], p['mux_owner'], p['gpio_owner'], p['function'], p['group'])
+                    for p in map(parse_pinmux_pins_file, content.splitlines()[2:])]
+        self.assertEqual(expected, list(iter_pinmux_owners(content)))
+
+    @patch('pybone.bone.platform.platform')
+    def test_discover_root(self, mock_platform):
+        mock_platform.system = MagicMock(return_value='Linux')
+        mock_platform.release = MagicMock(return_value='3.8')
+        mock_platform.processor = MagicMock(return_value='arm')
+        root = make_fixture_root(self)
+        self.addCleanup(Linux38Platform.clear_discovery_cache)
+        pf = Linux38Platform(root=root)
+        self.assertEqual(os.path.join(root, 'sys/devices/bone_capemgr.9/baseboard/board-name'), pf.board_name_file)
+        self.assertEqual(os.path.join(root, 'sys/kernel/debug/pinctrl/44e10800.pinmux/pinmux-pins'),
+                         pf.pinmux_pins_file)
+        self.assertEqual(('BeagleBone Black', '0A6A', '0414BBBK2885'), tuple(pf.read_board_info()))
+        #files are discovered once per process
+        with patch('pybone.utils.filesystem.find_files') as mock_find:
+            other = Linux38Platform(root=root)
+            self.assertFalse(mock_find.called)
+        self.assertEqual(pf.pins_file, other.pins_file)
+        Linux38Platform.clear_discovery_cache()
+        self.assertEqual(pf.pins_file, Linux38Platform(root=root).pins_file)
+
+    @patch('pybone.bone.platform.platform')
+    def test_discover_missing_files_not_cached(self, mock_platform):
+        mock_platform.system = MagicMock(return_value='Linux')
+        mock_platform.release = MagicMock(return_value='3.8')
+        mock_platform.processor = MagicMock(return_value='arm')
+        root = make_fixture_root(self)
+        self.addCleanup(Linux38Platform.clear_discovery_cache)
+        os.rename(os.path.join(root, 'sys/devices/bone_capemgr.9'), os.path.join(root, 'sys/devices/other'))
+        self.assertIsNone(Linux38Platform(root=root).board_name_file)
+        os.rename(os.path.join(root, 'sys/devices/other'), os.path.join(root, 'sys/devices/bone_capemgr.8'))
+        self.assertIsNotNone(Linux38Platform(root=root).board_name_file)
+
+    @patch('pybone.bone.platform.platform')
+    def test_prepare_gpio_edges(self, mock_platform):
+        mock_platform.system = MagicMock(return_value='Linux')
+        mock_platform.release = MagicMock(return_value='3.8')
+        mock_platform.processor = MagicMock(return_value='arm')
+        root = make_fixture_root(self)
+        self.addCleanup(Linux38Platform.clear_discovery_cache)
+        gpio_directory = os.path.join(root, 'sys/class/gpio')
+        #exported GPIO
+        os.makedirs(os.path.join(gpio_directory, 'gpio38'))
+        pf = Linux38Platform(root=root)
+        self.addCleanup(pf.close)
+        self.assertEqual(os.path.join(gpio_directory, 'gpio38/value'),
+                         run_sync(pf.prepare_gpio_edges(38)))
+        with open(os.path.join(gpio_directory, 'gpio38/edge')) as edge_file:
+            self.assertEqual('both', edge_file.read())
+        self.assertFalse(os.path.exists(os.path.join(gpio_directory, 'export')))
+        #GPIO not exported, the fixture tree doesn't create its directory on export
+        with self.assertRaises(PlatformError):
+            run_sync(pf.prepare_gpio_edges(39))
+        with open(os.path.join(gpio_directory, 'export')) as export_file:
+            self.assertEqual('39', export_file.read())
@@ -0,0 +1,154 @@
+# Copyright (C) 2014  Nicolas Jouanin
+#
+# This file is part of pybone.
+#
+# Pybone is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pybone is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pybone.  If not, see <http://www.gnu.org/licenses/>.
+
+import gc
+import tracemalloc
+import unittest
+from unittest.mock import MagicMock
+
+from pybone.bone import Platform
+from pybone.bone.board import Board, Header
+from pybone.bone.pin import Pin, PinDefinition, decode_register, REGISTER_DECODE_TABLE
+from pybone.bone.linux_3_8.pinctrl import parse_pins_line, iter_pins_registers
+from pybone.bone.pin import RegSlewEnum, RegRcvEnum, RegPullEnum, RegPullTypeEnum
+
+#Memory budget of a Board pin once static definitions are loaded, in bytes
+PIN_MEMORY_BUDGET = 200
+
+
+def _platform():
+    pf = Platform()
+    pf.read_board_info = MagicMock(return_value=['BeagleBone Black', '0A6A', '0414BBBK2885'])
+    return pf
+
+
+class PinTest(unittest.TestCase):
+
+    def _board(self):
+        return Board(_platform())
+
+    def test_pin_key(self):
+        """
+        Test pin key attributes match Header_PinNumber, like P8_3
+        """
+        board = self._board()
+        pin = board.pins[2]
+        self.assertEqual(Header.p8, pin.header)
+        self.assertEqual('P8_3', pin.key)
+        self.assertEqual(0x44e10818, pin.address)
+
+    def test_pin_from_definition_dict(self):
+        definition = {'header': Header.p9, 'head_pin': 1, 'head_name': 'GND', 'proc_pin': None,
+                      'reg_offset': None, 'driver_pin': None, 'proc_pin_name': None,
+                      'proc_signal_name': [None] * 8, 'reset_mode': None, 'gpio_chip': None,
+                      'gpio_number': None, 'notes': 'GND'}
+        pin = Pin(None, definition)
+        self.assertEqual('P9_1', pin.key)
+        self.assertIsNone(pin.address)
+
+    def test_definitions_are_shared(self):
+        board1 = self._board()
+        board2 = self._board()
+        for (pin1, pin2) in zip(board1.pins, board2.pins):
+            self.assertIsNot(pin1, pin2)
+            self.assertIs(pin1.definition, pin2.definition)
+
+    def test_definition_is_immutable(self):
+        definition = self._board().pins[0].definition
+        self.assertIsInstance(definition, PinDefinition)
+        with self.assertRaises(AttributeError):
+            definition.gpio_number = 0
+
+    def test_pin_is_immutable(self):
+        pin = self._board().pins[2]
+        with self.assertRaises(AttributeError):
+            pin.register_value = 0
+        other = pin.replace(0x37, ('mmc.10', None, None, None))
+        self.assertIs(pin.definition, other.definition)
+        self.assertEqual(0x37, other.register_value)
+        self.assertEqual('mmc.10', other.mux_owner)
+        self.assertIsNone(pin.register_value)
+
+    def test_update_runtime_keeps_raw_register(self):
+        """
+        Per line and bulk pins parsing store the same raw register value
+        """
+        pin = self._board().pins[2]
+        line = 'pin 6 (44e10818) 000001b1 pinctrl-single'
+        updated = pin.update_runtime(parse_pins_line(line))
+        self.assertEqual(dict(iter_pins_registers(line))[pin.address], updated.register_value)
+        self.assertEqual(0x1b1, updated.register_value)
+        self.assertEqual(1, updated.register_mode)
+
+    def test_pin_has_no_dict(self):
+        pin = self._board().pins[0]
+        self.assertFalse(hasattr(pin, '__dict__'))
+
+    def test_board_memory(self):
+        """
+        Once static definitions are loaded, a new board should only pay for pins runtime state
+        """
+        pf = _platform()
+        Board(pf)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            board = Board(pf)
+            (current, _) = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertLess(current, len(board.pins) * PIN_MEMORY_BUDGET)
+
+
+class PinRegisterTest(unittest.TestCase):
+
+    def test_decode_register(self):
+        reg = decode_register(0x31)
+        self.assertEqual(1, reg.mode)
+        self.assertEqual(RegSlewEnum.fast, reg.slew)
+        self.assertEqual(RegRcvEnum.enabled, reg.receive)
+        self.assertEqual(RegPullEnum.disabled, reg.pull)
+        self.assertEqual(RegPullTypeEnum.pullup, reg.pulltype)
+
+    def test_decode_register_ignores_high_bits(self):
+        self.assertIs(decode_register(0x27), decode_register(0xffffff27))
+
+    def test_decode_table(self):
+        self.assertEqual(128, len(REGISTER_DECODE_TABLE))
+        for (value, reg) in enumerate(REGISTER_DECODE_TABLE):
+            self.assertEqual(value, reg.value)
+            self.assertEqual(value & 0x07, reg.mode)
+            self.assertEqual(RegSlewEnum.slow if value & 0x40 else RegSlewEnum.fast, reg.slew)
+
+    def test_register_dict_access(self):
+        reg = decode_register(0x0f)
+        self.assertEqual(7, reg['mode'])
+        self.assertEqual(RegPullEnum.enabled, reg['pull'])
+        with self.assertRaises(KeyError):
+            reg['address']
+
+    def test_register_is_immutable(self):
+        with self.assertRaises(AttributeError):
+            decode_register(0).mode = 7
+
+    def test_pin_register_before_refresh(self):
+        pin = Board(_platform()).pins[2]
+        self.assertIsNone(pin.register)
+        self.assertIsNone(pin.register_mode)
+
+if __name__ == '__main__':
+    unittest.main()
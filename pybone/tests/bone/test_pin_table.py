@@ -0,0 +1,59 @@
+# Copyright (C) 2014  Nicolas Jouanin
+#
+# This file is part of pybone.
+#
+# Pybone is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pybone is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pybone.  If not, see <http://www.gnu.org/licenses/>.
+
+import filecmp
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from pybone.bone import Platform, pin_desc, pin_table
+from pybone.bone.board import Board
+
+
+class PinTableTest(unittest.TestCase):
+
+    def test_generated_table_is_up_to_date(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output = os.path.join(tmp_dir, '_pin_table_data.py')
+            pin_table.generate(output)
+            self.assertTrue(filecmp.cmp(output, pin_table._DATA_FILE, shallow=False),
+                            "Run 'python -m pybone.bone.pin_table' after editing pin_desc")
+
+    def test_definitions_match_pin_desc(self):
+        table = pin_table.load_pin_table()
+        for (header, definitions) in (('P8', pin_desc.BBB_P8_DEF), ('P9', pin_desc.BBB_P9_DEF)):
+            indexes = table.indexes(header)
+            self.assertEqual(len(definitions), len(indexes))
+            for (index, pin_def) in zip(indexes, definitions):
+                definition = table.definition(index)
+                self.assertEqual(header, definition.pop('header'))
+                definition['proc_signal_name'] = list(definition['proc_signal_name'])
+                self.assertEqual(pin_def, definition)
+
+    def test_table_is_shared(self):
+        self.assertIs(pin_table.load_pin_table(), pin_table.load_pin_table())
+
+    def test_board_does_not_mutate_pin_desc(self):
+        pf = Platform()
+        pf.read_board_info = MagicMock(return_value=['BeagleBone Black', '0A6A', '0414BBBK2885'])
+        Board(pf)
+        for pin_def in pin_desc.BBB_P8_DEF + pin_desc.BBB_P9_DEF:
+            self.assertNotIn('header', pin_def)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+# Copyright (C) 2014  Nicolas Jouanin
+#
+# This file is part of pybone.
+#
+# Pybone is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pybone is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pybone.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+
+from pybone.bone import Linux38Platform
+from pybone.bone.board import Board, Header
+from pybone.bone.pinset import PinSet
+from pybone.tests.bone import patch_fixture_platform
+
+
+class PinSetTest(unittest.TestCase):
+
+    def setUp(self):
+        patch_fixture_platform(self)
+        self.board = Board(Linux38Platform())
+        self.addCleanup(self.board.close)
+
+    def test_select(self):
+        p9 = self.board.select(header=Header.p9)
+        self.assertEqual(list(self.board.iter_p9_pins()), list(p9))
+        self.assertEqual(len(list(self.board.iter_p9_pins())), len(p9))
+        self.assertEqual(['P8_3'], [pin.key for pin in self.board.select(gpio_number=38)])
+        self.assertFalse(self.board.select(header=Header.p9, gpio_number=38))
+        self.assertEqual(len(self.board.pins), len(self.board.select()))
+
+    def test_set_operations(self):
+        board = self.board
+        p8 = board.select(header=Header.p8)
+        p9 = board.select(header=Header.p9)
+        mmc = board.select(where=lambda pin: (pin.mux_owner or '').startswith('mmc'))
+        self.assertEqual(board.select(), p8 | p9)
+        self.assertFalse(p8 & p9)
+        self.assertEqual(p8, ~p9)
+        self.assertEqual(p8 - mmc, p8 & ~mmc)
+        self.assertEqual(p8 ^ p9, p8 | p9)
+        self.assertTrue(mmc)
+        for pin in p8 - mmc:
+            self.assertNotIn('mmc', pin.mux_owner or '')
+        self.assertIn(board.get_pin(key='P8_3'), mmc)
+        self.assertNotIn(board.get_pin(key='P9_1'), mmc)
+
+    def test_from_pins(self):
+        pins = list(self.board.iter_pins(gpio_number=38)) + [self.board.get_pin(key='P9_12')]
+        pin_set = PinSet.from_pins(self.board, pins)
+        self.assertEqual(['P8_3', 'P9_12'], [pin.key for pin in pin_set])
+        self.assertEqual(pin_set, PinSet(self.board, pin_set.mask))
+        self.assertEqual(hash(pin_set), hash(PinSet(self.board, pin_set.mask)))
+
+    def test_bank_masks(self):
+        pin_set = self.board.select(key='P8_3') | self.board.select(key='P8_4') | \
+            self.board.select(key='P8_7') | self.board.select(key='P9_1')
+        #gpio1_6, gpio1_7 and gpio2_2, P9_1 is GND
+        self.assertEqual({1: (1 << 6) | (1 << 7), 2: 1 << 2}, pin_set.bank_masks())
+        self.assertEqual({}, PinSet(self.board).bank_masks())
+
+    def test_immutable(self):
+        pin_set = self.board.select(key='P8_3')
+        with self.assertRaises(AttributeError):
+            pin_set.mask = 0
+
+    def test_iterates_current_pins(self):
+        pin_set = self.board.select(key='P8_3')
+        self.board.pins = tuple(pin.replace(0x37, pin.owners) if pin.key == 'P8_3' else pin
+                                for pin in self.board.pins)
+        self.assertEqual(0x37, next(iter(pin_set)).register_value)
+
+
+if __name__ == '__main__':
+    unittest.main()
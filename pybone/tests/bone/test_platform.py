@@ -2,7 +2,7 @@ __author__ = 'nico'
 
 import unittest
 from unittest.mock import patch
-from pybone.bone import Platform
+from pybone.bone import Platform, PlatformError
 
 
 class PlatformTest(unittest.TestCase):
@@ -16,5 +16,15 @@ class PlatformTest(unittest.TestCase):
         mock_platform.processor.assert_called_once_with()
         mock_multiprocessing.cpu_count.assert_called_once_with()
 
+    def test_executor_closed(self):
+        platform = Platform()
+        executor = platform.executor
+        self.assertIs(executor, platform.executor)
+        platform.close()
+        with self.assertRaises(PlatformError):
+            platform.executor
+        #closing twice is harmless
+        platform.close()
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
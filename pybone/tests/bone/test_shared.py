@@ -0,0 +1,108 @@
+# Copyright (C) 2014  Nicolas Jouanin
+#
+# This file is part of pybone.
+#
+# Pybone is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pybone is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pybone.  If not, see <http://www.gnu.org/licenses/>.
+
+import multiprocessing
+import os
+import struct
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from pybone.bone import Linux38Platform, PlatformError
+from pybone.bone.board import Board
+from pybone.bone.shared import SharedBoardPublisher, SharedMemoryPlatform, shared_memory
+from pybone.tests.bone import patch_fixture_platform
+
+
+def _read_pin_in_process(name, key):
+    board = Board(SharedMemoryPlatform(name))
+    try:
+        pin = board.get_pin(key=key)
+        return (board.name, pin.register_value, pin.mux_owner)
+    finally:
+        board.close()
+
+
+@unittest.skipIf(shared_memory is None, "multiprocessing.shared_memory not available")
+class SharedBoardTest(unittest.TestCase):
+
+    def setUp(self):
+        patch_fixture_platform(self)
+        self.name = 'pybone-test-%d' % os.getpid()
+        self.board = Board(Linux38Platform())
+        self.addCleanup(self.board.close)
+        self.publisher = SharedBoardPublisher(self.board, self.name)
+        self.addCleanup(self.publisher.close)
+
+    def _reader(self):
+        board = Board(SharedMemoryPlatform(self.name))
+        self.addCleanup(board.close)
+        return board
+
+    def test_attach(self):
+        board = self._reader()
+        self.assertEqual(('BeagleBone Black', '0A6A', '0414BBBK2885'),
+                         (board.name, board.revision, board.serial_number))
+        for (expected, pin) in zip(self.board.pins, board.pins):
+            self.assertEqual(expected.register_value, pin.register_value)
+            self.assertEqual(expected.owners, pin.owners)
+        self.assertEqual(1, board.platform.generation)
+
+    def test_publish_changes(self):
+        board = self._reader()
+        self.assertEqual([], board.update_pins_runtime_attributes())
+        owners = board.platform._state.owners
+        with patch.object(self.board.platform, 'read_pins_registers',
+                          AsyncMock(return_value=[(0x44e10818, 0x37)])):
+            self.board.update_pins_runtime_attributes()
+        self.assertEqual(2, self.publisher.generation)
+        changes = board.update_pins_runtime_attributes()
+        self.assertEqual(['P8_3'], [change.pin.key for change in changes])
+        self.assertEqual(0x37, board.get_pin(key='P8_3').register_value)
+        self.assertEqual(2, board.platform.generation)
+        #only registers changed, owners weren't decoded again
+        self.assertIs(owners, board.platform._state.owners)
+
+    def test_write_in_progress(self):
+        platform = SharedMemoryPlatform(self.name)
+        self.addCleanup(platform.close)
+        platform.READ_TIMEOUT = 0.01
+        struct.pack_into('=I', self.publisher._segment.buf, 12, 3)
+        with self.assertRaises(PlatformError):
+            platform.read_board_info()
+
+    def test_stale_segment(self):
+        #segment left by a publisher which didn't unlink it
+        self.publisher.close(unlink=False)
+        publisher = SharedBoardPublisher(self.board, self.name)
+        self.addCleanup(publisher.close)
+        self.assertEqual(1, self._reader().platform.generation)
+
+    def test_no_segment(self):
+        with self.assertRaises(PlatformError):
+            SharedMemoryPlatform(self.name + '-missing')
+
+    def test_other_process(self):
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(1) as pool:
+            result = pool.apply(_read_pin_in_process, (self.name, 'P8_3'))
+        self.assertEqual(('BeagleBone Black', 0x31, 'mmc.10'), result)
+        #the other process didn't destroy the segment
+        self._reader()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+# Copyright (C) 2014  Nicolas Jouanin
+#
+# This file is part of pybone.
+#
+# Pybone is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pybone is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pybone.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from pybone.bone import Linux38Platform, PlatformError
+from pybone.bone.board import Board
+from pybone.bone.snapshot import BoardSnapshot, SnapshotCache, SnapshotError, pack_board
+from pybone.tests.bone import patch_fixture_platform
+
+
+class SnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        patch_fixture_platform(self)
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.boot_id_file = os.path.join(tmp_dir.name, 'boot_id')
+        self._write_boot_id('9b3e7c52-6c1a-4a36-a1a4-2f1c3c5f0b11')
+        patcher = patch.object(SnapshotCache, '_BOOT_ID_FILE', self.boot_id_file)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = SnapshotCache(os.path.join(tmp_dir.name, 'pybone'))
+        self.board = Board(Linux38Platform())
+        self.addCleanup(self.board.close)
+
+    def _write_boot_id(self, boot_id):
+        with open(self.boot_id_file, 'w') as fp:
+            fp.write(boot_id + '\n')
+
+    def assertSameBoard(self, expected, board):
+        self.assertEqual((expected.name, expected.revision, expected.serial_number),
+                         (board.name, board.revision, board.serial_number))
+        for (expected_pin, pin) in zip(expected.pins, board.pins):
+            self.assertEqual(expected_pin.register_value, pin.register_value)
+            self.assertEqual((expected_pin.mux_owner, expected_pin.gpio_owner, expected_pin.function, expected_pin.group),
+                             (pin.mux_owner, pin.gpio_owner, pin.function, pin.group))
+
+    def test_pack_board(self):
+        snapshot = BoardSnapshot(pack_board(self.board, b'k' * 32))
+        self.assertEqual(b'k' * 32, snapshot.key)
+        self.assertEqual(len(self.board.pins), snapshot.pin_count)
+        self.assertEqual(('BeagleBone Black', '0A6A', '0414BBBK2885', self.board.platform.board_name_file),
+                         snapshot.identity[:4])
+        position = self.board.pins.index(self.board.get_pin(key='P8_3'))
+        self.assertEqual(0x31, snapshot.register(position))
+        self.assertEqual(('mmc.10', None, 'pinmux_emmc2_pins', 'pinmux_emmc2_pins'), snapshot.owners(position))
+        #GND pin
+        self.assertIsNone(snapshot.register(0))
+
+    def test_truncated_snapshot(self):
+        content = pack_board(self.board, b'k' * 32)
+        with self.assertRaises(SnapshotError):
+            BoardSnapshot(content[:100])
+        with self.assertRaises(SnapshotError):
+            BoardSnapshot(b'NOTABONE' + content[8:])
+
+    def test_save_load(self):
+        self.assertTrue(self.cache.save(self.board))
+        with patch('pybone.utils.filesystem.find_first_files') as mock_find, \
+                patch('pybone.utils.filesystem.long_read_file') as mock_read:
+            board = self.cache.load()
+            self.assertFalse(mock_find.called)
+            self.assertFalse(mock_read.called)
+        self.assertSameBoard(self.board, board)
+        self.assertEqual(self.board.platform.pins_file, board.platform.pins_file)
+        self.assertEqual(self.board.refresh_time, board.refresh_time)
+        #Loaded board platform is usable
+        board.update_pins_runtime_attributes()
+        self.assertSameBoard(self.board, board)
+        board.close()
+
+    def test_load_missing(self):
+        self.assertIsNone(self.cache.load())
+
+    def test_load_stale(self):
+        self.cache.save(self.board)
+        self._write_boot_id('0f0e7a1e-2d3c-4b5a-8c7d-6e5f4a3b2c1d')
+        self.assertIsNone(self.cache.load())
+
+    def test_load_corrupted(self):
+        os.makedirs(self.cache.directory)
+        with open(self.cache.file, 'wb') as fp:
+            fp.write(b'\0' * 200)
+        self.assertIsNone(self.cache.load())
+
+    def test_get_board(self):
+        board = self.cache.get_board()
+        self.assertTrue(os.path.exists(self.cache.file))
+        self.assertSameBoard(self.board, board)
+        board.close()
+        with patch('pybone.utils.filesystem.find_first_files') as mock_find:
+            board = self.cache.get_board()
+            self.assertFalse(mock_find.called)
+        board.close()
+
+    def test_get_board_without_boot_id(self):
+        """
+        Snapshots can't be keyed, boards come from a cold start
+        """
+        self.cache.save(self.board)
+        os.unlink(self.boot_id_file)
+        self.assertIsNone(self.cache.load())
+        board = self.cache.get_board()
+        self.assertSameBoard(self.board, board)
+        board.close()
+
+    def test_load_platform_error(self):
+        self.cache.save(self.board)
+        with patch.object(Linux38Platform, '__init__', side_effect=PlatformError("Not a BeagleBone")):
+            self.assertIsNone(self.cache.load())
+
+    def test_save_leaves_no_temporary_file(self):
+        self.assertTrue(self.cache.save(self.board))
+        self.assertTrue(self.cache.save(self.board))
+        self.assertEqual([SnapshotCache.FILE_NAME], os.listdir(self.cache.directory))
+
+    def test_save_unwritable_directory(self):
+        cache = SnapshotCache(os.path.join(self.boot_id_file, 'pybone'))
+        self.assertFalse(cache.save(self.board))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+# Copyright (C) 2014  Nicolas Jouanin
+#
+# This file is part of pybone.
+#
+# Pybone is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pybone is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pybone.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from pybone.bone import Linux38Platform
+from pybone.bone.board import Board
+from pybone.daemon import PinServer, PinClient, ProtocolError, BoardVersion, QUERY_KEY, QUERY_ADDRESS, QUERY_GPIO
+from pybone.daemon import protocol
+from pybone.tests.bone import patch_fixture_platform
+
+
+class ProtocolTest(unittest.TestCase):
+
+    def test_queries(self):
+        queries = [(QUERY_KEY, 'P8_3'), (QUERY_ADDRESS, 0x44e10818), (QUERY_GPIO, 38)]
+        self.assertEqual(queries, protocol.decode_queries(protocol.encode_queries(queries)))
+
+    def test_pins(self):
+        pins = [(2, 0x31, ('mmc.10', None, 'pinmux_emmc2_pins', 'pinmux_emmc2_pins')),
+                (protocol.NO_POSITION, None, (None,) * 4)]
+        self.assertEqual(pins, protocol.decode_pins(protocol.encode_pins(pins)))
+
+    def test_diff(self):
+        version = BoardVersion(0x0123456789abcdef, 3)
+        pins = [(2, 0x31, (None,) * 4)]
+        self.assertEqual((version, True, pins), protocol.decode_diff(protocol.encode_diff(version, True, pins)))
+
+    def test_truncated(self):
+        payload = protocol.encode_queries([(QUERY_KEY, 'P8_3')])
+        with self.assertRaises(ProtocolError):
+            protocol.decode_queries(payload[:-1])
+
+
+class DaemonTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        patch_fixture_platform(self)
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.board = await Board.create(await Linux38Platform.create())
+        self.server = PinServer(self.board, os.path.join(tmp_dir.name, 'pybone.sock'))
+        await self.server.start()
+        self.client = await PinClient.connect(self.server.path)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        self.server.close()
+        await self.server.wait_closed()
+        self.board.close()
+
+    async def test_get_pin(self):
+        pin = await self.client.get_pin(key='P8_3')
+        self.assertEqual('P8_3', pin.key)
+        self.assertEqual(0x31, pin.register_value)
+        self.assertEqual(1, pin.register_mode)
+        self.assertEqual('mmc.10', pin.mux_owner)
+        self.assertEqual('P8_3', (await self.client.get_pin(address=0x44e10818)).key)
+        self.assertEqual('P8_3', (await self.client.get_pin(gpio_number=38)).key)
+        self.assertIsNone(await self.client.get_pin(key='P10_1'))
+
+    async def test_pipelined_queries(self):
+        pins = self.board.pins
+        results = await asyncio.gather(*(self.client.query([(QUERY_KEY, pin.key)]) for pin in pins))
+        self.assertEqual([pin.key for pin in pins], [result[0].key for result in results])
+        batch = await self.client.query([(QUERY_KEY, pin.key) for pin in pins])
+        self.assertEqual([pin.register_value for pin in pins], [pin.register_value for pin in batch])
+
+    async def test_snapshot(self):
+        (version, board) = await self.client.snapshot()
+        self.assertEqual((self.server.epoch, self.board.generation), version)
+        self.assertEqual(self.board.serial_number, board.serial_number)
+        for (expected, pin) in zip(self.board.pins, board.pins):
+            self.assertEqual((expected.register_value, expected.owners), (pin.register_value, pin.owners))
+
+    async def test_diff(self):
+        (version, _) = await self.client.snapshot()
+        self.assertEqual((version, False, []), await self.client.diff(version))
+        with patch.object(self.board.platform, 'read_pins_registers',
+                          AsyncMock(return_value=[(0x44e10818, 0x37)])):
+            await self.board.refresh()
+        (new_version, full, pins) = await self.client.diff(version)
+        self.assertEqual(version.generation + 1, new_version.generation)
+        self.assertFalse(full)
+        self.assertEqual(['P8_3'], [pin.key for pin in pins])
+        self.assertEqual(0x37, pins[0].register_value)
+        (_, full, pins) = await self.client.diff(new_version._replace(generation=new_version.generation + 10))
+        self.assertTrue(full)
+        self.assertEqual(len(self.board.pins), len(pins))
+
+    async def test_diff_other_server(self):
+        (version, _) = await self.client.snapshot()
+        #same generation, but from a previous server run
+        (new_version, full, pins) = await self.client.diff(version._replace(epoch=version.epoch ^ 1))
+        self.assertEqual(version, new_version)
+        self.assertTrue(full)
+        self.assertEqual(len(self.board.pins), len(pins))
+
+    async def test_unknown_operation(self):
+        with self.assertRaises(ProtocolError):
+            await self.client._request(99)
+        #connection is still usable
+        self.assertIsNotNone(await self.client.get_pin(key='P8_3'))
+
+    async def test_server_closed(self):
+        self.server.close()
+        await self.client._reader_task
+        with self.assertRaises(ConnectionError):
+            await self.client.get_pin(key='P8_3')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+# Copyright (C) 2014  Nicolas Jouanin
+#
+# This file is part of pybone.
+#
+# Pybone is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pybone is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pybone.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+_REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+# Run in a fresh interpreter: audit hooks record any process creation and
+# the event loop policy is checked for a loop created during import.
+_IMPORT_PROBE = """
+import json, sys
+events = []
+def hook(event, args):
+    if event in ('subprocess.Popen', 'os.fork', 'os.forkpty', 'os.posix_spawn', 'os.exec', 'os.system'):
+        events.append(event)
+sys.addaudithook(hook)
+import pybone
+loop_created = False
+if 'asyncio' in sys.modules:
+    import asyncio.events
+    policy = asyncio.events._event_loop_policy
+    loop_created = policy is not None and getattr(policy._local, '_loop', None) is not None
+print(json.dumps({'process_events': events, 'loop_created': loop_created}))
+"""
+
+
+class ImportBudgetTest(unittest.TestCase):
+
+    def _probe(self, code):
+        output = subprocess.check_output([sys.executable, '-E', '-s', '-c', code], cwd=_REPO_DIR)
+        return json.loads(output.decode().splitlines()[-1])
+
+    def test_import_does_not_fork(self):
+        result = self._probe(_IMPORT_PROBE)
+        self.assertEqual([], result['process_events'])
+
+    def test_import_does_not_create_event_loop(self):
+        result = self._probe(_IMPORT_PROBE)
+        self.assertFalse(result['loop_created'])
+
+    def test_version_info_is_lazy(self):
+        result = self._probe("import json, pybone; print(json.dumps(pybone.version_info))")
+        self.assertTrue(result.startswith('0.0.1'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+# Copyright (C) 2014  Nicolas Jouanin
+#
+# This file is part of pybone.
+#
+# Pybone is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pybone is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pybone.  If not, see <http://www.gnu.org/licenses/>.
+
+import threading
+import time
+import unittest
+
+from pybone.bone import Platform
+from pybone.utils.executor import IOExecutor, SYSFS_IO, BLOCKING_IO, MIN_WORKERS
+
+
+def _thread_name():
+    return threading.current_thread().name
+
+
+class IOExecutorTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.executor = IOExecutor(processor_count=2, inline_threshold=0.01)
+        self.addCleanup(self.executor.shutdown)
+
+    def test_sizing(self):
+        self.assertEqual(2, IOExecutor(2, SYSFS_IO).max_workers)
+        self.assertEqual(8, IOExecutor(2, BLOCKING_IO).max_workers)
+        self.assertEqual(MIN_WORKERS, IOExecutor(1, SYSFS_IO).max_workers)
+        self.assertEqual(3, IOExecutor(2, max_workers=3).max_workers)
+
+    async def test_fast_calls_run_inline(self):
+        #first call is timed in the pool
+        self.assertTrue((await self.executor.run('fast', _thread_name)).startswith('pybone-io'))
+        self.assertTrue(self.executor.is_inline('fast'))
+        self.assertEqual(threading.current_thread().name, await self.executor.run('fast', _thread_name))
+
+    async def test_slow_calls_run_in_pool(self):
+        for _ in range(3):
+            name = await self.executor.run('slow', lambda: (time.sleep(0.02), _thread_name())[1])
+            self.assertTrue(name.startswith('pybone-io'))
+        self.assertFalse(self.executor.is_inline('slow'))
+
+    async def test_becoming_slow(self):
+        await self.executor.run('key', _thread_name)
+        self.assertTrue(self.executor.is_inline('key'))
+        #inline calls are still timed
+        for _ in range(10):
+            await self.executor.run('key', time.sleep, 0.02)
+            if not self.executor.is_inline('key'):
+                break
+        self.assertFalse(self.executor.is_inline('key'))
+
+    async def test_inline_disabled(self):
+        executor = IOExecutor(inline_threshold=0)
+        self.addCleanup(executor.shutdown)
+        for _ in range(3):
+            self.assertTrue((await executor.run('fast', _thread_name)).startswith('pybone-io'))
+
+    async def test_platform_executor(self):
+        pf = Platform()
+        executor = pf.executor
+        self.assertIs(executor, pf.executor)
+        self.assertEqual(max(MIN_WORKERS, pf.processor_count), executor.max_workers)
+        self.assertEqual(3, await executor.run('add', sum, (1, 2)))
+        pf.close()
+        self.assertIsNone(executor._pool)
+
+
+if __name__ == '__main__':
+    unittest.main()
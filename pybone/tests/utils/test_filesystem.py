@@ -0,0 +1,150 @@
+# Copyright (C) 2014  Nicolas Jouanin
+#
+# This file is part of pybone.
+#
+# Pybone is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pybone is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pybone.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from pybone.utils.filesystem import FileDescriptorCache, find_files
+
+
+class FileDescriptorCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.tmp_dir = tmp_dir.name
+        self.cache = FileDescriptorCache(maxsize=2, buffer_size=16)
+        self.addCleanup(self.cache.close)
+
+    def _write(self, name, content):
+        path = os.path.join(self.tmp_dir, name)
+        with open(path, 'w') as fp:
+            fp.write(content)
+        return path
+
+    def test_read(self):
+        path = self._write('value', '1\n')
+        self.assertEqual('1\n', self.cache.read(path))
+        self.assertEqual(['1\n'], self.cache.read_lines(path))
+
+    def test_reread_keeps_file_opened(self):
+        path = self._write('value', '0\n')
+        self.assertEqual('0\n', self.cache.read(path))
+        with patch('pybone.utils.filesystem.os.open') as mock_open:
+            self._write('value', '1\n')
+            self.assertEqual('1\n', self.cache.read(path))
+            self.assertFalse(mock_open.called)
+
+    def test_read_larger_than_buffer(self):
+        content = ''.join('line %d\n' % i for i in range(100))
+        path = self._write('pins', content)
+        self.assertEqual(content, self.cache.read(path))
+        self.assertEqual(content, self.cache.read(path))
+
+    def test_read_buffer_size_content(self):
+        path = self._write('pins', 'x' * 16)
+        self.assertEqual('x' * 16, self.cache.read(path))
+
+    def test_read_missing_file(self):
+        self.assertIsNone(self.cache.read(os.path.join(self.tmp_dir, 'missing')))
+        self.assertEqual(0, len(self.cache))
+
+    def test_lru_eviction(self):
+        paths = [self._write('file%d' % i, str(i)) for i in range(3)]
+        self.cache.read(paths[0])
+        self.cache.read(paths[1])
+        self.cache.read(paths[0])
+        self.cache.read(paths[2])
+        self.assertEqual(2, len(self.cache))
+        self.assertEqual([paths[0], paths[2]], list(self.cache._fds))
+
+    def test_fd_evicted_while_read(self):
+        """
+        A file evicted by another thread while it is read stays opened until its read ends
+        """
+        paths = [self._write('file%d' % i, str(i)) for i in range(3)]
+        pread = self.cache._pread
+        evicted = []
+
+        def pread_while_evicted(fd):
+            if not evicted:
+                evicted.append(fd)
+                self.cache.read(paths[1])
+                self.cache.read(paths[2])
+                self.assertNotIn(paths[0], self.cache._fds)
+                os.fstat(fd)
+            return pread(fd)
+
+        with patch.object(self.cache, '_pread', side_effect=pread_while_evicted):
+            self.assertEqual('0', self.cache.read(paths[0]))
+        with self.assertRaises(OSError):
+            os.fstat(evicted[0])
+        self.assertEqual({}, self.cache._users)
+
+    def test_close(self):
+        path = self._write('value', '1\n')
+        self.cache.read(path)
+        fd = self.cache._fds[path]
+        self.cache.close()
+        self.assertEqual(0, len(self.cache))
+        with self.assertRaises(OSError):
+            os.fstat(fd)
+
+
+class FindFilesTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.root = tmp_dir.name
+        for path in ('sys/devices/bone_capemgr.9/baseboard/board-name',
+                     'sys/devices/bone_capemgr.9/baseboard/revision',
+                     'sys/devices/.hidden.1/baseboard/revision',
+                     'sys/devices/ocp.3/name'):
+            os.makedirs(os.path.dirname(os.path.join(self.root, path)), exist_ok=True)
+            open(os.path.join(self.root, path), 'w').close()
+
+    def test_find_files(self):
+        found = find_files(['/sys/devices/bone_capemgr.*/baseboard/board-name',
+                            '/sys/devices/*/baseboard/revision',
+                            '/sys/devices/*/name',
+                            '/sys/devices/bone_capemgr.*/baseboard/serial-number',
+                            '/sys/devices/ocp.3/name',
+                            '/sys/devices/ocp.3/missing'], self.root)
+        self.assertEqual([os.path.join(self.root, 'sys/devices/bone_capemgr.9/baseboard/board-name'),
+                          os.path.join(self.root, 'sys/devices/bone_capemgr.9/baseboard/revision'),
+                          os.path.join(self.root, 'sys/devices/ocp.3/name'),
+                          None,
+                          os.path.join(self.root, 'sys/devices/ocp.3/name'),
+                          None], found)
+
+    def test_directories_listed_once(self):
+        with patch('pybone.utils.filesystem.os.scandir', wraps=os.scandir) as mock_scandir:
+            find_files(['/sys/devices/bone_capemgr.*/baseboard/board-name',
+                        '/sys/devices/bone_capemgr.*/baseboard/revision',
+                        '/sys/devices/bone_capemgr.*/baseboard/serial-number'], self.root)
+        self.assertEqual(1, mock_scandir.call_count)
+
+    def test_absolute_root(self):
+        path = os.path.join(self.root, 'sys/devices/ocp.3/name')
+        self.assertEqual([path, None], find_files([path, os.path.join(self.root, 'sys/*/missing')]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -16,19 +16,19 @@
 # along with Pybone.  If not, see <http://www.gnu.org/licenses/>.
 
 import unittest
-import pybone
+from pybone.utils.version import get_pretty_version
 
 
 class VersionTestFunction(unittest.TestCase):
 
     def test_version_final(self):
         v = (0, 1, 0, 'final', 0)
-        v_str = pybone.utils.version.get_pretty_version(v)
+        v_str = get_pretty_version(v)
         self.assertEqual('0.1', v_str)
 
     def test_version_alpha(self):
         v = (0, 1, 0, 'alpha', 1)
-        v_str = pybone.utils.version.get_pretty_version(v)
+        v_str = get_pretty_version(v)
         self.assertEqual('0.1a1', v_str)
 
 if __name__ == '__main__':
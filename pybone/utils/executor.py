@@ -0,0 +1,103 @@
+# Copyright (C) 2014  Nicolas Jouanin
+#
+# This file is part of pybone.
+#
+# Pybone is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pybone is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pybone.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+LOGGER = logging.getLogger(__name__)
+
+#I/O kinds, see IOExecutor
+SYSFS_IO = 'sysfs'
+BLOCKING_IO = 'blocking'
+
+#worker threads per processor, by I/O kind. sysfs and debugfs reads are served from
+#kernel memory and mostly use CPU, other I/O may wait on devices
+WORKERS_PER_PROCESSOR = {
+    SYSFS_IO: 1,
+    BLOCKING_IO: 4,
+}
+MIN_WORKERS = 2
+
+
+class IOExecutor(object):
+    """
+    Bounded thread pool running blocking file I/O for an event loop.
+    Calls are timed by key (like the file path) : calls whose average duration is below
+    inline_threshold run inline on the event loop thread, saving the thread hop, others
+    run in the pool. Inline calls keep being timed, so a key becoming slow goes back to the pool.
+    """
+    #weight of the last duration in averages
+    SMOOTHING = 0.25
+
+    def __init__(self, processor_count=1, kind=SYSFS_IO, max_workers=None, inline_threshold=0.0001):
+        """
+        :param processor_count: processors count, used to size the pool if max_workers is None
+        :param kind: I/O kind, SYSFS_IO or BLOCKING_IO, used to size the pool if max_workers is None
+        :param max_workers: pool size
+        :param inline_threshold: average duration in seconds below which calls run inline, 0 disables inline calls
+        """
+        if max_workers is None:
+            max_workers = max(MIN_WORKERS, WORKERS_PER_PROCESSOR[kind] * processor_count)
+        self.max_workers = max_workers
+        self.inline_threshold = inline_threshold
+        self._pool = None
+        self._durations = {}
+
+    def _get_pool(self):
+        #threads are only created when needed
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix='pybone-io')
+        return self._pool
+
+    def _timed(self, key, function, args):
+        start = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            duration = time.perf_counter() - start
+            average = self._durations.get(key)
+            self._durations[key] = duration if average is None else \
+                average + self.SMOOTHING * (duration - average)
+
+    def is_inline(self, key):
+        """
+        :return: True if calls for key currently run inline
+        """
+        average = self._durations.get(key)
+        return average is not None and average < self.inline_threshold
+
+    async def run(self, key, function, *args, loop=None):
+        """
+        Run a blocking call, inline or in the pool
+        :param key: calls key, like the file path, calls with the same key are expected to last the same
+        :param function: blocking callable
+        :param args: function arguments
+        :param loop: event loop, the running loop if None
+        :return: function result
+        """
+        if self.is_inline(key):
+            return self._timed(key, function, args)
+        if loop is None:
+            loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_pool(), self._timed, key, function, args)
+
+    def shutdown(self, wait=True):
+        if self._pool is not None:
+            self._pool.shutdown(wait)
+            self._pool = None
@@ -17,7 +17,10 @@
 
 import asyncio
 import logging
-import glob
+import fnmatch
+import os
+import threading
+from collections import OrderedDict
 
 LOGGER = logging.getLogger(__name__)
 
@@ -38,30 +41,251 @@ def long_read_file(file):
         return lines
 
 
-@asyncio.coroutine
-def read_async(file, loop=None):
+def long_read_content(file):
+    try:
+        LOGGER.debug("BEGIN long_read_content %s" % file)
+        fp = open(file)
+    except PermissionError:
+        LOGGER.warning("Permission error while reading %s. Consider running as root or some sudoers." % file)
+        return None
+    except Exception as e:
+        LOGGER.warning("Exception while reading file %s : %s" % (file, e))
+    else:
+        with fp:
+            content = fp.read()
+        LOGGER.debug("END long_read_content %s" % file)
+        return content
+
+
+class FileDescriptorCache(object):
     """
-    File reading coroutine
+    Keep files opened and re-read them from start with pread, saving open/close
+    system calls on files read periodically, like sysfs or debugfs attributes.
+    At most maxsize files are kept opened, least recently read ones are closed first.
     """
+    def __init__(self, maxsize=8, buffer_size=4096):
+        self.maxsize = maxsize
+        self._buffer_size = buffer_size
+        self._fds = OrderedDict()
+        #count of reads in progress by fd, and fds to close once their reads end
+        self._users = {}
+        self._retired = set()
+        self._lock = threading.Lock()
+        #reads may run concurrently in executor threads, each thread has its own buffer
+        self._local = threading.local()
+
+    def _acquire_fd(self, file):
+        #the returned fd is held until _release_fd(), so it isn't closed while read
+        with self._lock:
+            fd = self._fds.get(file)
+            if fd is not None:
+                self._fds.move_to_end(file)
+                self._users[fd] = self._users.get(fd, 0) + 1
+                return fd
+        fd = os.open(file, os.O_RDONLY)
+        with self._lock:
+            if file in self._fds:
+                #opened concurrently by another thread
+                os.close(fd)
+                fd = self._fds[file]
+            else:
+                self._fds[file] = fd
+                while len(self._fds) > self.maxsize:
+                    (_, evicted_fd) = self._fds.popitem(last=False)
+                    self._close_fd(evicted_fd)
+            self._users[fd] = self._users.get(fd, 0) + 1
+        return fd
+
+    def _release_fd(self, fd):
+        with self._lock:
+            users = self._users[fd] - 1
+            if users:
+                self._users[fd] = users
+            else:
+                del self._users[fd]
+                if fd in self._retired:
+                    self._retired.discard(fd)
+                    os.close(fd)
+
+    def _close_fd(self, fd):
+        #called with lock held. fds being read are closed by their last reader, their
+        #number can't be reused by another open meanwhile
+        if fd in self._users:
+            self._retired.add(fd)
+        else:
+            os.close(fd)
+
+    def _discard(self, file, fd):
+        with self._lock:
+            if self._fds.get(file) == fd:
+                del self._fds[file]
+                self._close_fd(fd)
+
+    def _pread(self, fd):
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is None:
+            buffer = self._local.buffer = bytearray(self._buffer_size)
+        size = 0
+        while True:
+            view = memoryview(buffer)
+            count = os.preadv(fd, [view[size:]], size)
+            size += count
+            if size < len(buffer):
+                #short read, end of file reached
+                content = str(view[:size], 'utf-8')
+                view.release()
+                return content
+            view.release()
+            buffer.extend(bytes(len(buffer)))
+
+    def read(self, file):
+        """
+        Read a whole file content
+        :param file: file path
+        :return: file content, or None if the file can't be read
+        """
+        try:
+            fd = self._acquire_fd(file)
+        except PermissionError:
+            LOGGER.warning("Permission error while reading %s. Consider running as root or some sudoers." % file)
+            return None
+        except Exception as e:
+            LOGGER.warning("Exception while reading file %s : %s" % (file, e))
+            return None
+        try:
+            return self._pread(fd)
+        except OSError as e:
+            LOGGER.warning("Exception while reading file %s : %s" % (file, e))
+            self._discard(file, fd)
+            return None
+        finally:
+            self._release_fd(fd)
+
+    def read_lines(self, file):
+        content = self.read(file)
+        if content is not None:
+            return content.splitlines(True)
+        return None
+
+    def close(self):
+        """
+        Close all cached file descriptors
+        """
+        with self._lock:
+            for fd in self._fds.values():
+                self._close_fd(fd)
+            self._fds.clear()
+
+    def __len__(self):
+        return len(self._fds)
+
+
+async def _run(loop, executor, key, function, *args):
     if loop is None:
-        _loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
+    if executor is None:
+        return await loop.run_in_executor(None, function, *args)
+    return await executor.run(key, function, *args, loop=loop)
+
+
+async def read_async(file, loop=None, cache=None, executor=None):
+    """
+    File reading coroutine
+    :param cache: FileDescriptorCache used to read file, if given
+    :param executor: IOExecutor running the read, loop default executor if None
+    """
+    if cache is None:
+        lines = await _run(loop, executor, file, long_read_file, file)
     else:
-        _loop = loop
-    lines = yield from _loop.run_in_executor(None, long_read_file, file)
+        lines = await _run(loop, executor, file, cache.read_lines, file)
     return lines
 
 
-@asyncio.coroutine
-def find_first_file(pattern, loop=None):
+async def read_content_async(file, loop=None, cache=None, executor=None):
     """
-    Find first file matching a file pattern
+    File reading coroutine, returning the whole file content
+    :param cache: FileDescriptorCache used to read file, if given
+    :param executor: IOExecutor running the read, loop default executor if None
     """
-    if loop is None:
-        _loop = asyncio.get_event_loop()
+    if cache is None:
+        content = await _run(loop, executor, file, long_read_content, file)
     else:
-        _loop = loop
-    it = yield from _loop.run_in_executor(None, glob.iglob, pattern)
-    try:
-        return next(it)
-    except StopIteration:
-        return None
+        content = await _run(loop, executor, file, cache.read, file)
+    return content
+
+
+def _has_magic(part):
+    return '*' in part or '?' in part or '[' in part
+
+
+def find_files(patterns, root='/'):
+    """
+    Find first file matching each of several glob patterns, in a single pass : each directory
+    is listed once, even when several patterns go through it. Matches are tried in name order.
+    :param patterns: absolute glob patterns
+    :param root: directory patterns are relative to, like a fixture tree replacing '/'
+    :return: list of the first path matching each pattern, None if there's no match
+    """
+    listings = {}
+
+    def listdir(directory):
+        names = listings.get(directory)
+        if names is None:
+            try:
+                with os.scandir(directory) as entries:
+                    names = sorted(entry.name for entry in entries)
+            except OSError:
+                names = []
+            listings[directory] = names
+        return names
+
+    def resolve(directory, parts):
+        for (index, part) in enumerate(parts):
+            if _has_magic(part):
+                names = listdir(directory)
+                if not part.startswith('.'):
+                    #like glob, wildcards don't match hidden files
+                    names = [name for name in names if not name.startswith('.')]
+                for name in fnmatch.filter(names, part):
+                    found = resolve(os.path.join(directory, name), parts[index + 1:])
+                    if found is not None:
+                        return found
+                return None
+            directory = os.path.join(directory, part)
+        return directory if os.path.exists(directory) else None
+
+    found = []
+    for pattern in patterns:
+        if root and root != '/':
+            pattern = os.path.join(root, pattern.lstrip('/'))
+        if not _has_magic(pattern):
+            found.append(pattern if os.path.exists(pattern) else None)
+            continue
+        parts = pattern.split('/')
+        #leading literal directories are kept as is
+        literal = 0
+        while not _has_magic(parts[literal]):
+            literal += 1
+        found.append(resolve('/'.join(parts[:literal]) or '/', parts[literal:]))
+    return found
+
+
+async def find_first_files(patterns, root='/', loop=None, executor=None):
+    """
+    Find first file matching each of several glob patterns, in a single executor call
+    :param patterns: absolute glob patterns
+    :param root: directory patterns are relative to
+    :param executor: IOExecutor running the search, loop default executor if None
+    :return: list of the first path matching each pattern, None if there's no match
+    """
+    patterns = tuple(patterns)
+    return await _run(loop, executor, patterns, find_files, patterns, root)
+
+
+async def find_first_file(pattern, loop=None, executor=None):
+    """
+    Find first file matching a file pattern
+    :param executor: IOExecutor running the search, loop default executor if None
+    """
+    (found,) = await find_first_files((pattern,), loop=loop, executor=executor)
+    return found
@@ -0,0 +1,51 @@
+# Copyright (C) 2014  Nicolas Jouanin
+#
+# This file is part of pybone.
+#
+# Pybone is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pybone is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pybone.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import threading
+
+_local = threading.local()
+
+
+def get_sync_loop():
+    """
+    Get the event loop used to run coroutines from synchronous code.
+    Each thread gets its own loop, created on first use and reused afterwards,
+    so executors and other loop resources are not created on every call.
+    """
+    loop = getattr(_local, 'loop', None)
+    if loop is None or loop.is_closed():
+        loop = _local.loop = asyncio.new_event_loop()
+    return loop
+
+
+def run_sync(coroutine, loop=None):
+    """
+    Run a coroutine to completion from synchronous code
+    :param coroutine: coroutine to run
+    :param loop: event loop to run coroutine with, a per-thread private loop is used if None
+    :return: coroutine result
+    """
+    if loop is None:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            loop = get_sync_loop()
+        else:
+            coroutine.close()
+            raise RuntimeError("Synchronous API can't be used from a running event loop, use its coroutine version")
+    return loop.run_until_complete(coroutine)
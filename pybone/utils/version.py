@@ -15,17 +15,13 @@
 # You should have received a copy of the GNU General Public License
 # along with Pybone.  If not, see <http://www.gnu.org/licenses/>.
 
-import asyncio
 import os
-import subprocess
 import datetime
 import logging
 
-loop = asyncio.get_event_loop()
-
 LOGGER = logging.getLogger(__name__)
 
-@asyncio.coroutine
+
 def _get_git_changeset():
     """Returns a numeric identifier of the latest git changeset.
 
@@ -33,19 +29,23 @@ def _get_git_changeset():
     This value isn't guaranteed to be unique, but collisions are very unlikely,
     so it's sufficient for generating the development version numbers.
     """
+    # subprocess is only needed for development versions, don't pay for it at import
+    import subprocess
+
     repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    git_log = yield from asyncio.create_subprocess_shell('git log --pretty=format:%ct --quiet -1 HEAD',
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE, shell=True, cwd=repo_dir, universal_newlines=False)
-    (stdin, stderr) = yield from git_log.communicate()
     try:
-        timestamp = datetime.datetime.utcfromtimestamp(int(stdin))
+        git_log = subprocess.run(['git', 'log', '--pretty=format:%ct', '--quiet', '-1', 'HEAD'],
+                                 stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=repo_dir)
+    except OSError as e:
+        LOGGER.debug("Couldn't run git to get changeset: %s" % e)
+        return None
+    try:
+        timestamp = datetime.datetime.utcfromtimestamp(int(git_log.stdout))
     except ValueError:
         return None
     return timestamp.strftime('%Y%m%d%H%M%S')
 
 
-@asyncio.coroutine
 def _get_version(version):
     "Returns a PEP 386-compliant version number from VERSION."
 
@@ -59,7 +59,7 @@ def _get_version(version):
 
     sub = ''
     if version[3] == 'alpha' and version[4] == 0:
-        changeset = yield from _get_git_changeset()
+        changeset = _get_git_changeset()
         if changeset:
             sub = '.dev%s' % changeset
 
@@ -71,5 +71,4 @@ def _get_version(version):
 
 
 def get_pretty_version(v):
-    pretty_version = loop.run_until_complete(_get_version(v))
-    return pretty_version
+    return _get_version(v)
@@ -26,12 +26,13 @@ setup(
   url="https://github.com/njouanin/pybone",
   license='GPLv3',
   packages=find_packages(exclude=['tests']),
+  python_requires='>=3.7',
   classifiers=[
     'Development Status :: 2 - Pre-Alpha',
     'Intended Audience :: Developers',
     'License :: OSI Approved :: GNU General Public License v3 (GPLv3)',
     'Operating System :: POSIX :: Linux',
-    'Programming Language :: Python :: 3.4',
+    'Programming Language :: Python :: 3.7',
     'Topic :: System :: Hardware :: Hardware Drivers',
     'Topic :: System :: Operating System Kernels :: Linux'
   ]